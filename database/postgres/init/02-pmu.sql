@@ -0,0 +1,25 @@
+-- Synchrophasor (PMU) measurements streamed by the telemetry simulator
+
+-- PMU identities: pmu_id is the C37.118 IDCODE, offset by shard in sharded runs.
+-- An IDCODE is allocated to one bus once and never reassigned, so frames keep their bus
+CREATE TABLE monitoring.pmu_devices (
+    pmu_id INTEGER PRIMARY KEY,
+    element_id VARCHAR(100) NOT NULL
+);
+
+-- One narrow fixed-width row per PMU and frame, written with binary COPY
+CREATE TABLE monitoring.pmu_frames (
+    time TIMESTAMPTZ NOT NULL,
+    pmu_id INTEGER NOT NULL,
+    magnitude REAL,
+    angle REAL,
+    frequency REAL,
+    rocof REAL
+);
+
+-- Convert to hypertable (frames arrive at tens of thousands of rows per second)
+SELECT create_hypertable('monitoring.pmu_frames', 'time', chunk_time_interval => INTERVAL '1 hour');
+
+-- Create indexes
+CREATE INDEX idx_pmu_frames_pmu_time ON monitoring.pmu_frames (pmu_id, time DESC);
+CREATE INDEX idx_pmu_devices_element ON monitoring.pmu_devices (element_id);
@@ -0,0 +1,509 @@
+-- Wide per-type telemetry written by the simulator when TELEMETRY_LAYOUT is wide or both
+-- One row per element and timestamp with a typed column per metric, instead of one row per
+-- metric in monitoring.telemetry. Columns match WIDE_TABLES in telemetry-simulator/telemetry_writer.py
+
+-- Bus telemetry
+CREATE TABLE monitoring.telemetry_bus (
+    time TIMESTAMPTZ NOT NULL,
+    element_id VARCHAR(100) NOT NULL,
+    voltage DOUBLE PRECISION,
+    voltage_level DOUBLE PRECISION,
+    voltage_change DOUBLE PRECISION,
+    frequency DOUBLE PRECISION,
+    voltage_angle DOUBLE PRECISION
+);
+
+-- Generator telemetry
+CREATE TABLE monitoring.telemetry_generator (
+    time TIMESTAMPTZ NOT NULL,
+    element_id VARCHAR(100) NOT NULL,
+    power DOUBLE PRECISION,
+    load_factor DOUBLE PRECISION,
+    efficiency DOUBLE PRECISION,
+    frequency DOUBLE PRECISION,
+    voltage DOUBLE PRECISION,
+    voltage_level DOUBLE PRECISION
+);
+
+-- Load telemetry
+CREATE TABLE monitoring.telemetry_load (
+    time TIMESTAMPTZ NOT NULL,
+    element_id VARCHAR(100) NOT NULL,
+    power DOUBLE PRECISION,
+    current DOUBLE PRECISION,
+    power_factor DOUBLE PRECISION,
+    utilization_rate DOUBLE PRECISION,
+    voltage_level DOUBLE PRECISION
+);
+
+-- Line telemetry
+CREATE TABLE monitoring.telemetry_line (
+    time TIMESTAMPTZ NOT NULL,
+    element_id VARCHAR(100) NOT NULL,
+    current DOUBLE PRECISION,
+    loading DOUBLE PRECISION,
+    power_flow DOUBLE PRECISION,
+    power_loss DOUBLE PRECISION,
+    temperature DOUBLE PRECISION
+);
+
+-- Transformer telemetry
+CREATE TABLE monitoring.telemetry_transformer (
+    time TIMESTAMPTZ NOT NULL,
+    element_id VARCHAR(100) NOT NULL,
+    loading DOUBLE PRECISION,
+    power_flow DOUBLE PRECISION,
+    oil_temperature DOUBLE PRECISION,
+    winding_temperature DOUBLE PRECISION,
+    tap_position DOUBLE PRECISION
+);
+
+SELECT create_hypertable('monitoring.telemetry_bus', 'time');
+SELECT create_hypertable('monitoring.telemetry_generator', 'time');
+SELECT create_hypertable('monitoring.telemetry_load', 'time');
+SELECT create_hypertable('monitoring.telemetry_line', 'time');
+SELECT create_hypertable('monitoring.telemetry_transformer', 'time');
+
+-- Create indexes
+CREATE INDEX idx_telemetry_bus_element_time ON monitoring.telemetry_bus (element_id, time DESC);
+CREATE INDEX idx_telemetry_generator_element_time ON monitoring.telemetry_generator (element_id, time DESC);
+CREATE INDEX idx_telemetry_load_element_time ON monitoring.telemetry_load (element_id, time DESC);
+CREATE INDEX idx_telemetry_line_element_time ON monitoring.telemetry_line (element_id, time DESC);
+CREATE INDEX idx_telemetry_transformer_element_time ON monitoring.telemetry_transformer (element_id, time DESC);
+
+-- Continuous aggregates at 1-minute and 1-hour resolution for dashboards and charts.
+-- Both read the raw hypertable so hourly averages are not averages of minute averages;
+-- real-time aggregation fills in the buckets the refresh policy has not materialized yet.
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_bus_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 minute', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(voltage) AS voltage_avg,
+    min(voltage) AS voltage_min,
+    max(voltage) AS voltage_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max,
+    avg(voltage_change) AS voltage_change_avg,
+    min(voltage_change) AS voltage_change_min,
+    max(voltage_change) AS voltage_change_max,
+    avg(frequency) AS frequency_avg,
+    min(frequency) AS frequency_min,
+    max(frequency) AS frequency_max,
+    avg(voltage_angle) AS voltage_angle_avg,
+    min(voltage_angle) AS voltage_angle_min,
+    max(voltage_angle) AS voltage_angle_max
+FROM monitoring.telemetry_bus
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_bus_1m',
+    start_offset => INTERVAL '1 hour',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_generator_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 minute', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(power) AS power_avg,
+    min(power) AS power_min,
+    max(power) AS power_max,
+    avg(load_factor) AS load_factor_avg,
+    min(load_factor) AS load_factor_min,
+    max(load_factor) AS load_factor_max,
+    avg(efficiency) AS efficiency_avg,
+    min(efficiency) AS efficiency_min,
+    max(efficiency) AS efficiency_max,
+    avg(frequency) AS frequency_avg,
+    min(frequency) AS frequency_min,
+    max(frequency) AS frequency_max,
+    avg(voltage) AS voltage_avg,
+    min(voltage) AS voltage_min,
+    max(voltage) AS voltage_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max
+FROM monitoring.telemetry_generator
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_generator_1m',
+    start_offset => INTERVAL '1 hour',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_load_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 minute', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(power) AS power_avg,
+    min(power) AS power_min,
+    max(power) AS power_max,
+    avg(current) AS current_avg,
+    min(current) AS current_min,
+    max(current) AS current_max,
+    avg(power_factor) AS power_factor_avg,
+    min(power_factor) AS power_factor_min,
+    max(power_factor) AS power_factor_max,
+    avg(utilization_rate) AS utilization_rate_avg,
+    min(utilization_rate) AS utilization_rate_min,
+    max(utilization_rate) AS utilization_rate_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max
+FROM monitoring.telemetry_load
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_load_1m',
+    start_offset => INTERVAL '1 hour',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_line_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 minute', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(current) AS current_avg,
+    min(current) AS current_min,
+    max(current) AS current_max,
+    avg(loading) AS loading_avg,
+    min(loading) AS loading_min,
+    max(loading) AS loading_max,
+    avg(power_flow) AS power_flow_avg,
+    min(power_flow) AS power_flow_min,
+    max(power_flow) AS power_flow_max,
+    avg(power_loss) AS power_loss_avg,
+    min(power_loss) AS power_loss_min,
+    max(power_loss) AS power_loss_max,
+    avg(temperature) AS temperature_avg,
+    min(temperature) AS temperature_min,
+    max(temperature) AS temperature_max
+FROM monitoring.telemetry_line
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_line_1m',
+    start_offset => INTERVAL '1 hour',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_transformer_1m
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 minute', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(loading) AS loading_avg,
+    min(loading) AS loading_min,
+    max(loading) AS loading_max,
+    avg(power_flow) AS power_flow_avg,
+    min(power_flow) AS power_flow_min,
+    max(power_flow) AS power_flow_max,
+    avg(oil_temperature) AS oil_temperature_avg,
+    min(oil_temperature) AS oil_temperature_min,
+    max(oil_temperature) AS oil_temperature_max,
+    avg(winding_temperature) AS winding_temperature_avg,
+    min(winding_temperature) AS winding_temperature_min,
+    max(winding_temperature) AS winding_temperature_max,
+    avg(tap_position) AS tap_position_avg,
+    min(tap_position) AS tap_position_min,
+    max(tap_position) AS tap_position_max
+FROM monitoring.telemetry_transformer
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_transformer_1m',
+    start_offset => INTERVAL '1 hour',
+    end_offset => INTERVAL '1 minute',
+    schedule_interval => INTERVAL '1 minute');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_bus_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hour', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(voltage) AS voltage_avg,
+    min(voltage) AS voltage_min,
+    max(voltage) AS voltage_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max,
+    avg(voltage_change) AS voltage_change_avg,
+    min(voltage_change) AS voltage_change_min,
+    max(voltage_change) AS voltage_change_max,
+    avg(frequency) AS frequency_avg,
+    min(frequency) AS frequency_min,
+    max(frequency) AS frequency_max,
+    avg(voltage_angle) AS voltage_angle_avg,
+    min(voltage_angle) AS voltage_angle_min,
+    max(voltage_angle) AS voltage_angle_max
+FROM monitoring.telemetry_bus
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_bus_1h',
+    start_offset => INTERVAL '3 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_generator_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hour', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(power) AS power_avg,
+    min(power) AS power_min,
+    max(power) AS power_max,
+    avg(load_factor) AS load_factor_avg,
+    min(load_factor) AS load_factor_min,
+    max(load_factor) AS load_factor_max,
+    avg(efficiency) AS efficiency_avg,
+    min(efficiency) AS efficiency_min,
+    max(efficiency) AS efficiency_max,
+    avg(frequency) AS frequency_avg,
+    min(frequency) AS frequency_min,
+    max(frequency) AS frequency_max,
+    avg(voltage) AS voltage_avg,
+    min(voltage) AS voltage_min,
+    max(voltage) AS voltage_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max
+FROM monitoring.telemetry_generator
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_generator_1h',
+    start_offset => INTERVAL '3 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_load_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hour', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(power) AS power_avg,
+    min(power) AS power_min,
+    max(power) AS power_max,
+    avg(current) AS current_avg,
+    min(current) AS current_min,
+    max(current) AS current_max,
+    avg(power_factor) AS power_factor_avg,
+    min(power_factor) AS power_factor_min,
+    max(power_factor) AS power_factor_max,
+    avg(utilization_rate) AS utilization_rate_avg,
+    min(utilization_rate) AS utilization_rate_min,
+    max(utilization_rate) AS utilization_rate_max,
+    avg(voltage_level) AS voltage_level_avg,
+    min(voltage_level) AS voltage_level_min,
+    max(voltage_level) AS voltage_level_max
+FROM monitoring.telemetry_load
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_load_1h',
+    start_offset => INTERVAL '3 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_line_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hour', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(current) AS current_avg,
+    min(current) AS current_min,
+    max(current) AS current_max,
+    avg(loading) AS loading_avg,
+    min(loading) AS loading_min,
+    max(loading) AS loading_max,
+    avg(power_flow) AS power_flow_avg,
+    min(power_flow) AS power_flow_min,
+    max(power_flow) AS power_flow_max,
+    avg(power_loss) AS power_loss_avg,
+    min(power_loss) AS power_loss_min,
+    max(power_loss) AS power_loss_max,
+    avg(temperature) AS temperature_avg,
+    min(temperature) AS temperature_min,
+    max(temperature) AS temperature_max
+FROM monitoring.telemetry_line
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_line_1h',
+    start_offset => INTERVAL '3 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes');
+
+CREATE MATERIALIZED VIEW monitoring.telemetry_transformer_1h
+WITH (timescaledb.continuous, timescaledb.materialized_only = false) AS
+SELECT time_bucket(INTERVAL '1 hour', time) AS bucket,
+    element_id,
+    count(*) AS samples,
+    avg(loading) AS loading_avg,
+    min(loading) AS loading_min,
+    max(loading) AS loading_max,
+    avg(power_flow) AS power_flow_avg,
+    min(power_flow) AS power_flow_min,
+    max(power_flow) AS power_flow_max,
+    avg(oil_temperature) AS oil_temperature_avg,
+    min(oil_temperature) AS oil_temperature_min,
+    max(oil_temperature) AS oil_temperature_max,
+    avg(winding_temperature) AS winding_temperature_avg,
+    min(winding_temperature) AS winding_temperature_min,
+    max(winding_temperature) AS winding_temperature_max,
+    avg(tap_position) AS tap_position_avg,
+    min(tap_position) AS tap_position_min,
+    max(tap_position) AS tap_position_max
+FROM monitoring.telemetry_transformer
+GROUP BY bucket, element_id
+WITH NO DATA;
+
+SELECT add_continuous_aggregate_policy('monitoring.telemetry_transformer_1h',
+    start_offset => INTERVAL '3 days',
+    end_offset => INTERVAL '1 hour',
+    schedule_interval => INTERVAL '30 minutes');
+
+-- Narrow views over the rollups, shaped like monitoring.telemetry so existing
+-- per-metric queries can switch to them by changing the table name
+
+CREATE VIEW monitoring.telemetry_1m AS
+SELECT r.bucket AS time, r.element_id, 'Bus'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_bus_1m r
+CROSS JOIN LATERAL (
+    VALUES
+        ('voltage', r.voltage_avg, r.voltage_min, r.voltage_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max),
+        ('voltage_change', r.voltage_change_avg, r.voltage_change_min, r.voltage_change_max),
+        ('frequency', r.frequency_avg, r.frequency_min, r.frequency_max),
+        ('voltage_angle', r.voltage_angle_avg, r.voltage_angle_min, r.voltage_angle_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Generator'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_generator_1m r
+CROSS JOIN LATERAL (
+    VALUES
+        ('power', r.power_avg, r.power_min, r.power_max),
+        ('load_factor', r.load_factor_avg, r.load_factor_min, r.load_factor_max),
+        ('efficiency', r.efficiency_avg, r.efficiency_min, r.efficiency_max),
+        ('frequency', r.frequency_avg, r.frequency_min, r.frequency_max),
+        ('voltage', r.voltage_avg, r.voltage_min, r.voltage_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Load'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_load_1m r
+CROSS JOIN LATERAL (
+    VALUES
+        ('power', r.power_avg, r.power_min, r.power_max),
+        ('current', r.current_avg, r.current_min, r.current_max),
+        ('power_factor', r.power_factor_avg, r.power_factor_min, r.power_factor_max),
+        ('utilization_rate', r.utilization_rate_avg, r.utilization_rate_min, r.utilization_rate_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Line'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_line_1m r
+CROSS JOIN LATERAL (
+    VALUES
+        ('current', r.current_avg, r.current_min, r.current_max),
+        ('loading', r.loading_avg, r.loading_min, r.loading_max),
+        ('power_flow', r.power_flow_avg, r.power_flow_min, r.power_flow_max),
+        ('power_loss', r.power_loss_avg, r.power_loss_min, r.power_loss_max),
+        ('temperature', r.temperature_avg, r.temperature_min, r.temperature_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Transformer'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_transformer_1m r
+CROSS JOIN LATERAL (
+    VALUES
+        ('loading', r.loading_avg, r.loading_min, r.loading_max),
+        ('power_flow', r.power_flow_avg, r.power_flow_min, r.power_flow_max),
+        ('oil_temperature', r.oil_temperature_avg, r.oil_temperature_min, r.oil_temperature_max),
+        ('winding_temperature', r.winding_temperature_avg, r.winding_temperature_min, r.winding_temperature_max),
+        ('tap_position', r.tap_position_avg, r.tap_position_min, r.tap_position_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL;
+
+CREATE VIEW monitoring.telemetry_1h AS
+SELECT r.bucket AS time, r.element_id, 'Bus'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_bus_1h r
+CROSS JOIN LATERAL (
+    VALUES
+        ('voltage', r.voltage_avg, r.voltage_min, r.voltage_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max),
+        ('voltage_change', r.voltage_change_avg, r.voltage_change_min, r.voltage_change_max),
+        ('frequency', r.frequency_avg, r.frequency_min, r.frequency_max),
+        ('voltage_angle', r.voltage_angle_avg, r.voltage_angle_min, r.voltage_angle_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Generator'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_generator_1h r
+CROSS JOIN LATERAL (
+    VALUES
+        ('power', r.power_avg, r.power_min, r.power_max),
+        ('load_factor', r.load_factor_avg, r.load_factor_min, r.load_factor_max),
+        ('efficiency', r.efficiency_avg, r.efficiency_min, r.efficiency_max),
+        ('frequency', r.frequency_avg, r.frequency_min, r.frequency_max),
+        ('voltage', r.voltage_avg, r.voltage_min, r.voltage_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Load'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_load_1h r
+CROSS JOIN LATERAL (
+    VALUES
+        ('power', r.power_avg, r.power_min, r.power_max),
+        ('current', r.current_avg, r.current_min, r.current_max),
+        ('power_factor', r.power_factor_avg, r.power_factor_min, r.power_factor_max),
+        ('utilization_rate', r.utilization_rate_avg, r.utilization_rate_min, r.utilization_rate_max),
+        ('voltage_level', r.voltage_level_avg, r.voltage_level_min, r.voltage_level_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Line'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_line_1h r
+CROSS JOIN LATERAL (
+    VALUES
+        ('current', r.current_avg, r.current_min, r.current_max),
+        ('loading', r.loading_avg, r.loading_min, r.loading_max),
+        ('power_flow', r.power_flow_avg, r.power_flow_min, r.power_flow_max),
+        ('power_loss', r.power_loss_avg, r.power_loss_min, r.power_loss_max),
+        ('temperature', r.temperature_avg, r.temperature_min, r.temperature_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL
+UNION ALL
+SELECT r.bucket AS time, r.element_id, 'Transformer'::VARCHAR(50) AS element_type,
+    m.metric_name, m.avg_value, m.min_value, m.max_value, r.samples
+FROM monitoring.telemetry_transformer_1h r
+CROSS JOIN LATERAL (
+    VALUES
+        ('loading', r.loading_avg, r.loading_min, r.loading_max),
+        ('power_flow', r.power_flow_avg, r.power_flow_min, r.power_flow_max),
+        ('oil_temperature', r.oil_temperature_avg, r.oil_temperature_min, r.oil_temperature_max),
+        ('winding_temperature', r.winding_temperature_avg, r.winding_temperature_min, r.winding_temperature_max),
+        ('tap_position', r.tap_position_avg, r.tap_position_min, r.tap_position_max)
+) AS m(metric_name, avg_value, min_value, max_value)
+WHERE m.avg_value IS NOT NULL;
@@ -0,0 +1,158 @@
+# telemetry-simulator/alarm_sink.py
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from loguru import logger
+
+from config import settings
+from models import AlarmData
+from database import db_manager
+
+
+class AlarmSink:
+    """Buffers alarm raises and clears and hands them to the database and backend in batches
+
+    Within a flush window alarms are coalesced per (element_id, alarm_type): a later
+    raise replaces the buffered one, a severity update of a still-buffered raise is
+    folded into it, and a clear of a still-buffered alarm turns it into an
+    already-resolved record instead of a separate UPDATE. Severity updates of alarms
+    written earlier change the open alarm in place. A flush issues one COPY, one
+    UPDATE per kind and one socket event however many alarms it carries. Besides
+    the flushes publish() triggers, run() flushes each window once it has elapsed,
+    so alarms buffered by the last transition do not wait for the next one.
+    """
+
+    def __init__(self, ws_client, flush_interval: float = None, max_batch: int = None):
+        self.ws_client = ws_client
+        self.flush_interval = settings.ALARM_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.max_batch = max_batch or settings.ALARM_BATCH_MAX
+
+        self._pending: Dict[Tuple[str, str], AlarmData] = {}
+        self._closed: List[AlarmData] = []
+        self._updates: Dict[Tuple[str, str], AlarmData] = {}
+        self._resolutions: Dict[Tuple[str, str], datetime] = {}
+        self._last_flush = time.monotonic()
+        # Flushes from publish() and the timer go out one at a time, in buffer order
+        self._flush_lock = asyncio.Lock()
+
+        self.stats: Dict[str, Any] = {
+            "flushes": 0,
+            "alarms_written": 0,
+            "updates_written": 0,
+            "resolutions_written": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "last_flush_ms": 0.0
+        }
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._closed) + len(self._updates) + len(self._resolutions)
+
+    def add(self, alarm: AlarmData):
+        """Buffer a raised or escalated alarm"""
+        key = (alarm.element_id, alarm.alarm_type)
+        if key in self._pending:
+            self.stats["coalesced"] += 1
+        self._pending[key] = alarm
+
+    def update(self, alarm: AlarmData):
+        """Buffer a severity change of an element's active alarm"""
+        key = (alarm.element_id, alarm.alarm_type)
+        pending = self._pending.get(key)
+        if pending is not None:
+            # Not written yet: the raise goes out with the new severity, under its own id
+            self._pending[key] = pending.copy(update={
+                "severity": alarm.severity, "message": alarm.message, "actual_value": alarm.actual_value
+            })
+            self.stats["coalesced"] += 1
+            return
+        if key in self._updates:
+            self.stats["coalesced"] += 1
+        self._updates[key] = alarm
+    
+    def resolve(self, element_id: str, alarm_type: str, resolved_at: datetime):
+        """Buffer the clear of an element's active alarm of this type"""
+        key = (element_id, alarm_type)
+        alarm = self._pending.pop(key, None)
+        if alarm is not None:
+            # Raised and cleared inside one window: write it once, already resolved
+            self._closed.append(alarm.copy(update={"is_active": False, "resolved_at": resolved_at}))
+            self.stats["coalesced"] += 1
+        else:
+            self._resolutions[key] = resolved_at
+
+    async def publish(self, alarms: List[AlarmData], resolutions: List[Tuple[str, str, datetime]],
+                      updates: List[AlarmData] = ()):
+        """Buffer one cycle's alarms, severity updates and clears, flushing when the window or batch is full"""
+        for alarm in updates:
+            self.update(alarm)
+        for element_id, alarm_type, resolved_at in resolutions:
+            self.resolve(element_id, alarm_type, resolved_at)
+        for alarm in alarms:
+            self.add(alarm)
+
+        if len(self) >= self.max_batch or time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def run(self):
+        """Flush every flush_interval seconds whether or not new transitions arrive"""
+        if self.flush_interval <= 0:
+            return  # publish() flushes every cycle
+        while True:
+            remaining = self._last_flush + self.flush_interval - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            # A cancelled timer must not lose a batch that was already taken off the buffers
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Write everything buffered so far"""
+        async with self._flush_lock:
+            await self._flush()
+
+    async def _flush(self):
+        self._last_flush = time.monotonic()
+        if not len(self):
+            return
+
+        alarms = self._closed + list(self._pending.values())
+        updates = list(self._updates.values())
+        resolutions = [
+            (element_id, alarm_type, resolved_at)
+            for (element_id, alarm_type), resolved_at in self._resolutions.items()
+        ]
+        self._pending = {}
+        self._closed = []
+        self._updates = {}
+        self._resolutions = {}
+
+        start = time.perf_counter()
+        try:
+            if settings.FIELD_DEVICE_MODE:
+                # The backend API can only create alarms: escalations are reported as new ones
+                # and clears not at all
+                await self.ws_client.submit_alarms_via_api(alarms + updates)
+            else:
+                # Update and resolve the open alarms before inserting, so a re-raise in the
+                # same window is neither changed nor resolved
+                await db_manager.update_alarm_severities(updates)
+                await db_manager.resolve_alarms(resolutions)
+                await db_manager.store_alarms_batch(alarms)
+                await self.ws_client.emit_alarm_batch(alarms, resolutions, updates)
+
+            self.stats["flushes"] += 1
+            self.stats["alarms_written"] += len(alarms)
+            self.stats["updates_written"] += len(updates)
+            self.stats["resolutions_written"] += len(resolutions)
+
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(
+                f"Alarm batch flush failed ({len(alarms)} alarms, {len(updates)} updates, "
+                f"{len(resolutions)} resolutions): {e}"
+            )
+
+        finally:
+            self.stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,284 @@
+# telemetry-simulator/alarms.py
+import numpy as np
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from config import settings
+from models import AlarmData, AlarmSeverity, ElementType
+from engine import CycleResult, ElementBlock, VectorizedEngine
+
+
+# Transition kinds handed to the alarm sinks
+RAISE = "raise"
+UPDATE = "update"  # severity changed while the alarm stays raised
+CLEAR = "clear"
+
+_SEVERITIES = (AlarmSeverity.WARNING, AlarmSeverity.CRITICAL)
+_SEVERITY_CODES = {severity: code for code, severity in enumerate(_SEVERITIES)}
+
+
+class AlarmRule:
+    """One threshold check evaluated against a metric column of an element type"""
+
+    __slots__ = ("alarm_type", "element_type", "threshold_key", "scale", "high", "hysteresis",
+                 "severity", "critical_above", "value", "message")
+
+    def __init__(self, alarm_type: str, element_type: ElementType, threshold_key: str,
+                 value: Callable[[Dict[str, np.ndarray]], np.ndarray],
+                 message: Callable[[Dict[str, np.ndarray], int], str],
+                 high: bool = True, hysteresis: float = 0.0, scale: float = 1.0,
+                 severity: AlarmSeverity = AlarmSeverity.WARNING, critical_above: Optional[float] = None):
+        self.alarm_type = alarm_type
+        self.element_type = element_type
+        self.threshold_key = threshold_key  # key in GridSimulator.alarm_thresholds / alarm_<key> property
+        self.scale = scale  # threshold units -> metric units (e.g. 0.9 -> 90 %)
+        self.high = high  # raise above (True) or below (False) the threshold
+        self.hysteresis = hysteresis  # clear only once the value is this far back inside the limit
+        self.severity = severity
+        self.critical_above = critical_above  # escalate to critical beyond this metric value
+        self.value = value
+        self.message = message
+
+
+def _metric(name: str) -> Callable[[Dict[str, np.ndarray]], np.ndarray]:
+    return lambda metrics: metrics[name]
+
+
+def _voltage_ratio(metrics: Dict[str, np.ndarray]) -> np.ndarray:
+    ratio = np.full(metrics["voltage"].shape, np.nan)
+    np.divide(metrics["voltage"], metrics["voltage_level"], out=ratio, where=metrics["voltage_level"] > 0)
+    return ratio
+
+
+def _voltage_message(label: str) -> Callable[[Dict[str, np.ndarray], int], str]:
+    def message(metrics: Dict[str, np.ndarray], i: int) -> str:
+        voltage = metrics["voltage"][i]
+        deviation = (voltage / metrics["voltage_level"][i] - 1) * 100
+        return f"{label} voltage: {voltage:.2f}kV ({deviation:+.1f}%)"
+    return message
+
+
+ALARM_RULES = (
+    AlarmRule("HIGH_VOLTAGE", ElementType.BUS, "voltage_high", _voltage_ratio, _voltage_message("High"),
+              hysteresis=0.01),
+    AlarmRule("LOW_VOLTAGE", ElementType.BUS, "voltage_low", _voltage_ratio, _voltage_message("Low"),
+              high=False, hysteresis=0.01, severity=AlarmSeverity.CRITICAL),
+    AlarmRule("HIGH_FREQUENCY", ElementType.GENERATOR, "frequency_high", _metric("frequency"),
+              lambda m, i: f"High frequency: {m['frequency'][i]:.2f}Hz", hysteresis=0.1),
+    AlarmRule("LOW_FREQUENCY", ElementType.GENERATOR, "frequency_low", _metric("frequency"),
+              lambda m, i: f"Low frequency: {m['frequency'][i]:.2f}Hz", high=False, hysteresis=0.1),
+    AlarmRule("GENERATOR_OVERLOAD", ElementType.GENERATOR, "generator_overload", _metric("load_factor"),
+              lambda m, i: f"Generator near capacity: {m['load_factor'][i]:.1f}%", hysteresis=3.0),
+    AlarmRule("LINE_OVERLOAD", ElementType.LINE, "line_overload", _metric("loading"),
+              lambda m, i: f"Line overload: {m['loading'][i]:.1f}%", scale=100, hysteresis=3.0,
+              critical_above=95.0),
+    AlarmRule("HIGH_TEMPERATURE", ElementType.LINE, "temperature_high", _metric("temperature"),
+              lambda m, i: f"High conductor temperature: {m['temperature'][i]:.1f}°C", hysteresis=3.0),
+    AlarmRule("HIGH_OIL_TEMP", ElementType.TRANSFORMER, "oil_temp_high", _metric("oil_temperature"),
+              lambda m, i: f"High oil temperature: {m['oil_temperature'][i]:.1f}°C", hysteresis=3.0),
+    AlarmRule("TRANSFORMER_OVERLOAD", ElementType.TRANSFORMER, "transformer_overload", _metric("loading"),
+              lambda m, i: f"Transformer overload: {m['loading'][i]:.1f}%", hysteresis=3.0),
+)
+
+
+class AlarmTransition:
+    """An alarm raising, changing severity or clearing on one element"""
+
+    __slots__ = ("kind", "element_id", "element_type", "alarm_type", "severity", "message",
+                 "value", "threshold", "timestamp")
+
+    def __init__(self, kind: str, element_id: str, element_type: ElementType, alarm_type: str,
+                 severity: AlarmSeverity, message: str, value: float, threshold: float, timestamp: datetime):
+        self.kind = kind
+        self.element_id = element_id
+        self.element_type = element_type
+        self.alarm_type = alarm_type
+        self.severity = severity
+        self.message = message
+        self.value = value
+        self.threshold = threshold
+        self.timestamp = timestamp
+
+    def to_alarm(self) -> AlarmData:
+        """AlarmData record for a raise or update transition"""
+        return AlarmData(
+            id=str(uuid4()),
+            element_id=self.element_id,
+            element_type=self.element_type,
+            alarm_type=self.alarm_type,
+            severity=self.severity,
+            message=self.message,
+            created_at=self.timestamp,
+            threshold_value=self.threshold,
+            actual_value=self.value
+        )
+
+
+class AlarmEngine:
+    """Evaluates every alarm rule against a cycle's metric arrays in one vectorized pass per rule
+
+    Raise requires the limit to be violated for ALARM_RAISE_DEADTIME seconds of simulated
+    time; clear requires the value to be back inside limit minus hysteresis for
+    ALARM_CLEAR_DEADTIME seconds. Per-element state lives in the engine blocks so it
+    survives topology syncs.
+    """
+
+    def __init__(self, engine: VectorizedEngine, thresholds: Dict[str, float], base_values: Dict[str, Dict],
+                 rules: Tuple[AlarmRule, ...] = ALARM_RULES):
+        self.engine = engine
+        self.thresholds = thresholds
+        self.base_values = base_values
+        self.raise_deadtime = settings.ALARM_RAISE_DEADTIME
+        self.clear_deadtime = settings.ALARM_CLEAR_DEADTIME
+        self.rules: Dict[ElementType, List[AlarmRule]] = {}
+        for rule in rules:
+            self.rules.setdefault(rule.element_type, []).append(rule)
+
+        # Per-element thresholds per (block, rule), rebuilt when a block is replaced or invalidated
+        self._threshold_cache: Dict[Tuple[ElementType, str], Tuple[ElementBlock, np.ndarray]] = {}
+
+    def invalidate(self):
+        """Drop cached per-element thresholds (after topology or threshold changes)"""
+        self._threshold_cache.clear()
+
+    def _element_thresholds(self, block: ElementBlock, rule: AlarmRule) -> np.ndarray:
+        """Class threshold, overridden per element by an alarm_<key> property"""
+        key = (block.element_type, rule.alarm_type)
+        cached = self._threshold_cache.get(key)
+        if cached is not None and cached[0] is block:
+            return cached[1]
+
+        default = self.thresholds[rule.threshold_key]
+        property_name = f"alarm_{rule.threshold_key}"
+        values = np.array([
+            self.base_values[element_id]["properties"].get(property_name, default)
+            for element_id in block.ids
+        ], dtype=np.float64) * rule.scale
+        self._threshold_cache[key] = (block, values)
+        return values
+
+    def evaluate(self, result: CycleResult, timestamp: datetime) -> List[AlarmTransition]:
+        """Advance alarm state for one cycle result and return its transitions"""
+        rules = self.rules.get(result.element_type)
+        block = self.engine.blocks.get(result.element_type)
+        if not rules or block is None or len(result) == 0:
+            return []
+
+        now = timestamp.timestamp()
+        rows = result.rows
+        transitions = []
+
+        for rule in rules:
+            value = rule.value(result.metrics)
+            threshold = self._element_thresholds(block, rule)[rows]
+
+            # NaN values never violate and never clear
+            with np.errstate(invalid="ignore"):
+                if rule.high:
+                    violating = value > threshold
+                    inside = value < threshold - rule.hysteresis
+                else:
+                    violating = value < threshold
+                    inside = value > threshold + rule.hysteresis
+
+            severity_state = block.state_array(f"alarm.{rule.alarm_type}.severity")
+            pending_state = block.state_array(f"alarm.{rule.alarm_type}.pending")
+            clearing_state = block.state_array(f"alarm.{rule.alarm_type}.clearing")
+
+            current = severity_state[rows]
+            raised = ~np.isnan(current)
+
+            # Start (or keep) the deadtime timers while the condition holds, reset them otherwise
+            pending = pending_state[rows]
+            pending = np.where(violating & ~raised, np.where(np.isnan(pending), now, pending), np.nan)
+            clearing = clearing_state[rows]
+            clearing = np.where(raised & inside, np.where(np.isnan(clearing), now, clearing), np.nan)
+
+            raise_mask = violating & ~raised & (now - pending >= self.raise_deadtime)
+            clear_mask = raised & inside & (now - clearing >= self.clear_deadtime)
+
+            severity = np.full(rows.size, _SEVERITY_CODES[rule.severity], dtype=np.float64)
+            if rule.critical_above is not None:
+                severity[value > rule.critical_above] = _SEVERITY_CODES[AlarmSeverity.CRITICAL]
+            update_mask = raised & violating & (severity != current)
+
+            current = np.where(raise_mask | update_mask, severity, current)
+            current[clear_mask] = np.nan
+            severity_state[rows] = current
+            pending_state[rows] = np.where(raise_mask, np.nan, pending)
+            clearing_state[rows] = np.where(clear_mask, np.nan, clearing)
+
+            for kind, mask in ((RAISE, raise_mask), (UPDATE, update_mask), (CLEAR, clear_mask)):
+                for i in np.flatnonzero(mask):
+                    code = int(severity[i]) if kind != CLEAR else _SEVERITY_CODES[rule.severity]
+                    transitions.append(AlarmTransition(
+                        kind=kind,
+                        element_id=result.element_ids[i],
+                        element_type=result.element_type,
+                        alarm_type=rule.alarm_type,
+                        severity=_SEVERITIES[code],
+                        message=rule.message(result.metrics, i) if kind != CLEAR
+                        else f"{rule.alarm_type} cleared",
+                        value=float(value[i]),
+                        threshold=float(threshold[i]),
+                        timestamp=timestamp
+                    ))
+
+        return transitions
+
+
+class ActiveAlarmIndex:
+    """Bounded, expiring index of recently raised alarms per (element, alarm type)
+
+    Counts the distinct alarms raised within the active window; a repeat raise of
+    the same alarm refreshes its entry instead of counting twice. Entries expire in
+    raise order from a FIFO queue, so insert and expiry are amortized O(1) and
+    memory is bounded by the active window and the optional entry cap.
+    """
+
+    def __init__(self, active_window: float, max_entries: int = 0):
+        self.active_window = active_window
+        self.max_entries = max_entries
+        self._raised: Dict[Tuple[str, str], float] = {}
+        self._expiry: Deque[Tuple[float, Tuple[str, str]]] = deque()
+        self._latest = float("-inf")
+
+    def __len__(self) -> int:
+        return len(self._raised)
+
+    def _expire(self, now: float):
+        cutoff = now - self.active_window
+        expiry = self._expiry
+        while expiry and (expiry[0][0] <= cutoff or (self.max_entries and len(self._raised) > self.max_entries)):
+            raised, key = expiry.popleft()
+            # Skip queue entries superseded by a later raise of the same alarm
+            if self._raised.get(key) == raised:
+                del self._raised[key]
+
+    def record(self, element_id: str, alarm_type: str, timestamp: datetime):
+        """Record a raised alarm"""
+        now = timestamp.timestamp()
+
+        # Simulated time moved backwards (clock reconfigured): the window restarts
+        if now < self._latest:
+            self.clear()
+        self._latest = now
+
+        key = (element_id, alarm_type)
+        self._raised[key] = now
+        self._expiry.append((now, key))
+        self._expire(now)
+
+    def active_count(self, timestamp: datetime) -> int:
+        """Distinct alarms raised within the active window"""
+        now = timestamp.timestamp()
+        if now >= self._latest:
+            self._expire(now)
+        return len(self._raised)
+
+    def clear(self):
+        self._raised.clear()
+        self._expiry.clear()
+        self._latest = float("-inf")
@@ -0,0 +1,263 @@
+# telemetry-simulator/backfill.py
+import argparse
+import asyncio
+import math
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from multiprocessing import get_context
+from typing import Dict, List, Tuple
+
+import asyncpg
+from loguru import logger
+
+from config import settings
+from database import db_manager
+from models import GridElement
+from telemetry_batch import TelemetryBatch
+from telemetry_writer import table_records
+from sim_clock import ClockMode
+
+
+EPOCH = datetime(1970, 1, 1)
+
+# Upper bound on warm-up cycles per window; longer warm-ups take coarser steps
+WARMUP_MAX_CYCLES = 360
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """Timezone-aware timestamps converted to the naive UTC the simulator runs on"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return naive_utc(datetime.fromisoformat(value))
+
+
+async def _fetch_chunk_interval() -> timedelta:
+    """Read the chunk_time_interval of monitoring.telemetry (TimescaleDB default is 7 days)"""
+    conn = await asyncpg.connect(settings.POSTGRES_URL)
+    try:
+        interval = await conn.fetchval("""
+            SELECT time_interval FROM timescaledb_information.dimensions
+            WHERE hypertable_schema = 'monitoring' AND hypertable_name = 'telemetry'
+              AND column_name = 'time'
+        """)
+    finally:
+        await conn.close()
+    return interval or timedelta(days=7)
+
+
+def plan_windows(start: datetime, end: datetime, chunk_interval: timedelta,
+                 workers: int) -> List[Tuple[datetime, datetime]]:
+    """Split the range at hypertable chunk boundaries so each worker COPYs into its own chunk"""
+    windows = []
+    chunk_seconds = chunk_interval.total_seconds()
+    cursor = start
+    while cursor < end:
+        chunk_index = int((cursor - EPOCH).total_seconds() // chunk_seconds)
+        boundary = EPOCH + timedelta(seconds=(chunk_index + 1) * chunk_seconds)
+        window_end = min(boundary, end)
+        windows.append((cursor, window_end))
+        cursor = window_end
+
+    # Short ranges span fewer chunks than workers: split windows further to keep every core busy
+    if len(windows) < workers:
+        pieces = -(-workers // len(windows))
+        split = []
+        for window_start, window_end in windows:
+            step = (window_end - window_start) / pieces
+            for i in range(pieces):
+                piece_end = window_end if i == pieces - 1 else window_start + step * (i + 1)
+                if piece_end > window_start + step * i:
+                    split.append((window_start + step * i, piece_end))
+        windows = split
+
+    return windows
+
+
+def _backfill_window(window_index: int, element_data: List[Dict], window_start: datetime,
+                     window_end: datetime, resolution: float, copy_batch_rows: int, progress) -> int:
+    """Worker process entry point: generate and COPY one time window"""
+    return asyncio.run(_write_window(
+        window_index, element_data, window_start, window_end, resolution, copy_batch_rows, progress
+    ))
+
+
+def warm_up(simulator, window_start: datetime, resolution: float, warmup: float):
+    """Run the models unwritten up to window_start
+
+    Windows are generated independently, so without this every window would
+    start with fresh thermal and ramp state instead of where a continuous run
+    would be at that time.
+    """
+    cycles = min(WARMUP_MAX_CYCLES, math.ceil(warmup / resolution)) if warmup > 0 else 0
+    simulator.clock.configure(mode=ClockMode.FREE_RUN, start_time=window_start - timedelta(seconds=warmup))
+    for _ in range(cycles):
+        simulator.engine.run_cycle(simulator._cycle_context())
+        simulator.clock.advance(warmup / cycles)
+    # Land exactly on the window start whatever the float steps added up to
+    simulator.clock.configure(start_time=window_start)
+
+
+async def _write_window(window_index: int, element_data: List[Dict], window_start: datetime,
+                        window_end: datetime, resolution: float, copy_batch_rows: int, progress) -> int:
+    """Drive the simulator's models over a window on a discrete clock and bulk COPY the rows"""
+    # Imported here so the coordinator process never builds a simulator it does not use
+    from simulator import GridSimulator
+
+    # Each window gets its own random shard so seeded backfills replay identically
+    simulator = GridSimulator(shard_index=window_index)
+    simulator.elements = {data["id"]: GridElement(**data) for data in element_data}
+    simulator._initialize_base_values()
+    simulator.engine.load(simulator.elements, simulator.base_values)
+    warm_up(simulator, window_start, resolution, settings.BACKFILL_WARMUP_SECONDS)
+
+    conn = await asyncpg.connect(settings.POSTGRES_URL)
+    total_rows = 0
+    buffered = 0
+    buffers = {}
+
+    async def flush():
+        nonlocal buffers, buffered, total_rows
+        for table, (columns, records) in buffers.items():
+            await conn.copy_records_to_table(
+                table, schema_name="monitoring",
+                columns=columns, records=records
+            )
+        if buffered:
+            total_rows += buffered
+            progress.put(buffered)
+        buffers, buffered = {}, 0
+
+    try:
+        while simulator.clock.now() < window_end:
+            results = simulator.engine.run_cycle(simulator._cycle_context())
+            batch = TelemetryBatch.from_results(results, simulator.clock.now())
+            for table, columns, records, _ in table_records(batch, settings.TELEMETRY_LAYOUT):
+                buffers.setdefault(table, (columns, []))[1].extend(records)
+                buffered += len(records)
+
+            if buffered >= copy_batch_rows:
+                await flush()
+
+            simulator.clock.advance(resolution)
+
+        await flush()
+
+    finally:
+        await conn.close()
+
+    return total_rows
+
+
+async def load_topology() -> List[Dict]:
+    """Load the grid topology once in the coordinator and ship plain dicts to the workers"""
+    await db_manager.initialize()
+    try:
+        elements = await db_manager.get_grid_elements()
+    finally:
+        await db_manager.close()
+    return [element.dict() for element in elements]
+
+
+def run_backfill(start: datetime, end: datetime, resolution: float, workers: int, copy_batch_rows: int):
+    """Generate [start, end) at the given resolution with parallel chunk workers"""
+    start, end = naive_utc(start), naive_utc(end)
+    element_data = asyncio.run(load_topology())
+    if not element_data:
+        logger.error("No grid elements loaded, nothing to backfill")
+        return
+
+    chunk_interval = asyncio.run(_fetch_chunk_interval())
+    windows = plan_windows(start, end, chunk_interval, workers)
+
+    logger.info(
+        f"Backfilling {len(element_data)} elements from {start.isoformat()} to {end.isoformat()} "
+        f"at {resolution}s resolution: {len(windows)} windows on {workers} workers "
+        f"(chunk interval {chunk_interval})"
+    )
+
+    context = get_context("spawn")
+    manager = context.Manager()
+    progress = manager.Queue()
+
+    started = time.monotonic()
+    last_report = started
+    total_rows = 0
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        futures = [
+            executor.submit(_backfill_window, window_index, element_data, window_start, window_end,
+                            resolution, copy_batch_rows, progress)
+            for window_index, (window_start, window_end) in enumerate(windows)
+        ]
+
+        pending = set(futures)
+        while pending:
+            try:
+                total_rows += progress.get(timeout=1)
+                while True:
+                    total_rows += progress.get_nowait()
+            except queue.Empty:
+                pass
+
+            pending = {future for future in pending if not future.done()}
+
+            now = time.monotonic()
+            if now - last_report >= 5:
+                elapsed = now - started
+                logger.info(
+                    f"Progress: {len(futures) - len(pending)}/{len(futures)} windows, "
+                    f"{total_rows:,} rows, {total_rows / elapsed:,.0f} rows/s"
+                )
+                last_report = now
+
+        # Worker return values are authoritative and re-raise any worker failure
+        written = sum(future.result() for future in futures)
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Backfill completed: {written:,} rows in {elapsed:.1f}s "
+        f"({written / elapsed:,.0f} rows/s, {written / elapsed * 60:,.0f} rows/min)"
+    )
+    manager.shutdown()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Backfill historical telemetry into monitoring.telemetry")
+    parser.add_argument("--start", required=True, type=_parse_timestamp,
+                        help="Start of the range (ISO 8601, inclusive; UTC unless an offset is given)")
+    parser.add_argument("--end", required=True, type=_parse_timestamp,
+                        help="End of the range (ISO 8601, exclusive; UTC unless an offset is given)")
+    parser.add_argument("--resolution", type=float, default=settings.UPDATE_INTERVAL,
+                        help="Seconds between samples (default: UPDATE_INTERVAL)")
+    parser.add_argument("--workers", type=int, default=settings.BACKFILL_WORKERS or os.cpu_count(),
+                        help="Parallel chunk workers (default: BACKFILL_WORKERS or CPU count)")
+    parser.add_argument("--copy-batch-rows", type=int, default=settings.BACKFILL_COPY_BATCH_ROWS,
+                        help="Rows per COPY round trip")
+    args = parser.parse_args(argv)
+
+    if args.end <= args.start:
+        parser.error("--end must be after --start")
+    if args.resolution <= 0:
+        parser.error("--resolution must be positive")
+    return args
+
+
+if __name__ == "__main__":
+    from main import setup_logging
+
+    setup_logging()
+    args = parse_args()
+
+    try:
+        run_backfill(args.start, args.end, args.resolution, max(1, args.workers), args.copy_batch_rows)
+    except Exception as e:
+        logger.error(f"Backfill failed: {e}")
+        sys.exit(1)
@@ -1,12 +1,21 @@
 # telemetry-simulator/database.py
 import asyncio
 import asyncpg
+from contextlib import suppress
+from datetime import datetime
 import redis.asyncio as redis
 from neo4j import AsyncGraphDatabase
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from loguru import logger
 from config import settings
 from models import GridElement, TelemetryMetrics, AlarmData
+from telemetry_batch import TelemetryBatch
+from telemetry_writer import TelemetryCopyWriter
+from timescale_policies import TimescalePolicyManager
+from redis_cache import TelemetryCacheWriter
+from telemetry_streams import TelemetryStreamPublisher
+from telemetry_spool import TelemetrySpool
+from health_monitor import HealthMonitor
 
 
 class DatabaseManager:
@@ -21,6 +30,12 @@ class DatabaseManager:
             "neo4j": False,
             "redis": False
         }
+        self.telemetry_writer = TelemetryCopyWriter(self)
+        self.timescale = TimescalePolicyManager(self)
+        self.telemetry_cache = TelemetryCacheWriter(self)
+        self.telemetry_stream = TelemetryStreamPublisher(self)
+        self.telemetry_spool = TelemetrySpool(self) if settings.TELEMETRY_SPOOL_ENABLED else None
+        self.health = HealthMonitor(self)
     
     async def initialize(self):
         """Initialize all database connections"""
@@ -52,6 +67,20 @@ class DatabaseManager:
             logger.error(f"PostgreSQL connection failed: {e}")
             self._connection_status["postgresql"] = False
     
+    async def reconnect_postgresql(self) -> bool:
+        """Replace the pool after an outage; returns whether PostgreSQL is reachable again"""
+        if self.pg_pool:
+            self.pg_pool.terminate()
+            self.pg_pool = None
+        await self._connect_postgresql()
+        return self._connection_status["postgresql"]
+    
+    def mark_postgresql_down(self):
+        """Record a lost PostgreSQL connection so writes spool until the reconnect succeeds"""
+        if self._connection_status["postgresql"]:
+            logger.warning("PostgreSQL connection lost")
+        self._connection_status["postgresql"] = False
+    
     async def _connect_neo4j(self):
         """Connect to Neo4j graph database"""
         try:
@@ -74,6 +103,15 @@ class DatabaseManager:
             logger.error(f"Neo4j connection failed: {e}")
             self._connection_status["neo4j"] = False
     
+    async def reconnect_neo4j(self) -> bool:
+        """Replace the driver after an outage; returns whether Neo4j is reachable again"""
+        if self.neo4j_driver:
+            with suppress(Exception):
+                await self.neo4j_driver.close()
+            self.neo4j_driver = None
+        await self._connect_neo4j()
+        return self._connection_status["neo4j"]
+    
     async def _connect_redis(self):
         """Connect to Redis cache"""
         try:
@@ -94,6 +132,15 @@ class DatabaseManager:
             logger.error(f"Redis connection failed: {e}")
             self._connection_status["redis"] = False
     
+    async def reconnect_redis(self) -> bool:
+        """Replace the client after an outage; returns whether Redis is reachable again"""
+        if self.redis_client:
+            with suppress(Exception):
+                await self.redis_client.close()
+            self.redis_client = None
+        await self._connect_redis()
+        return self._connection_status["redis"]
+    
     async def get_grid_elements(self) -> List[GridElement]:
         """Fetch all grid elements from Neo4j"""
         if not self._connection_status["neo4j"]:
@@ -111,26 +158,7 @@ class DatabaseManager:
                 """)
                 
                 async for record in result:
-                    labels = record["labels"]
-                    element_type = next((label for label in labels if label != "Element"), "Unknown")
-                    
-                    properties = dict(record["properties"])
-                    
-                    element = GridElement(
-                        id=record["id"],
-                        name=record["name"],
-                        element_type=element_type,
-                        properties=properties,
-                        voltage_level=properties.get("voltage_level"),
-                        capacity=properties.get("capacity"),
-                        output=properties.get("output"),
-                        demand=properties.get("demand"),
-                        rating=properties.get("rating"),
-                        resistance=properties.get("resistance"),
-                        reactance=properties.get("reactance"),
-                        tap_ratio=properties.get("tap_ratio"),
-                    )
-                    elements.append(element)
+                    elements.append(self._record_to_element(record))
                 
                 logger.info(f"Loaded {len(elements)} grid elements from Neo4j")
                 
@@ -139,6 +167,80 @@ class DatabaseManager:
         
         return elements
     
+    @staticmethod
+    def _record_to_element(record) -> GridElement:
+        """Build a GridElement from an (id, name, labels, properties) Neo4j record"""
+        labels = record["labels"]
+        element_type = next((label for label in labels if label != "Element"), "Unknown")
+        
+        properties = dict(record["properties"])
+        
+        return GridElement(
+            id=record["id"],
+            name=record["name"],
+            element_type=element_type,
+            properties=properties,
+            voltage_level=properties.get("voltage_level"),
+            capacity=properties.get("capacity"),
+            output=properties.get("output"),
+            demand=properties.get("demand"),
+            rating=properties.get("rating"),
+            resistance=properties.get("resistance"),
+            reactance=properties.get("reactance"),
+            tap_ratio=properties.get("tap_ratio"),
+        )
+    
+    async def get_changed_elements(self, since: str) -> Optional[List[GridElement]]:
+        """Fetch elements created or updated at or after an ISO timestamp (None on failure)"""
+        if not self._connection_status["neo4j"]:
+            return None
+        
+        try:
+            async with self.neo4j_driver.session() as session:
+                result = await session.run("""
+                    MATCH (n:Element)
+                    WHERE coalesce(n.updated_at, n.created_at, '') >= $since
+                    RETURN n.id as id, n.name as name, labels(n) as labels,
+                           properties(n) as properties
+                """, since=since)
+                return [self._record_to_element(record) async for record in result]
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch changed grid elements: {e}")
+            return None
+    
+    async def get_topology_fingerprint(self) -> Optional[Dict[str, Any]]:
+        """Element count and latest change stamp, a cheap check of whether the graph changed (None on failure)"""
+        if not self._connection_status["neo4j"]:
+            return None
+        
+        try:
+            async with self.neo4j_driver.session() as session:
+                result = await session.run("""
+                    MATCH (n:Element)
+                    RETURN count(n) as count, max(coalesce(n.updated_at, n.created_at, '')) as version
+                """)
+                record = await result.single()
+                return {"count": record["count"], "version": str(record["version"] or "")}
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch topology fingerprint: {e}")
+            return None
+    
+    async def get_element_ids(self) -> Optional[set]:
+        """Fetch the ids of all elements, used to detect deletions (None on failure)"""
+        if not self._connection_status["neo4j"]:
+            return None
+        
+        try:
+            async with self.neo4j_driver.session() as session:
+                result = await session.run("MATCH (n:Element) RETURN n.id as id")
+                return {record["id"] async for record in result}
+            
+        except Exception as e:
+            logger.error(f"Failed to fetch grid element ids: {e}")
+            return None
+    
     async def store_telemetry(self, metrics: TelemetryMetrics):
         """Store telemetry data in PostgreSQL TimescaleDB"""
         if not self._connection_status["postgresql"]:
@@ -169,36 +271,17 @@ class DatabaseManager:
             except Exception as e:
                 logger.error(f"Failed to store telemetry for {metrics.element_id}: {e}")
     
-    async def store_telemetry_batch(self, metrics_list: List[TelemetryMetrics]):
-        """Store multiple telemetry measurements in batch"""
-        if not self._connection_status["postgresql"] or not metrics_list:
+    async def store_telemetry_batch(self, batch: TelemetryBatch):
+        """Store one cycle's telemetry, one row per element and metric, through the COPY writer"""
+        # Also while PostgreSQL is down: the writer spools what it cannot write
+        if not batch:
             return
         
-        async with self.pg_pool.acquire() as conn:
-            try:
-                all_measurements = []
-                for metrics in metrics_list:
-                    for field, value in metrics.dict().items():
-                        if value is not None and field not in ['timestamp', 'element_id', 'element_type', 'status']:
-                            all_measurements.append((
-                                metrics.timestamp,
-                                metrics.element_id,
-                                metrics.element_type.value,
-                                field,
-                                float(value) if isinstance(value, (int, float)) else str(value)
-                            ))
-                
-                if all_measurements:
-                    await conn.executemany("""
-                        INSERT INTO monitoring.telemetry 
-                        (time, element_id, element_type, metric_name, metric_value)
-                        VALUES ($1, $2, $3, $4, $5)
-                    """, all_measurements)
-                    
-                    logger.debug(f"Stored {len(all_measurements)} telemetry measurements")
-                
-            except Exception as e:
-                logger.error(f"Failed to store telemetry batch: {e}")
+        try:
+            await self.telemetry_writer.write(batch)
+            
+        except Exception as e:
+            logger.error(f"Failed to store telemetry batch: {e}")
     
     async def store_alarm(self, alarm: AlarmData):
         """Store alarm in PostgreSQL"""
@@ -223,72 +306,99 @@ class DatabaseManager:
             except Exception as e:
                 logger.error(f"Failed to store alarm: {e}")
     
-    async def cache_latest_telemetry(self, element_id: str, metrics: TelemetryMetrics):
+    async def store_alarms_batch(self, alarms: List[AlarmData]):
+        """Store many alarms with a single COPY round trip"""
+        if not self._connection_status["postgresql"] or not alarms:
+            return
+        
+        async with self.pg_pool.acquire() as conn:
+            try:
+                await conn.copy_records_to_table(
+                    "alarms", schema_name="monitoring",
+                    columns=["id", "element_id", "element_type", "alarm_type", "severity", "message",
+                             "is_active", "is_acknowledged", "created_at", "resolved_at"],
+                    records=[(
+                        alarm.id, alarm.element_id, alarm.element_type.value,
+                        alarm.alarm_type, alarm.severity.value, alarm.message,
+                        alarm.is_active, alarm.is_acknowledged, alarm.created_at, alarm.resolved_at
+                    ) for alarm in alarms]
+                )
+                
+                logger.debug(f"Stored {len(alarms)} alarms")
+                
+            except Exception as e:
+                logger.error(f"Failed to store alarm batch: {e}")
+    
+    async def update_alarm_severities(self, alarms: List[AlarmData]):
+        """Change severity and message of the active alarms matching each (element_id, alarm_type)"""
+        if not self._connection_status["postgresql"] or not alarms:
+            return
+        
+        async with self.pg_pool.acquire() as conn:
+            try:
+                await conn.execute("""
+                    UPDATE monitoring.alarms AS a
+                    SET severity = u.severity, message = u.message
+                    FROM unnest($1::text[], $2::text[], $3::text[], $4::text[])
+                         AS u(element_id, alarm_type, severity, message)
+                    WHERE a.element_id = u.element_id AND a.alarm_type = u.alarm_type AND a.is_active
+                """, [alarm.element_id for alarm in alarms], [alarm.alarm_type for alarm in alarms],
+                    [alarm.severity.value for alarm in alarms], [alarm.message for alarm in alarms])
+                
+            except Exception as e:
+                logger.error(f"Failed to update alarm severities: {e}")
+    
+    async def resolve_alarms(self, resolutions: List[Tuple[str, str, datetime]]):
+        """Resolve the active alarms for many (element_id, alarm_type, resolved_at) in one statement"""
+        if not self._connection_status["postgresql"] or not resolutions:
+            return
+        
+        element_ids, alarm_types, resolved_at = (list(column) for column in zip(*resolutions))
+        async with self.pg_pool.acquire() as conn:
+            try:
+                await conn.execute("""
+                    UPDATE monitoring.alarms AS a
+                    SET is_active = false, resolved_at = r.resolved_at
+                    FROM unnest($1::text[], $2::text[], $3::timestamptz[])
+                         AS r(element_id, alarm_type, resolved_at)
+                    WHERE a.element_id = r.element_id AND a.alarm_type = r.alarm_type AND a.is_active
+                """, element_ids, alarm_types, resolved_at)
+                
+            except Exception as e:
+                logger.error(f"Failed to resolve alarms: {e}")
+    
+    async def cache_latest_telemetry(self, batch: TelemetryBatch):
         """Cache latest telemetry in Redis for quick access"""
         if not self._connection_status["redis"]:
             return
         
-        try:
-            cache_key = f"telemetry:{element_id}"
-            cache_data = {
-                "timestamp": metrics.timestamp.isoformat(),
-                "status": metrics.status.value,
-                **{k: v for k, v in metrics.dict().items() 
-                   if v is not None and k not in ['timestamp', 'element_id', 'element_type', 'status']}
-            }
-            
-            await self.redis_client.hset(cache_key, mapping=cache_data)
-            await self.redis_client.expire(cache_key, 3600)  # 1 hour TTL
-            
-        except Exception as e:
-            logger.error(f"Failed to cache telemetry for {element_id}: {e}")
+        await self.telemetry_cache.write(batch)
+    
+    async def publish_telemetry_stream(self, batch: TelemetryBatch):
+        """Append a cycle to the per-type Redis Streams read by the ingest consumer groups"""
+        if not self._connection_status["redis"] or not batch:
+            return
+        
+        await self.telemetry_stream.publish(batch)
     
     async def get_connection_status(self) -> Dict[str, bool]:
         """Get status of all database connections"""
         return self._connection_status.copy()
     
     async def health_check(self) -> Dict[str, Any]:
-        """Perform health check on all connections"""
-        health = {}
-        
-        # Test PostgreSQL
-        try:
-            if self.pg_pool:
-                async with self.pg_pool.acquire() as conn:
-                    await conn.fetchval("SELECT 1")
-                health["postgresql"] = {"status": "healthy", "latency_ms": 0}
-            else:
-                health["postgresql"] = {"status": "disconnected"}
-        except Exception as e:
-            health["postgresql"] = {"status": "unhealthy", "error": str(e)}
-        
-        # Test Neo4j
-        try:
-            if self.neo4j_driver:
-                async with self.neo4j_driver.session() as session:
-                    await session.run("RETURN 1")
-                health["neo4j"] = {"status": "healthy", "latency_ms": 0}
-            else:
-                health["neo4j"] = {"status": "disconnected"}
-        except Exception as e:
-            health["neo4j"] = {"status": "unhealthy", "error": str(e)}
-        
-        # Test Redis
-        try:
-            if self.redis_client:
-                await self.redis_client.ping()
-                health["redis"] = {"status": "healthy", "latency_ms": 0}
-            else:
-                health["redis"] = {"status": "disconnected"}
-        except Exception as e:
-            health["redis"] = {"status": "unhealthy", "error": str(e)}
-        
-        return health
+        """Latest health of every connection, as cached by the health monitor"""
+        if not self.health.results:
+            # Before the monitor's first round
+            await self.health.check()
+        return self.health.results
     
     async def close(self):
         """Close all database connections"""
+        await self.telemetry_writer.flush()
         if self.pg_pool:
             await self.pg_pool.close()
+        if self.telemetry_spool:
+            self.telemetry_spool.close()
         
         if self.neo4j_driver:
             await self.neo4j_driver.close()
@@ -0,0 +1,581 @@
+# telemetry-simulator/engine.py
+import numpy as np
+from loguru import logger
+from typing import Dict, List, Optional, Callable, Union
+
+from config import settings
+from models import GridElement, ElementType, ElementStatus
+from rng import RandomStreams
+from power_flow import DCPowerFlow, PowerFlowSolution
+import thermal
+
+
+# Generator fuel classes (stored as small ints in the struct-of-arrays layout)
+FUEL_THERMAL = 0
+FUEL_SOLAR = 1
+FUEL_WIND = 2
+
+# Load priority classes
+PRIORITY_HIGH = 0
+PRIORITY_MEDIUM = 1
+PRIORITY_LOW = 2
+
+_FUEL_CODES = {"solar": FUEL_SOLAR, "wind": FUEL_WIND}
+_PRIORITY_CODES = {"high": PRIORITY_HIGH, "medium": PRIORITY_MEDIUM, "low": PRIORITY_LOW}
+
+# Load factor noise applied per element (matches the scalar load curve model)
+LOAD_FACTOR_NOISE = 0.02
+
+# Injections must be known before the network is solved, so devices are simulated first
+CYCLE_ORDER = (
+    ElementType.GENERATOR, ElementType.LOAD,
+    ElementType.BUS, ElementType.LINE, ElementType.TRANSFORMER,
+)
+DEVICE_TYPES = (ElementType.GENERATOR, ElementType.LOAD)
+
+
+class CycleContext:
+    """System-wide inputs shared by every element during one cycle"""
+
+    __slots__ = ("load_factor", "solar_factor", "wind_factor", "seasonal_factors", "ambient_temperature",
+                 "wind_speed", "time", "dt", "power_flow")
+
+    def __init__(self, load_factor: float, solar_factor: float, wind_factor: float,
+                 seasonal_factors: Dict[str, float], ambient_temperature: float,
+                 wind_speed: float = 5.0, time: Optional[float] = None):
+        self.load_factor = load_factor
+        self.solar_factor = solar_factor
+        self.wind_factor = wind_factor
+        self.seasonal_factors = seasonal_factors
+        self.ambient_temperature = ambient_temperature
+        self.wind_speed = wind_speed
+        self.time = time  # simulated epoch seconds of this cycle
+
+        # Simulated seconds since each simulated row was last sampled (drives the thermal models),
+        # set by the engine per block because elements report at different rates
+        self.dt: Union[float, np.ndarray] = 0.0
+
+        # Filled in by the engine once generator and load outputs are known
+        self.power_flow: Optional[PowerFlowSolution] = None
+
+
+class ElementBlock:
+    """Struct-of-arrays storage for all elements of a single ElementType"""
+
+    def __init__(self, element_type: ElementType, element_ids: List[str]):
+        self.element_type = element_type
+        self.ids: List[str] = list(element_ids)
+        self.index: Dict[str, int] = {element_id: i for i, element_id in enumerate(self.ids)}
+        self.active = np.ones(len(self.ids), dtype=bool)
+
+        # Static parameters (capacity, demand, rating, ...) and evolving state (current_output, ...)
+        self.params: Dict[str, np.ndarray] = {}
+        self.state: Dict[str, np.ndarray] = {}
+
+        # Scenario overlays: multiplicative parameter modifiers and forced outages
+        self.modifiers: Dict[str, np.ndarray] = {}
+        self.outage = np.zeros(len(self.ids), dtype=bool)
+
+    @property
+    def size(self) -> int:
+        return len(self.ids)
+
+    @property
+    def in_service(self) -> np.ndarray:
+        """Elements that are active and not forced out by a scenario"""
+        return self.active & ~self.outage
+
+    def scaled(self, name: str, rows: np.ndarray) -> np.ndarray:
+        """Parameter values for the given rows with any scenario modifier applied"""
+        values = self.params[name][rows]
+        modifier = self.modifiers.get(name)
+        return values if modifier is None else values * modifier[rows]
+
+    def set_modifier(self, name: str, rows: np.ndarray, factor: float):
+        """Set the modifier of a parameter for the given rows (1.0 restores the base value)"""
+        if name not in self.modifiers:
+            self.modifiers[name] = np.ones(self.size)
+        self.modifiers[name][rows] = factor
+
+    def set_param(self, name: str, values, dtype=np.float64):
+        self.params[name] = np.asarray(values, dtype=dtype)
+
+    def set_state(self, name: str, fill: float = np.nan):
+        self.state[name] = np.full(self.size, fill, dtype=np.float64)
+
+    def state_array(self, name: str) -> np.ndarray:
+        """State array owned by another component (e.g. alarm timers), created NaN-filled on first use"""
+        if name not in self.state:
+            self.set_state(name)
+        return self.state[name]
+
+
+class CycleResult:
+    """Metric columns computed for the active elements of one block"""
+
+    __slots__ = ("element_type", "element_ids", "rows", "metrics")
+
+    def __init__(self, element_type: ElementType, element_ids: List[str],
+                 rows: np.ndarray, metrics: Dict[str, np.ndarray]):
+        self.element_type = element_type
+        self.element_ids = element_ids
+        self.rows = rows  # positions of these elements inside their ElementBlock
+        self.metrics = metrics
+
+    def __len__(self) -> int:
+        return len(self.element_ids)
+
+    def select(self, keep: np.ndarray) -> "CycleResult":
+        """The subset of this result where the boolean mask is set"""
+        positions = np.flatnonzero(keep)
+        return CycleResult(
+            element_type=self.element_type,
+            element_ids=[self.element_ids[i] for i in positions],
+            rows=self.rows[positions],
+            metrics={name: values[positions] for name, values in self.metrics.items()}
+        )
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """Element-wise division returning 0 where the denominator is not positive"""
+    out = np.zeros(np.broadcast(numerator, denominator).shape, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+class VectorizedEngine:
+    """Computes a whole element type's telemetry in one batched NumPy pass"""
+
+    def __init__(self, streams: Optional[RandomStreams] = None, power_flow_enabled: bool = True):
+        self.blocks: Dict[ElementType, ElementBlock] = {}
+        self.power_flow: Optional[DCPowerFlow] = None
+        self.power_flow_enabled = power_flow_enabled and settings.POWER_FLOW_ENABLED
+        self.streams = streams or RandomStreams(settings.SIMULATION_SEED, block_cycles=settings.NOISE_BLOCK_CYCLES)
+        self._simulators: Dict[ElementType, Callable[[ElementBlock, np.ndarray, CycleContext], Dict[str, np.ndarray]]] = {
+            ElementType.BUS: self._simulate_buses,
+            ElementType.GENERATOR: self._simulate_generators,
+            ElementType.LOAD: self._simulate_loads,
+            ElementType.LINE: self._simulate_lines,
+            ElementType.TRANSFORMER: self._simulate_transformers,
+        }
+
+    def load(self, elements: Dict[str, GridElement], base_values: Dict[str, Dict]):
+        """(Re)build all element blocks from the simulator's base values"""
+        grouped: Dict[ElementType, List[str]] = {}
+        for element_id, element in elements.items():
+            grouped.setdefault(element.element_type, []).append(element_id)
+
+        # Stable row order keeps seeded noise streams reproducible across runs
+        for element_ids in grouped.values():
+            element_ids.sort()
+
+        self.blocks = {
+            element_type: self._build_block(element_type, element_ids, elements, base_values)
+            for element_type, element_ids in grouped.items()
+            if element_type in self._simulators
+        }
+        self.rebuild_power_flow(base_values)
+
+    def apply_changes(self, elements: Dict[str, GridElement], base_values: Dict[str, Dict],
+                      changed_ids: List[str], removed_ids: List[str]) -> bool:
+        """Apply element deltas to the blocks they touch; returns True if the power flow model is stale"""
+        located = {
+            element_id: element_type
+            for element_type, block in self.blocks.items()
+            for element_id in (*changed_ids, *removed_ids)
+            if element_id in block.index
+        }
+
+        # Per block: ids that leave it (deleted or re-typed) and ids that are new or modified in it
+        leaving: Dict[ElementType, set] = {}
+        touched: Dict[ElementType, set] = {}
+        for element_id in removed_ids:
+            if element_id in located:
+                leaving.setdefault(located[element_id], set()).add(element_id)
+        for element_id in changed_ids:
+            element_type = elements[element_id].element_type
+            if element_type not in self._simulators:
+                continue
+            previous_type = located.get(element_id)
+            if previous_type is not None and previous_type != element_type:
+                leaving.setdefault(previous_type, set()).add(element_id)
+            touched.setdefault(element_type, set()).add(element_id)
+
+        network_changed = False
+        for element_type in set(leaving) | set(touched):
+            block = self.blocks.get(element_type)
+            gone = leaving.get(element_type, set())
+            updated = touched.get(element_type, set())
+            current_ids = block.ids if block is not None else []
+
+            if not gone and updated.issubset(block.index if block is not None else ()):
+                # Same membership: overwrite parameters of the modified rows, keep evolving state
+                rows = np.asarray([block.index[element_id] for element_id in sorted(updated)], dtype=np.int64)
+                fresh = self._build_block(element_type, sorted(updated), elements, base_values)
+                block.active[rows] = fresh.active
+                for name, values in fresh.params.items():
+                    block.params[name][rows] = values
+                network_changed |= element_type not in DEVICE_TYPES or self._device_moved(element_type, rows, base_values)
+                continue
+
+            # Membership changed: rebuild this block only, carrying state over by element id
+            element_ids = sorted((set(current_ids) - gone) | updated)
+            if not element_ids:
+                self.blocks.pop(element_type, None)
+            else:
+                rebuilt = self._build_block(element_type, element_ids, elements, base_values)
+                if block is not None:
+                    kept = [element_id for element_id in element_ids if element_id in block.index]
+                    old_rows = np.asarray([block.index[element_id] for element_id in kept], dtype=np.int64)
+                    new_rows = np.asarray([rebuilt.index[element_id] for element_id in kept], dtype=np.int64)
+                    for name, values in block.state.items():
+                        rebuilt.state_array(name)[new_rows] = values[old_rows]
+                    for name, values in block.modifiers.items():
+                        rebuilt.set_modifier(name, new_rows, 1.0)
+                        rebuilt.modifiers[name][new_rows] = values[old_rows]
+                    rebuilt.outage[new_rows] = block.outage[old_rows]
+                self.blocks[element_type] = rebuilt
+
+            # Solution arrays are sized per block, so the old model cannot be used any more
+            self.power_flow = None
+            network_changed = True
+
+        return network_changed and self.power_flow_enabled
+
+    def _device_moved(self, element_type: ElementType, rows: np.ndarray, base_values: Dict[str, Dict]) -> bool:
+        """Whether any of the given device rows now attaches to a different bus"""
+        if self.power_flow is None or element_type not in self.power_flow.device_bus:
+            return True
+        block = self.blocks[element_type]
+        bus_index = self.blocks[ElementType.BUS].index if ElementType.BUS in self.blocks else {}
+        previous = self.power_flow.device_bus[element_type][rows]
+        for row, previous_bus in zip(rows.tolist(), previous.tolist()):
+            properties = base_values[block.ids[row]]["properties"]
+            if bus_index.get(properties.get("connected_bus") or properties.get("bus_id"), -1) != previous_bus:
+                return True
+        return False
+
+    def rebuild_power_flow(self, base_values: Dict[str, Dict]):
+        """Rebuild and refactorize the network model (only needed when the topology changes)"""
+        if not self.power_flow_enabled:
+            self.power_flow = None
+            return
+
+        try:
+            self.power_flow = DCPowerFlow.from_blocks(self.blocks, base_values)
+        except Exception as e:
+            logger.error(f"Power flow model build failed, using statistical line model: {e}")
+            self.power_flow = None
+
+    def _build_block(self, element_type: ElementType, element_ids: List[str],
+                     elements: Dict[str, GridElement], base_values: Dict[str, Dict]) -> ElementBlock:
+        """Pack the base values of one element type into contiguous arrays"""
+        block = ElementBlock(element_type, element_ids)
+        bases = [base_values[element_id] for element_id in element_ids]
+        block.active = np.array(
+            [elements[element_id].status == ElementStatus.ACTIVE for element_id in element_ids],
+            dtype=bool
+        )
+
+        if element_type == ElementType.BUS:
+            block.set_param("voltage", [b["voltage"] for b in bases])
+
+        elif element_type == ElementType.GENERATOR:
+            block.set_param("capacity", [b["capacity"] for b in bases])
+            block.set_param("efficiency", [b["efficiency"] for b in bases])
+            block.set_param("voltage_level", [b["properties"].get("voltage_level", 22) for b in bases])
+            block.set_param("fuel", [_FUEL_CODES.get(b["properties"].get("fuel_type", "thermal"), FUEL_THERMAL)
+                                     for b in bases], dtype=np.int8)
+            block.set_state("current_output")
+
+        elif element_type == ElementType.LOAD:
+            block.set_param("demand", [b["demand"] for b in bases])
+            block.set_param("power_factor", [b["power_factor"] for b in bases])
+            block.set_param("priority", [_PRIORITY_CODES.get(b["priority"], PRIORITY_MEDIUM) for b in bases],
+                            dtype=np.int8)
+            block.set_param("voltage_level", [b["properties"].get("voltage_level", 11) for b in bases])
+
+        elif element_type == ElementType.LINE:
+            block.set_param("capacity", [b["capacity"] for b in bases])
+            block.set_param("resistance", [b["resistance"] for b in bases])
+            block.set_param("reactance", [b["reactance"] for b in bases])
+            block.set_param("rated_rise", [b["properties"].get("rated_temperature_rise", thermal.CONDUCTOR_RATED_RISE)
+                                           for b in bases])
+            block.set_param("thermal_time_constant", [
+                b["properties"].get("thermal_time_constant", thermal.CONDUCTOR_TIME_CONSTANT) for b in bases
+            ])
+            block.set_state("temperature")
+
+        elif element_type == ElementType.TRANSFORMER:
+            block.set_param("rating", [b["rating"] for b in bases])
+            block.set_param("tap_ratio", [b["tap_ratio"] for b in bases])
+            for name, default in (
+                ("rated_top_oil_rise", thermal.RATED_TOP_OIL_RISE),
+                ("hot_spot_gradient", thermal.HOT_SPOT_GRADIENT),
+                ("loss_ratio", thermal.LOSS_RATIO),
+                ("oil_time_constant", thermal.OIL_TIME_CONSTANT),
+                ("winding_time_constant", thermal.WINDING_TIME_CONSTANT),
+            ):
+                block.set_param(name, [b["properties"].get(name, default) for b in bases])
+            block.set_state("top_oil")
+            block.set_state("hot_spot_rise")
+
+        return block
+
+    def run_cycle(self, context: CycleContext,
+                  due: Optional[Dict[ElementType, np.ndarray]] = None) -> List[CycleResult]:
+        """Simulate active elements, one batched pass per element type
+
+        With a due mask per block only the rows due to report are simulated and
+        returned, except that every in-service device is simulated whenever the
+        network has to be solved for a due bus or branch.
+        """
+        results = []
+        device_power: Dict[ElementType, np.ndarray] = {}
+
+        solve_network = self.power_flow is not None and (due is None or any(
+            due[element_type].any() for element_type in due if element_type not in DEVICE_TYPES
+        ))
+
+        for element_type in CYCLE_ORDER:
+            block = self.blocks.get(element_type)
+            if block is None:
+                continue
+
+            # Solve the network once both device types have produced their outputs
+            if element_type not in DEVICE_TYPES and context.power_flow is None and solve_network:
+                context.power_flow = self.power_flow.solve(device_power)
+
+            in_service = block.in_service
+            reporting = in_service if due is None else in_service & due.get(element_type, False)
+            simulated = in_service if element_type in DEVICE_TYPES and solve_network else reporting
+
+            rows = np.flatnonzero(simulated)
+            if rows.size == 0:
+                continue
+
+            context.dt = self._elapsed(block, rows, context)
+            metrics = self._simulators[element_type](block, rows, context)
+            result = CycleResult(
+                element_type=element_type,
+                element_ids=[block.ids[i] for i in rows],
+                rows=rows,
+                metrics=metrics
+            )
+            results.append(result if simulated is reporting else result.select(reporting[rows]))
+
+            if element_type in DEVICE_TYPES:
+                power = np.zeros(block.size)
+                power[rows] = metrics["power"]
+                device_power[element_type] = power
+
+        return results
+
+    @staticmethod
+    def _elapsed(block: ElementBlock, rows: np.ndarray, context: CycleContext) -> np.ndarray:
+        """Simulated seconds since each row was last simulated, 0 on its first sample"""
+        if context.time is None:
+            return np.zeros(rows.size)
+        sampled_at = block.state_array("sampled_at")
+        elapsed = np.nan_to_num(context.time - sampled_at[rows], nan=0.0)
+        sampled_at[rows] = context.time
+        return elapsed
+
+    def _load_factors(self, key: str, n: int, context: CycleContext) -> np.ndarray:
+        """Per-element load factor with small independent random variation"""
+        factors = context.load_factor * (1 + self.streams.normal(f"{key}.load_factor", n, 0, LOAD_FACTOR_NOISE))
+        return np.clip(factors, 0.3, 1.5)
+
+    def _simulate_buses(self, block: ElementBlock, rows: np.ndarray, context: CycleContext) -> Dict[str, np.ndarray]:
+        """Bus voltages with load-dependent drop and measurement noise"""
+        n = rows.size
+        nominal_voltage = block.params["voltage"][rows]
+        load_factor = self._load_factors("bus", n, context)
+
+        # 3% drop at full load
+        voltage = nominal_voltage * (1 - 0.03 * load_factor)
+        voltage *= 1 + self.streams.normal("bus.voltage", n, 0, settings.VOLTAGE_NOISE_FACTOR)
+        voltage_change = _safe_divide(voltage - nominal_voltage, nominal_voltage) * 100
+
+        frequency = 50.0 * (1 + self.streams.normal("bus.frequency", n, 0, settings.FREQUENCY_NOISE_FACTOR))
+
+        metrics = {
+            "voltage": voltage,
+            "voltage_level": nominal_voltage,
+            "voltage_change": voltage_change,
+            "frequency": frequency,
+        }
+        if context.power_flow is not None:
+            metrics["voltage_angle"] = context.power_flow.bus_angle[rows]
+            block.state_array("voltage_angle")[rows] = metrics["voltage_angle"]
+
+        # Latest operating point, interpolated between cycles by the PMU stream
+        block.state_array("voltage")[rows] = voltage
+        return metrics
+
+    def _simulate_generators(self, block: ElementBlock, rows: np.ndarray, context: CycleContext) -> Dict[str, np.ndarray]:
+        """Generator outputs following load, sun or wind, limited by ramp rate"""
+        n = rows.size
+        capacity = block.scaled("capacity", rows)
+        fuel = block.params["fuel"][rows]
+        load_factor = self._load_factors("generator", n, context)
+
+        # Thermal/hydro generation follows load, renewables follow weather
+        target_output = np.minimum(capacity * load_factor * self.streams.uniform("generator.dispatch", n, 0.8, 1.0), capacity)
+        solar_output = capacity * context.solar_factor * context.seasonal_factors["solar"]
+        wind_output = capacity * context.wind_factor * context.seasonal_factors["wind"]
+        target_output = np.where(fuel == FUEL_SOLAR, solar_output, target_output)
+        target_output = np.where(fuel == FUEL_WIND, wind_output, target_output)
+
+        # Ramp rate limit of 5% of capacity per cycle
+        current_output = block.state["current_output"][rows]
+        current_output = np.where(np.isnan(current_output), target_output, current_output)
+        max_ramp = capacity * 0.05
+        power_output = current_output + np.clip(target_output - current_output, -max_ramp, max_ramp)
+        block.state["current_output"][rows] = power_output
+
+        load_ratio = _safe_divide(power_output, capacity)
+        efficiency = block.params["efficiency"][rows] * self._efficiency_curve(load_ratio)
+
+        voltage_level = block.params["voltage_level"][rows]
+
+        return {
+            "power": power_output,
+            "capacity": block.params["capacity"][rows],
+            "load_factor": load_ratio * 100,
+            "efficiency": efficiency,
+            "frequency": 50.0 + self.streams.normal("generator.frequency", n, 0, 0.05),
+            "voltage": voltage_level * (1 + self.streams.normal("generator.voltage", n, 0, 0.01)),
+            "voltage_level": voltage_level,
+        }
+
+    def _simulate_loads(self, block: ElementBlock, rows: np.ndarray, context: CycleContext) -> Dict[str, np.ndarray]:
+        """Load demand with consumer variation and priority-based shedding"""
+        n = rows.size
+        base_demand = block.scaled("demand", rows)
+        priority = block.params["priority"][rows]
+        load_factor = self._load_factors("load", n, context)
+
+        # Low and medium priority loads shed under system stress
+        stressed = load_factor > 1.1
+        demand_multiplier = load_factor.copy()
+        demand_multiplier[stressed & (priority == PRIORITY_LOW)] *= 0.7
+        demand_multiplier[stressed & (priority == PRIORITY_MEDIUM)] *= 0.9
+
+        actual_demand = base_demand * demand_multiplier * self.streams.uniform("load.demand", n, 0.85, 1.15)
+
+        power_factor = block.params["power_factor"][rows] * (1 + self.streams.normal("load.power_factor", n, 0, 0.05))
+        power_factor = np.clip(power_factor, 0.7, 1.0)
+
+        voltage_level = block.params["voltage_level"][rows]
+        current = _safe_divide(actual_demand, voltage_level * np.sqrt(3) * power_factor)
+        current[voltage_level <= 0] = 0
+
+        return {
+            "power": actual_demand,
+            "demand": block.params["demand"][rows],
+            "current": current,
+            "power_factor": power_factor,
+            "utilization_rate": _safe_divide(actual_demand, base_demand) * 100,
+            "voltage_level": voltage_level,
+        }
+
+    def _simulate_lines(self, block: ElementBlock, rows: np.ndarray, context: CycleContext) -> Dict[str, np.ndarray]:
+        """Line loading, flow, I²R losses and conductor temperature"""
+        n = rows.size
+        capacity = block.scaled("capacity", rows)
+        load_factor = self._load_factors("line", n, context)
+
+        # Statistical model, kept for lines outside the solved network
+        loading_percent = np.minimum(100, self.streams.uniform("line.loading", n, 20, 85) * load_factor)
+        current = (loading_percent / 100) * capacity * 10  # Simplified
+        power_flow = (loading_percent / 100) * capacity
+
+        solved, flow, flow_current, flow_loss = self._branch_flows(ElementType.LINE, rows, context)
+        loading_percent[solved] = _safe_divide(np.abs(flow[solved]), capacity[solved]) * 100
+        power_flow[solved] = flow[solved]
+        current = np.where(np.isnan(flow_current), current, flow_current)
+
+        power_loss = (current / 1000) ** 2 * block.params["resistance"][rows]
+        power_loss = np.where(np.isnan(flow_loss), power_loss, flow_loss)
+
+        # Conductor temperature lags the loading with its thermal time constant
+        temperature = thermal.conductor_temperature(
+            block.state["temperature"][rows], loading_percent / 100, context.ambient_temperature,
+            context.wind_speed, context.solar_factor, context.dt,
+            {name: block.params[name][rows] for name in ("rated_rise", "thermal_time_constant")}
+        )
+        block.state["temperature"][rows] = temperature
+
+        return {
+            "current": current,
+            "capacity": block.params["capacity"][rows],
+            "loading": loading_percent,
+            "power_flow": power_flow,
+            "power_loss": power_loss,
+            "temperature": temperature,
+        }
+
+    def _simulate_transformers(self, block: ElementBlock, rows: np.ndarray, context: CycleContext) -> Dict[str, np.ndarray]:
+        """Transformer loading, oil/winding temperatures and tap position"""
+        n = rows.size
+        rating = block.scaled("rating", rows)
+        load_factor = self._load_factors("transformer", n, context)
+
+        loading_percent = np.minimum(100, self.streams.uniform("transformer.loading", n, 30, 90) * load_factor)
+        power_flow = (loading_percent / 100) * rating
+
+        solved, flow, _, _ = self._branch_flows(ElementType.TRANSFORMER, rows, context)
+        loading_percent[solved] = _safe_divide(np.abs(flow[solved]), rating[solved]) * 100
+        power_flow[solved] = flow[solved]
+
+        # Top oil follows the loading over hours, the winding hot spot over minutes
+        oil_temperature, hot_spot_rise = thermal.transformer_temperatures(
+            block.state["top_oil"][rows], block.state["hot_spot_rise"][rows], loading_percent / 100,
+            context.ambient_temperature, context.dt,
+            {name: block.params[name][rows] for name in (
+                "rated_top_oil_rise", "hot_spot_gradient", "loss_ratio", "oil_time_constant", "winding_time_constant"
+            )}
+        )
+        block.state["top_oil"][rows] = oil_temperature
+        block.state["hot_spot_rise"][rows] = hot_spot_rise
+        winding_temperature = oil_temperature + hot_spot_rise
+
+        tap_position = np.clip(block.params["tap_ratio"][rows] + self.streams.normal("transformer.tap", n, 0, 0.1), 0.8, 1.2)
+
+        return {
+            "loading": loading_percent,
+            "rating": block.params["rating"][rows],
+            "power_flow": power_flow,
+            "oil_temperature": oil_temperature,
+            "winding_temperature": winding_temperature,
+            "tap_position": tap_position,
+        }
+
+    def _branch_flows(self, element_type: ElementType, rows: np.ndarray, context: CycleContext):
+        """Solved flow (MW), current (A) and loss (MW) for branch rows; NaN where not solved"""
+        nan = np.full(rows.size, np.nan)
+        solution = context.power_flow
+        if solution is None or element_type not in solution.branch_flow:
+            return np.zeros(rows.size, dtype=bool), nan, nan, nan
+
+        flow = solution.branch_flow[element_type][rows]
+        loss = solution.branch_loss[element_type][rows]
+        kv = self.power_flow.branch_kv.get(element_type, np.full(self.blocks[element_type].size, np.nan))[rows]
+
+        # I = P / (√3·V) with P in MW and V in kV gives kA
+        current = np.full(rows.size, np.nan)
+        has_kv = ~np.isnan(flow) & (kv > 0)
+        current[has_kv] = np.abs(flow[has_kv]) * 1000 / (np.sqrt(3) * kv[has_kv])
+
+        return ~np.isnan(flow), flow, current, loss
+
+    @staticmethod
+    def _efficiency_curve(load_ratio: np.ndarray) -> np.ndarray:
+        """Typical thermal plant efficiency curve based on loading"""
+        optimal_load = 0.85
+        return np.where(
+            load_ratio <= optimal_load,
+            0.7 + 0.3 * (load_ratio / optimal_load),
+            1.0 - 0.2 * ((load_ratio - optimal_load) / (1 - optimal_load))
+        )
@@ -0,0 +1,180 @@
+# telemetry-simulator/health_monitor.py
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+
+class _Dependency:
+    """Probe, reconnect and latency history of one database"""
+
+    def __init__(self, name: str, probe: Callable[[], Awaitable[Any]],
+                 reconnect: Optional[Callable[[], Awaitable[bool]]], window: int,
+                 delegated: Callable[[], bool] = lambda: False):
+        self.name = name
+        self.probe = probe
+        self.reconnect = reconnect
+        self.delegated = delegated  # True while something else in this process reconnects it
+        self.latencies = deque(maxlen=window)
+        self.failures = 0
+        self.next_reconnect = 0.0
+        self.backoff = settings.HEALTH_RECONNECT_MIN
+        self.reconnecting: Optional[asyncio.Task] = None
+
+
+class HealthMonitor:
+    """Probes PostgreSQL, Neo4j and Redis in the background and caches the result
+
+    Every HEALTH_CHECK_INTERVAL seconds all dependencies are probed concurrently,
+    each bounded by HEALTH_CHECK_TIMEOUT, so one slow database neither delays the
+    others nor any request. Latency percentiles come from the last
+    HEALTH_LATENCY_WINDOW successful probes and are computed once per round;
+    endpoints read the cached results. After HEALTH_FAILURE_THRESHOLD failed
+    probes in a row a dependency is marked down and reconnected with exponential
+    backoff. PostgreSQL is left to the telemetry spool while its loop runs in this
+    process, which reconnects it itself and replays right after. The loop also refreshes the
+    Timescale storage stats, beside the probes, so /status serves them cached.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.interval = settings.HEALTH_CHECK_INTERVAL
+        self.timeout = settings.HEALTH_CHECK_TIMEOUT
+        self.threshold = max(1, settings.HEALTH_FAILURE_THRESHOLD)
+        window = max(1, settings.HEALTH_LATENCY_WINDOW)
+
+        self._dependencies = [
+            _Dependency("postgresql", self._probe_postgresql, db.reconnect_postgresql, window,
+                        delegated=self._spool_running),
+            _Dependency("neo4j", self._probe_neo4j, db.reconnect_neo4j, window),
+            _Dependency("redis", self._probe_redis, db.reconnect_redis, window),
+        ]
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.stats: Dict[str, Any] = {
+            "rounds": 0,
+            "last_round_ms": 0.0,
+            "last_check": None,
+            "reconnects": 0
+        }
+        self._timescale_refresh: Optional[asyncio.Task] = None
+
+    async def _probe_postgresql(self):
+        async with self.db.pg_pool.acquire() as conn:
+            await conn.fetchval("SELECT 1")
+
+    async def _probe_neo4j(self):
+        async with self.db.neo4j_driver.session() as session:
+            result = await session.run("RETURN 1")
+            await result.consume()
+
+    async def _probe_redis(self):
+        await self.db.redis_client.ping()
+
+    def _spool_running(self) -> bool:
+        # A sharded coordinator has the spool configured but never runs its loop
+        spool = self.db.telemetry_spool
+        return spool is not None and spool.running
+
+    def _client(self, name: str):
+        return {"postgresql": self.db.pg_pool, "neo4j": self.db.neo4j_driver, "redis": self.db.redis_client}[name]
+
+    async def check(self) -> Dict[str, Dict[str, Any]]:
+        """Probe every dependency once, concurrently, and refresh the cached results"""
+        started = time.perf_counter()
+        results = await asyncio.gather(*(self._check(dependency) for dependency in self._dependencies))
+        self.results = {dependency.name: result for dependency, result in zip(self._dependencies, results)}
+
+        self.stats["rounds"] += 1
+        self.stats["last_round_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        self.stats["last_check"] = datetime.now().isoformat()
+        return self.results
+
+    async def _check(self, dependency: _Dependency) -> Dict[str, Any]:
+        if self._client(dependency.name) is None:
+            self._recover(dependency)
+            return {"status": "disconnected"}
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(dependency.probe(), self.timeout)
+        except Exception as e:
+            dependency.failures += 1
+            error = "timed out" if isinstance(e, asyncio.TimeoutError) else str(e)
+            result = {"status": "unhealthy", "error": error, "consecutive_failures": dependency.failures}
+            if dependency.failures >= self.threshold:
+                if self.db._connection_status[dependency.name]:
+                    logger.warning(f"{dependency.name} failed {dependency.failures} health probes, marking it down")
+                self.db._connection_status[dependency.name] = False
+                self._recover(dependency)
+            return result
+
+        latency = (time.perf_counter() - started) * 1000
+        dependency.latencies.append(latency)
+        dependency.failures = 0
+        dependency.backoff = settings.HEALTH_RECONNECT_MIN
+        # A working client is usable again even if it was marked down meanwhile
+        self.db._connection_status[dependency.name] = True
+
+        p50, p95, p99 = np.percentile(np.fromiter(dependency.latencies, dtype=np.float64), [50, 95, 99])
+        return {
+            "status": "healthy",
+            "latency_ms": round(latency, 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "samples": len(dependency.latencies)
+        }
+
+    def _recover(self, dependency: _Dependency):
+        """Start reconnecting a down dependency, at most once per backoff period
+
+        The reconnect runs beside the probe rounds, which would otherwise wait for
+        its connect timeouts.
+        """
+        if dependency.reconnect is None or dependency.delegated() or time.monotonic() < dependency.next_reconnect:
+            return
+        if dependency.reconnecting and not dependency.reconnecting.done():
+            return
+        dependency.reconnecting = asyncio.create_task(self._reconnect(dependency))
+
+    async def _reconnect(self, dependency: _Dependency):
+        self.stats["reconnects"] += 1
+        try:
+            connected = await dependency.reconnect()
+        except Exception as e:
+            logger.error(f"Reconnecting {dependency.name} failed: {e}")
+            connected = False
+        if connected:
+            logger.info(f"{dependency.name} reconnected")
+            dependency.failures = 0
+            dependency.backoff = settings.HEALTH_RECONNECT_MIN
+            dependency.next_reconnect = 0.0
+        else:
+            dependency.next_reconnect = time.monotonic() + dependency.backoff
+            dependency.backoff = min(dependency.backoff * 2, settings.HEALTH_RECONNECT_MAX)
+
+    def _refresh_timescale(self):
+        # A slow catalog query must not hold up the next probe round
+        if self._timescale_refresh is None or self._timescale_refresh.done():
+            self._timescale_refresh = asyncio.create_task(self.db.timescale.refresh())
+
+    async def run(self):
+        """Probe every HEALTH_CHECK_INTERVAL seconds until cancelled"""
+        try:
+            while True:
+                try:
+                    await self.check()
+                    self._refresh_timescale()
+                except Exception as e:
+                    logger.error(f"Health monitor error: {e}")
+                await asyncio.sleep(self.interval)
+        finally:
+            for task in [dependency.reconnecting for dependency in self._dependencies] + [self._timescale_refresh]:
+                if task:
+                    task.cancel()
@@ -4,10 +4,13 @@ from datetime import datetime
 from aiohttp import web, hdrs
 from aiohttp.web_response import Response
 import json
+import yaml
 from loguru import logger
 
 from config import settings
 from models import HealthStatus
+from sim_clock import ClockMode, OverrunPolicy
+from scenarios import load_scenario, list_scenarios
 from database import db_manager
 
 
@@ -19,6 +22,7 @@ class HealthServer:
         self.app = web.Application()
         self.runner = None
         self.site = None
+        self.monitor_task = None
         self.start_time = datetime.now()
         
         # Setup routes
@@ -31,12 +35,20 @@ class HealthServer:
         self.app.router.add_get('/status', self.get_status)
         self.app.router.add_post('/control/start', self.start_simulation)
         self.app.router.add_post('/control/stop', self.stop_simulation)
+        self.app.router.add_get('/control/clock', self.get_clock)
+        self.app.router.add_post('/control/clock', self.configure_clock)
+        self.app.router.add_post('/control/clock/pause', self.pause_clock)
+        self.app.router.add_post('/control/clock/resume', self.resume_clock)
+        self.app.router.add_post('/control/clock/step', self.step_clock)
+        self.app.router.add_get('/control/scenarios', self.get_scenarios)
+        self.app.router.add_post('/control/scenarios/start', self.start_scenario)
+        self.app.router.add_post('/control/scenarios/stop', self.stop_scenario)
         self.app.router.add_get('/', self.root)
     
     async def health_check(self, request):
         """Health check endpoint"""
         try:
-            # Check database connections
+            # Database health as last probed by the background monitor
             db_health = await db_manager.health_check()
             
             # Get simulator state
@@ -87,6 +99,9 @@ class HealthServer:
         try:
             simulator_state = self.simulator.get_state()
             uptime = (datetime.now() - self.start_time).total_seconds()
+            schedule = self.simulator.clock.snapshot().get("schedule", {})
+            # Per shard in sharded mode, where the coordinator's own sinks never write
+            components = self.simulator.component_stats()
             
             metrics = [
                 f"# HELP simulator_uptime_seconds Total uptime in seconds",
@@ -116,8 +131,113 @@ class HealthServer:
                 f"# HELP simulator_avg_update_time_seconds Average update cycle time",
                 f"# TYPE simulator_avg_update_time_seconds gauge", 
                 f"simulator_avg_update_time_seconds {simulator_state.avg_update_time}",
+                f"",
+                f"# HELP simulator_cycle_overruns_total Cycles that ran past their scheduled slot",
+                f"# TYPE simulator_cycle_overruns_total counter",
+                f"simulator_cycle_overruns_total {schedule.get('overruns', 0)}",
+                f"",
+                f"# HELP simulator_missed_deadlines_total Scheduled cycles dropped by the overrun policy",
+                f"# TYPE simulator_missed_deadlines_total counter",
+                f"simulator_missed_deadlines_total {schedule.get('missed_deadlines', 0)}",
+                f"",
+                f"# HELP simulator_cycle_lateness_seconds Delay between a cycle's deadline and its start",
+                f"# TYPE simulator_cycle_lateness_seconds gauge",
+                f"simulator_cycle_lateness_seconds{{stat=\"last\"}} {schedule.get('last_lateness', 0.0)}",
+                f"simulator_cycle_lateness_seconds{{stat=\"max\"}} {schedule.get('max_lateness', 0.0)}",
+                f"simulator_cycle_lateness_seconds{{stat=\"mean\"}} {schedule.get('mean_lateness', 0.0)}",
             ]
             
+            stages = components.get("pipeline")
+            if stages:
+                metrics += [
+                    f"",
+                    f"# HELP simulator_sink_queue_depth Batches waiting in a sink queue",
+                    f"# TYPE simulator_sink_queue_depth gauge",
+                    *(f"simulator_sink_queue_depth{{sink=\"{name}\"}} {stage['queue_depth']}" for name, stage in stages.items()),
+                    f"",
+                    f"# HELP simulator_sink_dropped_total Batches dropped by a sink's drop policy",
+                    f"# TYPE simulator_sink_dropped_total counter",
+                    *(f"simulator_sink_dropped_total{{sink=\"{name}\"}} {stage['dropped']}" for name, stage in stages.items()),
+                    f"",
+                    f"# HELP simulator_sink_latency_ms Average time a sink takes per batch",
+                    f"# TYPE simulator_sink_latency_ms gauge",
+                    *(f"simulator_sink_latency_ms{{sink=\"{name}\"}} {stage['avg_latency_ms']}" for name, stage in stages.items()),
+                    f"",
+                    f"# HELP simulator_sink_wait_ms Time the last batch spent queued before its sink took it",
+                    f"# TYPE simulator_sink_wait_ms gauge",
+                    *(f"simulator_sink_wait_ms{{sink=\"{name}\"}} {stage['last_wait_ms']}" for name, stage in stages.items()),
+                ]
+
+            writer = components.get("telemetry_writer")
+            if writer:
+                metrics += [
+                    f"",
+                    f"# HELP simulator_telemetry_rows_written_total Telemetry rows loaded with COPY",
+                    f"# TYPE simulator_telemetry_rows_written_total counter",
+                    f"simulator_telemetry_rows_written_total {writer['rows_written']}",
+                    f"",
+                    f"# HELP simulator_telemetry_rows_dropped_total Telemetry rows lost to failed or skipped COPYs",
+                    f"# TYPE simulator_telemetry_rows_dropped_total counter",
+                    f"simulator_telemetry_rows_dropped_total {writer['rows_dropped']}",
+                    f"",
+                    f"# HELP simulator_telemetry_rows_per_second Telemetry COPY throughput",
+                    f"# TYPE simulator_telemetry_rows_per_second gauge",
+                    f"simulator_telemetry_rows_per_second{{stat=\"last\"}} {writer['last_rows_per_second']}",
+                    f"simulator_telemetry_rows_per_second{{stat=\"mean\"}} {writer['rows_per_second']}",
+                ]
+
+            cache = components.get("telemetry_cache")
+            if cache:
+                metrics += [
+                    f"",
+                    f"# HELP simulator_redis_cache_bytes_total Latest-value payload bytes pipelined to Redis",
+                    f"# TYPE simulator_redis_cache_bytes_total counter",
+                    f"simulator_redis_cache_bytes_total {cache['bytes_sent']}",
+                    f"",
+                    f"# HELP simulator_redis_cache_pipeline_ms Round-trip time of one cache pipeline",
+                    f"# TYPE simulator_redis_cache_pipeline_ms gauge",
+                    f"simulator_redis_cache_pipeline_ms{{stat=\"last\"}} {cache['last_pipeline_ms']}",
+                    f"simulator_redis_cache_pipeline_ms{{stat=\"mean\"}} {cache['avg_pipeline_ms']}",
+                ]
+
+            db_health = components.get("databases") or {}
+            metrics += [
+                f"",
+                f"# HELP simulator_dependency_up Whether the last health probe of a database succeeded",
+                f"# TYPE simulator_dependency_up gauge",
+                *(f"simulator_dependency_up{{dependency=\"{name}\"}} {int(info['status'] == 'healthy')}"
+                  for name, info in db_health.items()),
+                f"",
+                f"# HELP simulator_dependency_latency_ms Health probe round-trip time over the latency window",
+                f"# TYPE simulator_dependency_latency_ms gauge",
+                *(f"simulator_dependency_latency_ms{{dependency=\"{name}\",quantile=\"{quantile}\"}} {info[key]}"
+                  for name, info in db_health.items() if info["status"] == "healthy"
+                  for quantile, key in (("0.5", "p50_ms"), ("0.95", "p95_ms"), ("0.99", "p99_ms"))),
+            ]
+
+            spool = components.get("telemetry_spool")
+            if spool:
+                metrics += [
+                    f"",
+                    f"# HELP simulator_spool_rows_pending Telemetry rows spooled to disk and not yet replayed",
+                    f"# TYPE simulator_spool_rows_pending gauge",
+                    f"simulator_spool_rows_pending {spool['rows_pending']}",
+                    f"",
+                    f"# HELP simulator_spool_bytes_pending Spool bytes not yet replayed",
+                    f"# TYPE simulator_spool_bytes_pending gauge",
+                    f"simulator_spool_bytes_pending {spool['bytes_pending']}",
+                    f"",
+                    f"# HELP simulator_spool_rows_total Telemetry rows through the disk spool",
+                    f"# TYPE simulator_spool_rows_total counter",
+                    f"simulator_spool_rows_total{{event=\"spooled\"}} {spool['rows_spooled']}",
+                    f"simulator_spool_rows_total{{event=\"replayed\"}} {spool['rows_replayed']}",
+                    f"simulator_spool_rows_total{{event=\"dropped\"}} {spool['rows_dropped']}",
+                    f"",
+                    f"# HELP simulator_spool_replaying Whether the spool is being replayed into PostgreSQL",
+                    f"# TYPE simulator_spool_replaying gauge",
+                    f"simulator_spool_replaying {int(spool['replaying'])}",
+                ]
+
             return Response(
                 text="\n".join(metrics),
                 content_type="text/plain",
@@ -132,7 +252,9 @@ class HealthServer:
         """Detailed status endpoint"""
         try:
             simulator_state = self.simulator.get_state()
-            db_health = await db_manager.health_check()
+            components = self.simulator.component_stats()
+            # Until the first shard report, or the monitor's first round, probe here
+            db_health = components.get("databases") or await db_manager.health_check()
             uptime = (datetime.now() - self.start_time).total_seconds()
             
             status_data = {
@@ -150,9 +272,23 @@ class HealthServer:
                     "last_update": simulator_state.last_update.isoformat() if simulator_state.last_update else None,
                     "avg_update_time": simulator_state.avg_update_time,
                     "telemetry_sent": simulator_state.total_telemetry_sent,
-                    "alarms_generated": simulator_state.total_alarms_generated
+                    "alarms_generated": simulator_state.total_alarms_generated,
+                    "clock": self.simulator.clock.snapshot(),
+                    "topology_sync": getattr(getattr(self.simulator, "topology_sync", None), "stats", None),
+                    "topology_snapshot": getattr(getattr(self.simulator, "topology_snapshot", None), "stats", None),
+                    "scenario": self.simulator.scenarios.snapshot(),
+                    "alarm_sink": components.get("alarm_sink"),
+                    "sampling": self.simulator.sampling.snapshot() if hasattr(self.simulator, "sampling") else None,
+                    "pmu": components.get("pmu"),
+                    "pipeline": components.get("pipeline"),
+                    "telemetry_writer": components.get("telemetry_writer"),
+                    "telemetry_cache": components.get("telemetry_cache"),
+                    "telemetry_spool": components.get("telemetry_spool"),
+                    "telemetry_stream": components.get("telemetry_stream")
                 },
                 "databases": db_health,
+                "health_monitor": components.get("health_monitor"),
+                "timescale": db_manager.timescale.stats,
                 "configuration": {
                     "update_interval": settings.UPDATE_INTERVAL,
                     "batch_size": settings.BATCH_SIZE,
@@ -199,6 +335,90 @@ class HealthServer:
             logger.error(f"Stop simulation error: {e}")
             return web.json_response({"error": str(e)}, status=500)
     
+    async def get_clock(self, request):
+        """Simulation clock state endpoint"""
+        return web.json_response(self.simulator.clock.snapshot())
+    
+    async def configure_clock(self, request):
+        """Change clock mode, time-warp factor or simulated start time"""
+        try:
+            body = await request.json() if request.can_read_body else {}
+            start_time = body.get("start_time")
+            
+            self.simulator.clock.configure(
+                mode=ClockMode(body["mode"]) if "mode" in body else None,
+                speed=float(body["speed"]) if "speed" in body else None,
+                start_time=datetime.fromisoformat(start_time) if start_time else None,
+                overrun_policy=OverrunPolicy(body["overrun_policy"]) if "overrun_policy" in body else None
+            )
+            logger.info("Simulation clock reconfigured via API")
+            
+            return web.json_response(self.simulator.clock.snapshot())
+            
+        except (ValueError, KeyError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Configure clock error: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+    
+    async def pause_clock(self, request):
+        """Pause simulated time and the cycle loop"""
+        self.simulator.clock.pause()
+        return web.json_response(self.simulator.clock.snapshot())
+    
+    async def resume_clock(self, request):
+        """Resume simulated time and the cycle loop"""
+        self.simulator.clock.resume()
+        return web.json_response(self.simulator.clock.snapshot())
+    
+    async def step_clock(self, request):
+        """Release one or more cycles in step mode"""
+        try:
+            body = await request.json() if request.can_read_body else {}
+            self.simulator.clock.step(int(body.get("steps", 1)))
+            return web.json_response(self.simulator.clock.snapshot())
+            
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+    
+    async def get_scenarios(self, request):
+        """Available scenario files and the running scenario"""
+        return web.json_response({
+            "available": list(list_scenarios()),
+            "active": self.simulator.scenarios.snapshot()
+        })
+    
+    async def start_scenario(self, request):
+        """Start a scenario by file name, from an inline JSON definition or from a YAML body"""
+        try:
+            if request.content_type in ("application/x-yaml", "application/yaml", "text/yaml"):
+                scenario = load_scenario(await request.text())
+            else:
+                body = await request.json() if request.can_read_body else {}
+                if "scenario" in body:
+                    scenario = load_scenario(body["scenario"])
+                else:
+                    available = list_scenarios()
+                    if body.get("name") not in available:
+                        return web.json_response({"error": f"Unknown scenario: {body.get('name')}"}, status=404)
+                    scenario = load_scenario(available[body["name"]])
+            
+            self.simulator.scenarios.start(scenario)
+            logger.info(f"Scenario {scenario.name} started via API")
+            
+            return web.json_response(self.simulator.scenarios.snapshot())
+            
+        except (ValueError, KeyError, TypeError, yaml.YAMLError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        except Exception as e:
+            logger.error(f"Start scenario error: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+    
+    async def stop_scenario(self, request):
+        """Stop the running scenario and restore normal conditions"""
+        self.simulator.scenarios.stop()
+        return web.json_response(self.simulator.scenarios.snapshot())
+    
     async def root(self, request):
         """Root endpoint with service info"""
         return web.json_response({
@@ -210,7 +430,14 @@ class HealthServer:
                 "metrics": "/metrics", 
                 "status": "/status",
                 "start": "/control/start",
-                "stop": "/control/stop"
+                "stop": "/control/stop",
+                "clock": "/control/clock",
+                "clock_pause": "/control/clock/pause",
+                "clock_resume": "/control/clock/resume",
+                "clock_step": "/control/clock/step",
+                "scenarios": "/control/scenarios",
+                "scenario_start": "/control/scenarios/start",
+                "scenario_stop": "/control/scenarios/stop"
             },
             "timestamp": datetime.now().isoformat()
         })
@@ -228,6 +455,9 @@ class HealthServer:
             )
             await self.site.start()
             
+            # Probes the databases on its own schedule; requests read its cached results
+            self.monitor_task = asyncio.create_task(db_manager.health.run())
+            
             logger.info(f"Health server started on port {settings.HEALTH_CHECK_PORT}")
             
         except Exception as e:
@@ -236,6 +466,9 @@ class HealthServer:
     async def stop_server(self):
         """Stop the health check server"""
         try:
+            if self.monitor_task:
+                self.monitor_task.cancel()
+            
             if self.site:
                 await self.site.stop()
             
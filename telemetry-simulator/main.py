@@ -7,6 +7,7 @@ from loguru import logger
 
 from config import settings
 from simulator import GridSimulator
+from sharding import ShardCoordinator
 from health_server import HealthServer
 
 
@@ -14,7 +15,10 @@ class TelemetrySimulatorService:
     """Main telemetry simulator service"""
     
     def __init__(self):
-        self.simulator = GridSimulator()
+        if settings.SIMULATOR_SHARDS > 1:
+            self.simulator = ShardCoordinator(settings.SIMULATOR_SHARDS)
+        else:
+            self.simulator = GridSimulator()
         self.health_server = HealthServer(self.simulator)
         self.running = False
     
@@ -138,6 +142,11 @@ async def main():
     logger.info("=" * 60)
     logger.info(f"Configuration:")
     logger.info(f"  Update Interval: {settings.UPDATE_INTERVAL}s")
+    logger.info(f"  Clock: {settings.SIM_CLOCK_MODE} (x{settings.SIM_CLOCK_SPEED}, overrun policy {settings.SIM_OVERRUN_POLICY})")
+    logger.info(f"  Shards: {settings.SIMULATOR_SHARDS}")
+    logger.info(f"  PMU streaming: {f'{settings.PMU_FRAME_RATE} fps' if settings.PMU_ENABLED else 'disabled'}")
+    logger.info(f"  Redis Streams: {settings.REDIS_STREAM_PREFIX + ':*' if settings.REDIS_STREAM_ENABLED else 'disabled'}")
+    logger.info(f"  Topology sync: {f'every {settings.TOPOLOGY_SYNC_INTERVAL}s' if settings.TOPOLOGY_SYNC_ENABLED else 'disabled'}")
     logger.info(f"  Health Port: {settings.HEALTH_CHECK_PORT}")
     logger.info(f"  Log Level: {settings.LOG_LEVEL}")
     logger.info(f"  PostgreSQL: {settings.POSTGRES_URL.split('@')[1] if '@' in settings.POSTGRES_URL else 'N/A'}")
@@ -63,6 +63,7 @@ class TelemetryMetrics(BaseModel):
     # Specific metrics
     voltage_level: Optional[float] = None
     voltage_change: Optional[float] = None
+    voltage_angle: Optional[float] = None
     load_factor: Optional[float] = None
     efficiency: Optional[float] = None
     power_factor: Optional[float] = None
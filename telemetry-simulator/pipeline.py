@@ -0,0 +1,136 @@
+# telemetry-simulator/pipeline.py
+import asyncio
+import time
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+
+
+class DropPolicy(str, Enum):
+    BLOCK = "block"              # Backpressure: the generator waits for room in the queue
+    DROP_OLDEST = "drop_oldest"  # Make room by discarding the oldest queued item
+    DROP_NEWEST = "drop_newest"  # Discard the item being published
+
+
+class SinkWorker:
+    """One sink stage: a bounded queue drained by its own task"""
+
+    def __init__(self, name: str, topic: str, handler: Callable[[Any], Awaitable[Any]],
+                 depth: int, policy: DropPolicy):
+        self.name = name
+        self.topic = topic
+        self.handler = handler
+        self.policy = DropPolicy(policy)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, depth))
+        self.task: Optional[asyncio.Task] = None
+
+        self.stats: Dict[str, Any] = {
+            "policy": self.policy.value,
+            "capacity": self.queue.maxsize,
+            "enqueued": 0,
+            "processed": 0,
+            "dropped": 0,
+            "errors": 0,
+            "blocked_ms": 0.0,
+            "last_wait_ms": 0.0,
+            "last_latency_ms": 0.0,
+            "avg_latency_ms": 0.0
+        }
+
+    async def submit(self, item: Any):
+        """Queue an item according to the drop policy"""
+        entry = (item, time.monotonic())
+
+        if self.queue.full():
+            if self.policy == DropPolicy.DROP_NEWEST:
+                self.stats["dropped"] += 1
+                return
+            if self.policy == DropPolicy.DROP_OLDEST:
+                self.queue.get_nowait()
+                self.queue.task_done()
+                self.stats["dropped"] += 1
+            else:
+                started = time.monotonic()
+                await self.queue.put(entry)
+                self.stats["blocked_ms"] += (time.monotonic() - started) * 1000
+                self.stats["enqueued"] += 1
+                return
+
+        self.queue.put_nowait(entry)
+        self.stats["enqueued"] += 1
+
+    async def run(self):
+        """Hand queued items to the sink one at a time"""
+        while True:
+            item, enqueued_at = await self.queue.get()
+            started = time.monotonic()
+            try:
+                await self.handler(item)
+                self.stats["processed"] += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Pipeline sink {self.name} failed: {e}")
+            finally:
+                finished = time.monotonic()
+                latency = (finished - started) * 1000
+                self.stats["last_wait_ms"] = round((started - enqueued_at) * 1000, 3)
+                self.stats["last_latency_ms"] = round(latency, 3)
+                # Running mean, matching how avg_update_time is kept
+                handled = self.stats["processed"] + self.stats["errors"]
+                # Zero when the very first item was cancelled mid-handler
+                if handled:
+                    self.stats["avg_latency_ms"] += (latency - self.stats["avg_latency_ms"]) / handled
+                self.queue.task_done()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {**self.stats, "queue_depth": self.queue.qsize(), "avg_latency_ms": round(self.stats["avg_latency_ms"], 3)}
+
+
+class TelemetryPipeline:
+    """Decouples the generation stage from sink I/O through bounded per-sink queues
+
+    The cycle publishes each batch once per topic and returns as soon as every
+    sink has accepted it (or dropped it per policy), so a slow database, Redis or
+    backend only delays its own stage.
+    """
+
+    def __init__(self):
+        self.workers: List[SinkWorker] = []
+
+    def add_sink(self, name: str, topic: str, handler: Callable[[Any], Awaitable[Any]],
+                 depth: int, policy: DropPolicy):
+        self.workers.append(SinkWorker(name, topic, handler, depth, policy))
+
+    def start(self):
+        """Start a task per sink that is not running yet"""
+        for worker in self.workers:
+            if worker.task is None or worker.task.done():
+                worker.task = asyncio.create_task(worker.run(), name=f"sink-{worker.name}")
+
+    async def publish(self, topic: str, item: Any):
+        """Offer an item to every sink subscribed to the topic"""
+        # Sinks start with the first publish so cycles driven outside run() still drain
+        self.start()
+        for worker in self.workers:
+            if worker.topic == topic:
+                await worker.submit(item)
+
+    async def stop(self, timeout: float):
+        """Let the sinks drain what is queued, then stop them"""
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(worker.queue.join() for worker in self.workers if worker.task)),
+                timeout=timeout
+            )
+        except asyncio.TimeoutError:
+            pending = {worker.name: worker.queue.qsize() for worker in self.workers if worker.queue.qsize()}
+            logger.warning(f"Pipeline stopped with undelivered items: {pending}")
+
+        for worker in self.workers:
+            if worker.task:
+                worker.task.cancel()
+                worker.task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Queue depth, drops and latency per sink for the status endpoints"""
+        return {worker.name: worker.snapshot() for worker in self.workers}
@@ -0,0 +1,509 @@
+# telemetry-simulator/pmu.py
+import asyncio
+import binascii
+import io
+import math
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.signal import lfilter
+from loguru import logger
+
+from config import settings
+from database import db_manager
+from models import ElementType
+
+
+# IEEE C37.118.2-2011 framing
+SYNC_DATA = 0xAA01
+SYNC_CONFIG2 = 0xAA31
+TIME_BASE = 1_000_000          # FRACSEC counts microseconds
+DATA_FORMAT = 0x000B           # float FREQ/DFREQ, float analogs, float phasors, polar
+STAT_DATA_INVALID = 0x8000
+MAX_PMUS_PER_FRAME = 1200      # keeps data and CFG-2 frames under the 65535-byte FRAMESIZE limit
+
+NOMINAL_FREQUENCY = 50.0       # Hz, as used by the bus model
+
+# System frequency dynamics and measurement noise
+FREQUENCY_TIME_CONSTANT = 10.0  # s, mean reversion of the system frequency deviation
+FREQUENCY_DEVIATION = 0.02      # Hz, standard deviation of the system frequency
+FREQUENCY_NOISE = 0.0005        # Hz, per-PMU measurement noise
+ROCOF_NOISE = 0.005             # Hz/s
+MAGNITUDE_NOISE = 0.0005        # per unit
+ANGLE_NOISE = 0.0005            # rad
+
+# PostgreSQL binary COPY framing and timestamp epoch
+PG_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+PG_COPY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+PG_EPOCH_OFFSET = 946684800    # seconds from 1970-01-01 to 2000-01-01
+PMU_COLUMNS = ["time", "pmu_id", "magnitude", "angle", "frequency", "rocof"]
+
+_PMU_DTYPE = np.dtype([("stat", ">u2"), ("magnitude", ">f4"), ("angle", ">f4"),
+                       ("frequency", ">f4"), ("rocof", ">f4")])
+
+_COPY_ROW_DTYPE = np.dtype([
+    ("fields", ">i2"),
+    ("time_len", ">i4"), ("time", ">i8"),
+    ("pmu_id_len", ">i4"), ("pmu_id", ">i4"),
+    ("magnitude_len", ">i4"), ("magnitude", ">f4"),
+    ("angle_len", ">i4"), ("angle", ">f4"),
+    ("frequency_len", ">i4"), ("frequency", ">f4"),
+    ("rocof_len", ">i4"), ("rocof", ">f4"),
+])
+
+
+def _epoch_seconds(moment: datetime) -> float:
+    # Naive simulated timestamps are UTC, the same way asyncpg stores them
+    return (moment - datetime(1970, 1, 1)).total_seconds()
+
+
+class PMUIdRegistry:
+    """IDCODE per bus element, allocated once and never reused
+
+    Rows of the bus block shift whenever topology sync adds or removes a bus, so
+    IDCODEs are keyed by element id instead. Allocations start at PMU_IDCODE_BASE,
+    are persisted in monitoring.pmu_devices and are adopted from there on start,
+    which keeps every pmu_frames row attached to the bus that produced it.
+    """
+
+    def __init__(self, shard_index: int):
+        self.shard_index = shard_index
+        self.idcodes: Dict[str, int] = {}
+        self.loaded = False
+        self.generation = 0  # bumped whenever an assigned IDCODE had to change
+        self._next = settings.PMU_IDCODE_BASE
+        self._exhausted = False
+
+    def pmu_id(self, idcode: int) -> int:
+        # IDCODEs are only unique within a shard's stream, the database key adds the shard
+        return (self.shard_index << 16) | idcode
+
+    def _allocate(self) -> Optional[int]:
+        if self._next > 0xFFFF:
+            if not self._exhausted:
+                logger.error(f"PMU IDCODEs above {settings.PMU_IDCODE_BASE} are exhausted, "
+                             f"further buses are not streamed")
+                self._exhausted = True
+            return None
+        self._next += 1
+        return self._next - 1
+
+    def assign(self, element_ids: List[str]) -> np.ndarray:
+        """IDCODE per element, allocating for new ones; -1 where none is left"""
+        idcodes = np.empty(len(element_ids), dtype=np.int64)
+        for i, element_id in enumerate(element_ids):
+            idcode = self.idcodes.get(element_id)
+            if idcode is None:
+                idcode = self._allocate()
+                if idcode is not None:
+                    self.idcodes[element_id] = idcode
+            idcodes[i] = -1 if idcode is None else idcode
+        return idcodes
+
+    def adopt(self, rows: List[Tuple[int, str]]) -> bool:
+        """Take over the persisted (pmu_id, element_id) pairs of this shard; True if an IDCODE changed"""
+        changed = False
+        persisted: Dict[int, str] = {}
+        for pmu_id, element_id in rows:
+            if pmu_id >> 16 != self.shard_index:
+                continue
+            idcode = pmu_id & 0xFFFF
+            if self.idcodes.get(element_id, idcode) != idcode:
+                changed = True
+            self.idcodes[element_id] = idcode
+            persisted[idcode] = element_id
+            self._next = max(self._next, idcode + 1)
+
+        # Allocated before the load and taken by another bus in the meantime
+        for element_id, idcode in list(self.idcodes.items()):
+            if persisted.get(idcode, element_id) != element_id:
+                changed = True
+                fresh = self._allocate()
+                if fresh is None:
+                    del self.idcodes[element_id]
+                else:
+                    self.idcodes[element_id] = fresh
+
+        self.loaded = True
+        if changed:
+            self.generation += 1
+        return changed
+
+
+class PMUDevices:
+    """The bus rows streamed as PMUs, with their IDCODEs and database ids"""
+
+    def __init__(self, block, registry: PMUIdRegistry, version: int):
+        count = block.size if settings.PMU_MAX_BUSES <= 0 else min(block.size, settings.PMU_MAX_BUSES)
+        self.block = block
+        self.version = version
+        self.generation = registry.generation
+        idcodes = registry.assign(block.ids[:count])
+        self.rows = np.flatnonzero(idcodes >= 0)
+        self.element_ids: List[str] = [block.ids[i] for i in self.rows]
+        self.idcodes = idcodes[self.rows].astype(np.uint16)
+        self.pmu_ids = registry.pmu_id(self.idcodes.astype(np.int64))
+        self.nominal = block.params["voltage"][self.rows] * 1000 / math.sqrt(3)  # phase-to-neutral volts
+
+    def __len__(self) -> int:
+        return self.rows.size
+
+
+class PMUFrameBlock:
+    """K consecutive frames for every PMU, generated in one vectorized pass"""
+
+    __slots__ = ("devices", "soc", "fracsec", "stat", "magnitude", "angle", "frequency", "rocof")
+
+    def __init__(self, devices: PMUDevices, soc: np.ndarray, fracsec: np.ndarray, stat: np.ndarray,
+                 magnitude: np.ndarray, angle: np.ndarray, frequency: np.ndarray, rocof: np.ndarray):
+        self.devices = devices
+        self.soc = soc              # (K,) seconds since the Unix epoch
+        self.fracsec = fracsec      # (K,) microseconds
+        self.stat = stat            # (N,)
+        self.magnitude = magnitude  # (K, N) volts
+        self.angle = angle          # (K, N) radians
+        self.frequency = frequency  # (K, N) Hz
+        self.rocof = rocof          # (K, N) Hz/s
+
+    @property
+    def frames(self) -> int:
+        return self.soc.size
+
+    @property
+    def measurements(self) -> int:
+        return self.magnitude.size
+
+    def data_frames(self, stream_idcode: int) -> bytes:
+        """C37.118 data frames, one per timestamp and PDC chunk of up to MAX_PMUS_PER_FRAME PMUs"""
+        parts = []
+        for chunk, start in enumerate(range(0, len(self.devices), MAX_PMUS_PER_FRAME)):
+            stop = min(start + MAX_PMUS_PER_FRAME, len(self.devices))
+            frame_dtype = np.dtype([
+                ("sync", ">u2"), ("framesize", ">u2"), ("idcode", ">u2"), ("soc", ">u4"), ("fracsec", ">u4"),
+                ("pmu", _PMU_DTYPE, (stop - start,)), ("chk", ">u2"),
+            ])
+            frames = np.zeros(self.frames, dtype=frame_dtype)
+            frames["sync"] = SYNC_DATA
+            frames["framesize"] = frame_dtype.itemsize
+            frames["idcode"] = stream_idcode + chunk
+            frames["soc"] = self.soc
+            frames["fracsec"] = self.fracsec
+            pmu = frames["pmu"]
+            pmu["stat"] = self.stat[start:stop]
+            pmu["magnitude"] = self.magnitude[:, start:stop]
+            pmu["angle"] = self.angle[:, start:stop]
+            pmu["frequency"] = self.frequency[:, start:stop]
+            pmu["rocof"] = self.rocof[:, start:stop]
+
+            # CRC-CCITT (0x1021, initial 0xFFFF) over everything but the checksum itself
+            raw = frames.view(np.uint8).reshape(self.frames, frame_dtype.itemsize)
+            frames["chk"] = [binascii.crc_hqx(raw[k, :-2], 0xFFFF) for k in range(self.frames)]
+            parts.append(frames.tobytes())
+        return b"".join(parts)
+
+    def copy_payload(self) -> bytes:
+        """PostgreSQL binary COPY rows for monitoring.pmu_frames"""
+        frames, pmus = self.magnitude.shape
+        rows = np.empty(frames * pmus, dtype=_COPY_ROW_DTYPE)
+        rows["fields"] = len(PMU_COLUMNS)
+        rows["time_len"] = 8
+        rows["pmu_id_len"] = 4
+        for name in ("magnitude", "angle", "frequency", "rocof"):
+            rows[f"{name}_len"] = 4
+            rows[name] = getattr(self, name).ravel()
+        micros = (self.soc.astype(np.int64) - PG_EPOCH_OFFSET) * 1_000_000 + self.fracsec
+        rows["time"] = np.repeat(micros, pmus)
+        rows["pmu_id"] = np.tile(self.devices.pmu_ids, frames)
+        return rows.tobytes()
+
+
+def config_frames(devices: PMUDevices, stream_idcode: int, frame_rate: int, now: float) -> bytes:
+    """C37.118 CFG-2 frames describing each PDC chunk of the data stream"""
+    parts = []
+    soc = int(now)
+    fracsec = int((now - soc) * TIME_BASE)
+    fnom = 1 if NOMINAL_FREQUENCY == 50.0 else 0
+
+    for chunk, start in enumerate(range(0, len(devices), MAX_PMUS_PER_FRAME)):
+        stop = min(start + MAX_PMUS_PER_FRAME, len(devices))
+        body = bytearray()
+        body += TIME_BASE.to_bytes(4, "big")
+        body += (stop - start).to_bytes(2, "big")
+        for i in range(start, stop):
+            body += devices.element_ids[i].encode("ascii", "replace")[:16].ljust(16)
+            body += int(devices.idcodes[i]).to_bytes(2, "big")
+            body += DATA_FORMAT.to_bytes(2, "big")
+            body += (1).to_bytes(2, "big") + (0).to_bytes(2, "big") + (0).to_bytes(2, "big")
+            body += b"VA".ljust(16)
+            body += (0).to_bytes(4, "big")              # PHUNIT: voltage, scaling unused for floats
+            body += fnom.to_bytes(2, "big")
+            body += devices.version.to_bytes(2, "big")  # CFGCNT bumps whenever the PMU set changes
+        body += frame_rate.to_bytes(2, "big")
+
+        header = bytearray()
+        header += SYNC_CONFIG2.to_bytes(2, "big")
+        header += (14 + len(body) + 2).to_bytes(2, "big")
+        header += (stream_idcode + chunk).to_bytes(2, "big")
+        header += soc.to_bytes(4, "big") + fracsec.to_bytes(4, "big")
+        frame = bytes(header + body)
+        parts.append(frame + binascii.crc_hqx(frame, 0xFFFF).to_bytes(2, "big"))
+    return b"".join(parts)
+
+
+class PMUStreamer:
+    """Synchrophasor frames for every bus at PMU rates, decoupled from the telemetry cycle
+
+    Frames are generated in blocks of PMU_BLOCK_FRAMES around the buses' latest
+    operating point, then handed to two independent writers through bounded
+    queues: a persistent TCP connection carrying C37.118 frames and a binary COPY
+    into monitoring.pmu_frames. A slow writer drops its oldest blocks instead of
+    stalling generation.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.frame_rate = settings.PMU_FRAME_RATE
+        self.block_frames = max(1, settings.PMU_BLOCK_FRAMES)
+        self.stream_idcode = settings.PMU_STREAM_IDCODE + 16 * simulator.shard_index
+
+        self.ids = PMUIdRegistry(simulator.shard_index)
+        self.devices: Optional[PMUDevices] = None
+        self._version = 0
+        self._frame: Optional[int] = None       # next frame number since the Unix epoch
+        self._deviation = np.zeros(1)           # lfilter state carrying the frequency deviation over blocks
+        self._last_frequency = NOMINAL_FREQUENCY
+        self._rotation = 0.0                    # phase drift accumulated off nominal frequency
+
+        self._stream_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PMU_QUEUE_BLOCKS)
+        self._store_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.PMU_QUEUE_BLOCKS)
+
+        self.stats: Dict[str, Any] = {
+            "pmus": 0,
+            "frames_generated": 0,
+            "measurements_generated": 0,
+            "generation_ms": 0.0,
+            "late_blocks": 0,
+            "stream_connected": False,
+            "stream_bytes": 0,
+            "stream_dropped_blocks": 0,
+            "rows_copied": 0,
+            "copy_ms": 0.0,
+            "copy_dropped_blocks": 0,
+            "errors": 0
+        }
+
+    def _sync_devices(self) -> Optional[PMUDevices]:
+        """Follow the bus block, which is replaced when topology sync changes its membership"""
+        block = self.simulator.engine.blocks.get(ElementType.BUS)
+        if block is None:
+            self.devices = None
+        elif (self.devices is None or self.devices.block is not block
+              or self.devices.generation != self.ids.generation):
+            self._version = (self._version + 1) & 0xFFFF
+            self.devices = PMUDevices(block, self.ids, self._version)
+            self.stats["pmus"] = len(self.devices)
+            logger.info(f"PMU stream covers {len(self.devices)} buses at {self.frame_rate} fps")
+        return self.devices
+
+    def generate(self, devices: PMUDevices, first_frame: int, count: int) -> PMUFrameBlock:
+        """Frames first_frame .. first_frame + count - 1 for every PMU"""
+        streams = self.simulator.engine.streams
+        n = len(devices)
+        dt = 1.0 / self.frame_rate
+        block = devices.block
+
+        # System frequency deviation as a discretized Ornstein-Uhlenbeck process, continued across blocks
+        decay = math.exp(-dt / FREQUENCY_TIME_CONSTANT)
+        shocks = streams.normal("pmu.system_frequency", count, 0, FREQUENCY_DEVIATION * math.sqrt(1 - decay ** 2))
+        deviation, self._deviation = lfilter([1.0], [1.0, -decay], shocks, zi=self._deviation)
+        system_frequency = NOMINAL_FREQUENCY + deviation
+        rocof = np.diff(system_frequency, prepend=self._last_frequency) * self.frame_rate
+        self._last_frequency = system_frequency[-1]
+
+        # Phasors rotate against the nominal-frequency reference while frequency is off nominal
+        rotation = self._rotation + 2 * np.pi * np.cumsum(deviation) * dt
+        self._rotation = float(rotation[-1] % (2 * np.pi))
+
+        voltage = block.state_array("voltage")[devices.rows]
+        voltage_pu = np.where(np.isnan(voltage), 1.0, voltage / np.maximum(block.params["voltage"][devices.rows], 1e-9))
+        angle = np.radians(np.nan_to_num(block.state_array("voltage_angle")[devices.rows]))
+
+        shape = (count, n)
+        magnitude = devices.nominal * voltage_pu * (1 + streams.normal("pmu.magnitude", count * n, 0, MAGNITUDE_NOISE).reshape(shape))
+        phase = angle + rotation[:, None] + streams.normal("pmu.angle", count * n, 0, ANGLE_NOISE).reshape(shape)
+        phase = (phase + np.pi) % (2 * np.pi) - np.pi
+        frequency = system_frequency[:, None] + streams.normal("pmu.frequency", count * n, 0, FREQUENCY_NOISE).reshape(shape)
+        rocof = rocof[:, None] + streams.normal("pmu.rocof", count * n, 0, ROCOF_NOISE).reshape(shape)
+
+        frames = np.arange(first_frame, first_frame + count, dtype=np.int64)
+        stat = np.where(block.in_service[devices.rows], 0, STAT_DATA_INVALID).astype(np.uint16)
+        return PMUFrameBlock(
+            devices=devices,
+            soc=frames // self.frame_rate,
+            fracsec=(frames % self.frame_rate) * TIME_BASE // self.frame_rate,
+            stat=stat,
+            magnitude=magnitude.astype(np.float32),
+            angle=phase.astype(np.float32),
+            frequency=frequency.astype(np.float32),
+            rocof=rocof.astype(np.float32)
+        )
+
+    async def _load_ids(self, conn=None) -> bool:
+        """Adopt the IDCODEs persisted by earlier runs; False while PostgreSQL is unavailable"""
+        if not db_manager._connection_status["postgresql"]:
+            return False
+        query = "SELECT pmu_id, element_id FROM monitoring.pmu_devices"
+        try:
+            if conn is None:
+                async with db_manager.pg_pool.acquire() as pooled:
+                    rows = await pooled.fetch(query)
+            else:
+                rows = await conn.fetch(query)
+        except Exception as e:
+            logger.warning(f"Failed to load PMU ids: {e}")
+            return False
+        if self.ids.adopt([(row["pmu_id"], row["element_id"]) for row in rows]):
+            logger.warning("PMU IDCODEs allocated before the registry was loaded were reassigned")
+        return True
+
+    def _enqueue(self, queue: asyncio.Queue, block: PMUFrameBlock, dropped_key: str):
+        if queue.full():
+            queue.get_nowait()
+            self.stats[dropped_key] += 1
+        queue.put_nowait(block)
+
+    async def run(self):
+        """Generate frame blocks in real time until the simulator stops"""
+        writers = [asyncio.create_task(self._store())]
+        if settings.PMU_STREAM_HOST:
+            writers.append(asyncio.create_task(self._stream()))
+        logger.info(f"PMU streaming started ({self.frame_rate} fps, {self.block_frames} frames per block)")
+
+        # Adopt persisted IDCODEs before the first PMU set is built; _store retries otherwise
+        if settings.PMU_STORE:
+            await self._load_ids()
+
+        block_period = self.block_frames / self.frame_rate
+        deadline = time.monotonic()
+        try:
+            while self.simulator.state.is_running:
+                clock = self.simulator.clock
+                devices = self._sync_devices()
+                if clock.paused or devices is None or not len(devices):
+                    await asyncio.sleep(block_period)
+                    deadline = time.monotonic()
+                    continue
+
+                # Follow the simulation clock, re-aligning after it was reconfigured
+                clock_frame = math.ceil(_epoch_seconds(clock.now()) * self.frame_rate)
+                if self._frame is None or (clock.is_continuous and abs(self._frame - clock_frame) > self.frame_rate):
+                    self._frame = clock_frame
+
+                started = time.perf_counter()
+                block = self.generate(devices, self._frame, self.block_frames)
+                self._frame += self.block_frames
+                self.stats["generation_ms"] = round((time.perf_counter() - started) * 1000, 3)
+                self.stats["frames_generated"] += block.frames
+                self.stats["measurements_generated"] += block.measurements
+
+                self._enqueue(self._store_queue, block, "copy_dropped_blocks")
+                if settings.PMU_STREAM_HOST:
+                    self._enqueue(self._stream_queue, block, "stream_dropped_blocks")
+
+                # Fixed-rate pacing on the warped clock; fall back to now when a whole block behind
+                deadline += block_period / clock.speed
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.stats["late_blocks"] += 1
+                    if -delay > block_period:
+                        deadline = time.monotonic()
+                    await asyncio.sleep(0)
+        finally:
+            for writer in writers:
+                writer.cancel()
+
+    async def _stream(self):
+        """Keep a persistent connection to the phasor data concentrator and write frames to it"""
+        backoff = 1.0
+        while self.simulator.state.is_running:
+            writer = None
+            try:
+                _, writer = await asyncio.open_connection(settings.PMU_STREAM_HOST, settings.PMU_STREAM_PORT)
+                self.stats["stream_connected"] = True
+                backoff = 1.0
+                logger.info(f"PMU stream connected to {settings.PMU_STREAM_HOST}:{settings.PMU_STREAM_PORT}")
+
+                described = None
+                while self.simulator.state.is_running:
+                    block = await self._stream_queue.get()
+                    if block.devices is not described:
+                        writer.write(config_frames(block.devices, self.stream_idcode, self.frame_rate,
+                                                   float(block.soc[0])))
+                        described = block.devices
+                    payload = block.data_frames(self.stream_idcode)
+                    writer.write(payload)
+                    await writer.drain()
+                    self.stats["stream_bytes"] += len(payload)
+
+            except (OSError, asyncio.IncompleteReadError) as e:
+                self.stats["errors"] += 1
+                logger.warning(f"PMU stream connection lost: {e}, retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                self.stats["stream_connected"] = False
+                if writer is not None:
+                    writer.close()
+
+    async def _store(self):
+        """COPY queued frame blocks into the PMU hypertable, coalescing whatever has piled up"""
+        registered: List[PMUDevices] = []
+        while self.simulator.state.is_running:
+            blocks = [await self._store_queue.get()]
+            while not self._store_queue.empty() and len(blocks) < settings.PMU_COPY_MAX_BLOCKS:
+                blocks.append(self._store_queue.get_nowait())
+
+            if not settings.PMU_STORE or not db_manager._connection_status["postgresql"]:
+                continue
+
+            started = time.perf_counter()
+            try:
+                async with db_manager.pg_pool.acquire() as conn:
+                    if not self.ids.loaded and not await self._load_ids(conn):
+                        self.stats["copy_dropped_blocks"] += len(blocks)
+                        continue
+
+                    # Blocks built on IDCODEs that the load reassigned would land on the wrong bus
+                    current = [block for block in blocks if block.devices.generation == self.ids.generation]
+                    self.stats["copy_dropped_blocks"] += len(blocks) - len(current)
+                    blocks = current
+                    if not blocks:
+                        continue
+
+                    for devices in {id(block.devices): block.devices for block in blocks}.values():
+                        if devices in registered:
+                            continue
+                        # An IDCODE belongs to one bus for good, history is never reassigned
+                        await conn.executemany("""
+                            INSERT INTO monitoring.pmu_devices (pmu_id, element_id)
+                            VALUES ($1, $2)
+                            ON CONFLICT (pmu_id) DO NOTHING
+                        """, list(zip(devices.pmu_ids.tolist(), devices.element_ids)))
+                        registered = registered[-1:] + [devices]
+
+                    payload = PG_COPY_HEADER + b"".join(block.copy_payload() for block in blocks) + PG_COPY_TRAILER
+                    await conn.copy_to_table(
+                        "pmu_frames", schema_name="monitoring", columns=PMU_COLUMNS,
+                        source=io.BytesIO(payload), format="binary"
+                    )
+
+                self.stats["rows_copied"] += sum(block.measurements for block in blocks)
+                self.stats["copy_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"PMU COPY failed ({len(blocks)} blocks): {e}")
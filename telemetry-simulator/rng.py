@@ -0,0 +1,84 @@
+# telemetry-simulator/rng.py
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from typing import Dict, Optional, Tuple
+from loguru import logger
+
+
+# Upper bound on values held per pre-filled buffer (8 MB of float64)
+MAX_BUFFER_VALUES = 1 << 20
+
+# Buffers kept per stream, least recently used first out; enough for the few draw sizes in turn
+MAX_BUFFERS = 4
+
+
+class NoiseStream:
+    """Independent random stream that hands out pre-drawn blocks one cycle at a time"""
+
+    def __init__(self, generator: np.random.Generator, block_cycles: int):
+        self.generator = generator
+        self.block_cycles = max(1, block_cycles)
+        # (kind, n) -> [buffer, cursor], bounded so a drifting draw size cannot pile up buffers
+        self._buffers: "OrderedDict[Tuple[str, int], list]" = OrderedDict()
+
+    def _next_row(self, kind: str, n: int) -> np.ndarray:
+        """Return the next n values of the given kind, refilling the buffer when exhausted"""
+        # One buffer per draw size: elements reporting at different rates make n vary between cycles
+        key = (kind, n)
+        entry = self._buffers.get(key)
+
+        if entry is None or entry[1] >= entry[0].shape[0]:
+            rows = max(1, min(self.block_cycles, MAX_BUFFER_VALUES // max(n, 1)))
+            if kind == "normal":
+                buffer = self.generator.standard_normal((rows, n))
+            else:
+                buffer = self.generator.random((rows, n))
+            entry = self._buffers[key] = [buffer, 0]
+            while len(self._buffers) > MAX_BUFFERS:
+                self._buffers.popitem(last=False)
+        self._buffers.move_to_end(key)
+
+        buffer, cursor = entry
+        entry[1] = cursor + 1
+        return buffer[cursor]
+
+    def standard_normal(self, n: int) -> np.ndarray:
+        return self._next_row("normal", n)
+
+    def random(self, n: int) -> np.ndarray:
+        return self._next_row("uniform", n)
+
+
+class RandomStreams:
+    """Seeded family of independent noise streams, one per (shard, purpose) key"""
+
+    def __init__(self, seed: Optional[int] = None, shard: int = 0, block_cycles: int = 64):
+        # Without a configured seed draw fresh entropy, but log it so the run can be replayed
+        if seed is None:
+            seed = int(np.random.SeedSequence().entropy)
+            logger.info(f"Random streams seeded with generated seed {seed}")
+
+        self.seed = seed
+        self.shard = shard
+        self.block_cycles = block_cycles
+        self._streams: Dict[str, NoiseStream] = {}
+
+    def stream(self, key: str) -> NoiseStream:
+        """Get (or lazily create) the stream for a purpose key, e.g. bus.voltage"""
+        stream = self._streams.get(key)
+        if stream is None:
+            # Stable spawn key: the same seed, shard and key always yield the same sequence
+            sequence = np.random.SeedSequence(self.seed, spawn_key=(self.shard, zlib.crc32(key.encode())))
+            stream = NoiseStream(np.random.Generator(np.random.PCG64(sequence)), self.block_cycles)
+            self._streams[key] = stream
+        return stream
+
+    def normal(self, key: str, n: int, loc: float = 0.0, scale: float = 1.0) -> np.ndarray:
+        """n normal draws for one cycle"""
+        return loc + scale * self.stream(key).standard_normal(n)
+
+    def uniform(self, key: str, n: int, low: float = 0.0, high: float = 1.0) -> np.ndarray:
+        """n uniform draws in [low, high) for one cycle"""
+        return low + (high - low) * self.stream(key).random(n)
@@ -0,0 +1,132 @@
+# telemetry-simulator/sampling.py
+import heapq
+import math
+from functools import reduce
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+from models import ElementType
+
+
+# Element-class reporting periods; 0 falls back to UPDATE_INTERVAL
+TYPE_PERIOD_SETTINGS = {
+    ElementType.BUS: "SAMPLE_PERIOD_BUS",
+    ElementType.GENERATOR: "SAMPLE_PERIOD_GENERATOR",
+    ElementType.LOAD: "SAMPLE_PERIOD_LOAD",
+    ElementType.LINE: "SAMPLE_PERIOD_LINE",
+    ElementType.TRANSFORMER: "SAMPLE_PERIOD_TRANSFORMER",
+}
+
+# Per-element override read from the Neo4j node properties
+PERIOD_PROPERTY = "sample_period"
+
+# Periods are compared on a millisecond grid
+_RESOLUTION = 1000
+
+
+def type_period(element_type: ElementType) -> float:
+    """Configured reporting period of an element class"""
+    return getattr(settings, TYPE_PERIOD_SETTINGS[element_type], 0.0) or settings.UPDATE_INTERVAL
+
+
+class SamplingScheduler:
+    """Decides which elements report at each tick from a heap of per-period deadlines
+
+    Elements of one class sharing a reporting period form a group with a single
+    heap entry, so a tick pops only the groups that are due and hands the engine
+    one row mask per block instead of looking at every element.
+    """
+
+    def __init__(self):
+        self._groups: Dict[Tuple[ElementType, float], np.ndarray] = {}
+        self._heap: List[Tuple[float, ElementType, float]] = []
+        self._next_due: Dict[Tuple[ElementType, float], float] = {}
+        self._block_sizes: Dict[ElementType, int] = {}
+        self._last_time: Optional[float] = None
+        self.tick_interval = settings.UPDATE_INTERVAL
+
+    def load(self, engine, base_values: Dict[str, Dict]):
+        """Group every block's rows by reporting period, keeping the phase of existing groups"""
+        groups: Dict[Tuple[ElementType, float], List[int]] = {}
+        for element_type, block in engine.blocks.items():
+            default = type_period(element_type)
+            for row, element_id in enumerate(block.ids):
+                period = self._element_period(base_values[element_id]["properties"], default)
+                groups.setdefault((element_type, period), []).append(row)
+
+        self._groups = {key: np.asarray(rows, dtype=np.int64) for key, rows in groups.items()}
+        self._block_sizes = {element_type: block.size for element_type, block in engine.blocks.items()}
+        self._next_due = {key: due for key, due in self._next_due.items() if key in self._groups}
+        self._rebuild_heap()
+
+        periods = {period for _, period in self._groups} or {settings.UPDATE_INTERVAL}
+        self.tick_interval = self._tick_for(periods)
+        logger.info(
+            f"Sampling schedule: {len(self._groups)} groups, periods "
+            f"{', '.join(f'{period:g}s' for period in sorted(periods))}, tick {self.tick_interval:g}s"
+        )
+
+    @staticmethod
+    def _element_period(properties: Dict[str, Any], default: float) -> float:
+        try:
+            period = float(properties.get(PERIOD_PROPERTY) or 0)
+        except (TypeError, ValueError):
+            period = 0.0
+        # Quantize so float noise in Neo4j does not split otherwise identical groups
+        return round(period, 3) if period > 0 else default
+
+    @staticmethod
+    def _tick_for(periods) -> float:
+        """Largest tick that lands on every period, bounded below by SAMPLE_MIN_TICK"""
+        tick = reduce(math.gcd, (max(1, round(period * _RESOLUTION)) for period in periods)) / _RESOLUTION
+        return min(max(tick, settings.SAMPLE_MIN_TICK), min(periods))
+
+    def _rebuild_heap(self):
+        self._heap = [(due, element_type, period) for (element_type, period), due in self._next_due.items()]
+        heapq.heapify(self._heap)
+
+    def due(self, now: float) -> Dict[ElementType, np.ndarray]:
+        """Row masks of the elements due to report at simulated time now (epoch seconds)"""
+        if self._last_time is not None and now < self._last_time:
+            # Simulated time jumped back, restart every group's phase from here
+            self._next_due.clear()
+            self._heap = []
+        self._last_time = now
+
+        # Groups not scheduled yet (new, or after a reset) report on this tick
+        for key in self._groups.keys() - self._next_due.keys():
+            self._next_due[key] = now
+            heapq.heappush(self._heap, (now, *key))
+
+        masks: Dict[ElementType, np.ndarray] = {}
+        tolerance = self.tick_interval / 2
+        while self._heap and self._heap[0][0] <= now + tolerance:
+            due, element_type, period = heapq.heappop(self._heap)
+            key = (element_type, period)
+            if self._next_due.get(key) != due:
+                continue  # superseded entry from before a reload
+
+            mask = masks.get(element_type)
+            if mask is None:
+                mask = masks[element_type] = np.zeros(self._block_sizes[element_type], dtype=bool)
+            mask[self._groups[key]] = True
+
+            # Stay on this group's grid, skipping slots that went by while paused or overrun
+            next_due = due + period * (math.floor((now - due) / period) + 1)
+            self._next_due[key] = next_due
+            heapq.heappush(self._heap, (next_due, element_type, period))
+
+        return masks
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Reporting periods and group sizes for the status endpoint"""
+        return {
+            "tick_interval": self.tick_interval,
+            "groups": [
+                {"type": element_type.value, "period": period, "elements": int(rows.size)}
+                for (element_type, period), rows in sorted(self._groups.items(), key=lambda item: item[0][1])
+            ]
+        }
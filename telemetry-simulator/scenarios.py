@@ -0,0 +1,335 @@
+# telemetry-simulator/scenarios.py
+import heapq
+import itertools
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import yaml
+from loguru import logger
+
+from config import settings
+from engine import PRIORITY_LOW
+from models import ElementType, SimulationScenario
+from power_flow import BRANCH_TYPES
+
+
+# Weather presets applied to GridSimulator.weather_effects
+WEATHER_PRESETS = {
+    "normal": {"temperature": 20, "wind_speed": 5, "solar_irradiance": 0.8},
+    "storm": {"temperature": 14, "wind_speed": 22, "solar_irradiance": 0.15},
+    "hot": {"temperature": 38, "wind_speed": 1.5, "solar_irradiance": 1.0},
+    "cold": {"temperature": -8, "wind_speed": 7, "solar_irradiance": 0.5},
+}
+
+# Load curve hour used for each time_of_day setting
+TIME_OF_DAY_HOURS = {"peak": 19.0, "shoulder": 13.0, "off_peak": 3.0}
+
+# Parameter scaled by derate / scale events when none is given
+RATING_PARAMS = {
+    ElementType.GENERATOR: "capacity",
+    ElementType.LOAD: "demand",
+    ElementType.LINE: "capacity",
+    ElementType.TRANSFORMER: "rating",
+}
+
+
+class ScenarioEvent:
+    """One timeline entry: an action applied to a set of elements at a scenario offset"""
+
+    __slots__ = ("time", "action", "element_ids", "element_type", "param", "factor", "layer")
+
+    def __init__(self, time: float, action: str, element_ids: Optional[List[str]] = None,
+                 element_type: Optional[ElementType] = None, param: Optional[str] = None,
+                 factor: float = 1.0, layer: Optional[int] = None):
+        self.time = time  # seconds of simulated time after the scenario started
+        self.action = action  # trip, restore, scale, unscale, shed, end
+        self.element_ids = element_ids
+        self.element_type = element_type
+        self.param = param
+        self.factor = factor
+        self.layer = layer  # pairs a scale event with the unscale event that removes it
+
+
+def load_scenario(source: Union[str, Path, Dict[str, Any]]) -> SimulationScenario:
+    """Parse a scenario from a YAML file path, a YAML document or an already-parsed dict"""
+    if isinstance(source, dict):
+        data = source
+    elif isinstance(source, Path) or (isinstance(source, str) and "\n" not in source and source.endswith((".yaml", ".yml"))):
+        data = yaml.safe_load(Path(source).read_text())
+    else:
+        data = yaml.safe_load(source)
+
+    if not isinstance(data, dict):
+        raise ValueError("Scenario must be a mapping")
+    return SimulationScenario(**data)
+
+
+def list_scenarios(directory: str = None) -> Dict[str, Path]:
+    """Scenario files available in the scenario directory, by name"""
+    path = Path(directory or settings.SCENARIO_DIR)
+    if not path.is_dir():
+        return {}
+    return {file.stem: file for file in sorted(path.iterdir()) if file.suffix in (".yaml", ".yml")}
+
+
+def _target_ids(entry: Dict[str, Any]) -> Optional[List[str]]:
+    if "element_ids" in entry:
+        return list(entry["element_ids"])
+    if "element_id" in entry:
+        return [entry["element_id"]]
+    return None
+
+
+def compile_timeline(scenario: SimulationScenario) -> List[Tuple[float, int, ScenarioEvent]]:
+    """Compile a scenario into a heap of (offset, sequence, event) entries"""
+    events: List[ScenarioEvent] = []
+    layers = itertools.count()
+
+    if scenario.load_factor != 1.0:
+        events.append(ScenarioEvent(0.0, "scale", element_type=ElementType.LOAD, param="demand",
+                                    factor=scenario.load_factor, layer=next(layers)))
+    if scenario.generation_factor != 1.0:
+        events.append(ScenarioEvent(0.0, "scale", element_type=ElementType.GENERATOR, param="capacity",
+                                    factor=scenario.generation_factor, layer=next(layers)))
+    if scenario.load_shedding:
+        events.append(ScenarioEvent(0.0, "shed", element_type=ElementType.LOAD, param="demand",
+                                    factor=0.0, layer=next(layers)))
+
+    for outage in scenario.scheduled_outages:
+        start = float(outage.get("start", 0))
+        element_ids = _target_ids(outage)
+        element_type = ElementType(outage["element_type"]) if "element_type" in outage else None
+        if element_ids is None and element_type is None:
+            raise ValueError(f"Scheduled outage needs element_id(s) or element_type: {outage}")
+        events.append(ScenarioEvent(start, "trip", element_ids, element_type))
+        if outage.get("duration") is not None:
+            events.append(ScenarioEvent(start + float(outage["duration"]), "restore", element_ids, element_type))
+
+    for contingency in scenario.contingencies:
+        time = float(contingency.get("time", 0))
+        kind = contingency.get("type", "trip")
+        element_ids = _target_ids(contingency)
+        element_type = ElementType(contingency["element_type"]) if "element_type" in contingency else None
+        if element_ids is None and element_type is None:
+            raise ValueError(f"Contingency needs element_id(s) or element_type: {contingency}")
+
+        if kind == "trip":
+            events.append(ScenarioEvent(time, "trip", element_ids, element_type))
+            restore = ScenarioEvent(0.0, "restore", element_ids, element_type)
+        elif kind in ("derate", "load_step", "scale"):
+            param = contingency.get("param") or ("demand" if kind == "load_step" else None)
+            factor = float(contingency.get("factor", 1.0))
+            layer = next(layers)
+            events.append(ScenarioEvent(time, "scale", element_ids, element_type, param, factor, layer))
+            restore = ScenarioEvent(0.0, "unscale", element_ids, element_type, param, factor, layer)
+        else:
+            raise ValueError(f"Unknown contingency type: {kind}")
+
+        if contingency.get("duration") is not None:
+            restore.time = time + float(contingency["duration"])
+            events.append(restore)
+
+    events.append(ScenarioEvent(float(scenario.duration), "end"))
+
+    # The sequence number keeps events with equal offsets in declaration order
+    counter = itertools.count()
+    timeline = [(event.time, next(counter), event) for event in events]
+    heapq.heapify(timeline)
+    return timeline
+
+
+class ScenarioEngine:
+    """Runs one SimulationScenario against a simulator's element blocks"""
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.scenario: Optional[SimulationScenario] = None
+        self.started_at: Optional[datetime] = None
+        self._timeline: List[Tuple[float, int, ScenarioEvent]] = []
+        self._saved_weather: Optional[Dict[str, float]] = None
+        self._branches_tripped = False
+
+        # Active scale layers per (element type, parameter); their product is the block modifier
+        self._layers: Dict[Tuple[ElementType, str], Dict[int, ScenarioEvent]] = {}
+        self.applied_events = 0
+        self.faults = 0
+
+    @property
+    def active(self) -> bool:
+        return self.scenario is not None
+
+    def start(self, scenario: SimulationScenario):
+        """Compile and start a scenario, replacing any running one"""
+        timeline = compile_timeline(scenario)
+        explicit = scenario.model_fields_set
+        if "weather_condition" in explicit and scenario.weather_condition not in WEATHER_PRESETS:
+            raise ValueError(f"Unknown weather condition: {scenario.weather_condition}")
+        if "time_of_day" in explicit and scenario.time_of_day not in TIME_OF_DAY_HOURS:
+            raise ValueError(f"Unknown time of day: {scenario.time_of_day}")
+
+        if self.active:
+            self.stop()
+
+        self.scenario = scenario
+        self.started_at = self.simulator.clock.now()
+        self._timeline = timeline
+        self.applied_events = 0
+        self.faults = 0
+
+        # Weather and time of day only override the simulator when the scenario sets them
+        if "weather_condition" in explicit:
+            self._saved_weather = dict(self.simulator.weather_effects)
+            self.simulator.weather_effects.update(WEATHER_PRESETS[scenario.weather_condition])
+        if "time_of_day" in explicit:
+            self.simulator.load_hour_override = TIME_OF_DAY_HOURS[scenario.time_of_day]
+
+        self.simulator.state.current_scenario = scenario.name
+        logger.info(f"Scenario started: {scenario.name} ({len(timeline)} events over {scenario.duration}s)")
+
+    def stop(self):
+        """End the running scenario and restore every parameter it touched"""
+        if not self.active:
+            return
+
+        for block in self.simulator.engine.blocks.values():
+            block.modifiers.clear()
+            block.outage[:] = False
+        self._layers = {}
+
+        if self._saved_weather is not None:
+            self.simulator.weather_effects.update(self._saved_weather)
+            self._saved_weather = None
+        self.simulator.load_hour_override = None
+
+        if self._branches_tripped:
+            self.simulator.engine.rebuild_power_flow(self.simulator.base_values)
+            self._branches_tripped = False
+
+        logger.info(f"Scenario ended: {self.scenario.name} ({self.applied_events} events, {self.faults} faults)")
+        self.scenario = None
+        self.started_at = None
+        self._timeline = []
+        self.simulator.state.current_scenario = None
+
+    def advance(self, now: datetime) -> int:
+        """Apply every event that is due at the given simulated time; returns how many were applied"""
+        if not self.active:
+            return 0
+
+        elapsed = (now - self.started_at).total_seconds()
+        applied = 0
+        network_changed = False
+
+        while self._timeline and self._timeline[0][0] <= elapsed:
+            _, _, event = heapq.heappop(self._timeline)
+            if event.action == "end":
+                self.stop()
+                return applied
+            network_changed |= self._apply(event)
+            applied += 1
+
+        if self.scenario.fault_probability > 0:
+            network_changed |= self._random_faults()
+
+        # Tripped or restored branches change the susceptance matrix
+        if network_changed:
+            self._branches_tripped = True
+            self.simulator.engine.rebuild_power_flow(self.simulator.base_values)
+
+        self.applied_events += applied
+        return applied
+
+    def _targets(self, event: ScenarioEvent) -> Dict[ElementType, np.ndarray]:
+        """Block rows addressed by an event, grouped by element type"""
+        blocks = self.simulator.engine.blocks
+        if event.element_ids is None:
+            block = blocks.get(event.element_type)
+            return {event.element_type: np.arange(block.size)} if block is not None else {}
+
+        # Unknown ids (other shards, deleted elements) are skipped
+        grouped: Dict[ElementType, List[int]] = {}
+        for element_id in event.element_ids:
+            for element_type, block in blocks.items():
+                row = block.index.get(element_id)
+                if row is not None:
+                    grouped.setdefault(element_type, []).append(row)
+                    break
+        return {element_type: np.asarray(rows, dtype=np.int64) for element_type, rows in grouped.items()}
+
+    def _apply(self, event: ScenarioEvent) -> bool:
+        """Apply one event as a batched update per element block; returns True if branches changed"""
+        network_changed = False
+        for element_type, rows in self._targets(event).items():
+            block = self.simulator.engine.blocks[element_type]
+
+            if event.action in ("trip", "restore"):
+                block.outage[rows] = event.action == "trip"
+                network_changed |= element_type in BRANCH_TYPES
+
+            elif event.action in ("scale", "unscale", "shed"):
+                param = event.param or RATING_PARAMS.get(element_type)
+                if param not in block.params:
+                    continue
+                layers = self._layers.setdefault((element_type, param), {})
+                if event.action == "unscale":
+                    layers.pop(event.layer, None)
+                else:
+                    layers[event.layer] = event
+                self._recompute_modifier(element_type, param)
+
+        return network_changed
+
+    def _recompute_modifier(self, element_type: ElementType, param: str):
+        """Rebuild one parameter modifier as the product of its active scale layers"""
+        block = self.simulator.engine.blocks[element_type]
+        modifier = np.ones(block.size)
+        for event in self._layers.get((element_type, param), {}).values():
+            rows = self._targets(event).get(element_type)
+            if rows is None:
+                continue
+            if event.action == "shed":
+                # Disconnect low priority demand for the whole scenario
+                rows = rows[block.params["priority"][rows] == PRIORITY_LOW]
+            modifier[rows] *= event.factor
+        block.modifiers[param] = modifier
+
+    def _random_faults(self) -> bool:
+        """Trip in-service elements with the scenario's per-cycle fault probability"""
+        network_changed = False
+        for element_type, block in self.simulator.engine.blocks.items():
+            rows = np.flatnonzero(block.in_service)
+            if rows.size == 0:
+                continue
+            draws = self.simulator.random.uniform(f"scenario.faults.{element_type.value.lower()}", rows.size)
+            faulted = rows[draws < self.scenario.fault_probability]
+            if faulted.size:
+                block.outage[faulted] = True
+                self.faults += faulted.size
+                network_changed |= element_type in BRANCH_TYPES
+                logger.warning(f"Scenario fault: {faulted.size} {element_type.value} element(s) tripped")
+        return network_changed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Running scenario progress"""
+        if not self.active:
+            return {"active": False}
+
+        elapsed = (self.simulator.clock.now() - self.started_at).total_seconds()
+        return {
+            "active": True,
+            "name": self.scenario.name,
+            "description": self.scenario.description,
+            "started_at": self.started_at.isoformat(),
+            "elapsed": elapsed,
+            "duration": self.scenario.duration,
+            "pending_events": len(self._timeline),
+            "applied_events": self.applied_events,
+            "faults": self.faults,
+            "tripped": {
+                element_type.value: int(block.outage.sum())
+                for element_type, block in self.simulator.engine.blocks.items()
+                if block.outage.any()
+            }
+        }
@@ -0,0 +1,296 @@
+# telemetry-simulator/sharding.py
+import asyncio
+import queue
+import signal
+import sys
+import zlib
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from config import settings
+from models import SimulatorState, SimulationScenario
+from database import db_manager
+
+
+def shard_of(element_id: str, shard_count: int) -> int:
+    """Stable hash partitioning of elements across shards (independent of PYTHONHASHSEED)"""
+    return zlib.crc32(element_id.encode()) % shard_count
+
+
+def aggregate_states(states: List[SimulatorState]) -> SimulatorState:
+    """Combine per-shard simulator states into one service-wide view"""
+    if not states:
+        return SimulatorState()
+
+    start_times = [s.start_time for s in states if s.start_time]
+    last_updates = [s.last_update for s in states if s.last_update]
+
+    return SimulatorState(
+        is_running=any(s.is_running for s in states),
+        start_time=min(start_times) if start_times else None,
+        # A cycle is complete once every shard has finished it
+        update_count=min(s.update_count for s in states),
+        error_count=sum(s.error_count for s in states),
+        last_update=min(last_updates) if last_updates else None,
+        active_elements=sum(s.active_elements for s in states),
+        active_alarms=sum(s.active_alarms for s in states),
+        # The slowest shard bounds the service-wide cycle time
+        avg_update_time=max(s.avg_update_time for s in states),
+        total_telemetry_sent=sum(s.total_telemetry_sent for s in states),
+        total_alarms_generated=sum(s.total_alarms_generated for s in states),
+        current_scenario=next((s.current_scenario for s in states if s.current_scenario), None)
+    )
+
+
+# Millisecond stats that accumulate rather than describe one operation
+_CUMULATIVE_MS = {"blocked_ms"}
+
+
+def _combine(key: str, values: List[Any]) -> Any:
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+    if all(isinstance(v, dict) for v in present):
+        keys = dict.fromkeys(k for v in present for k in v)
+        return {k: _combine(k, [v.get(k) for v in present]) for k in keys}
+    if all(isinstance(v, bool) for v in present):
+        return any(present)
+    if all(isinstance(v, (int, float)) for v in present):
+        # Latencies are bounded by the slowest shard, everything else adds up
+        if key.endswith("_ms") and key not in _CUMULATIVE_MS:
+            return max(present)
+        return sum(present)
+    if key == "status":
+        return next((v for v in present if v != "healthy"), present[0])
+    return present[0]
+
+
+def aggregate_stats(reports: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine per-shard component stats (writers, caches, spool, health) into one view"""
+    return _combine("", reports) or {}
+
+
+def _shard_worker_main(shard_index: int, shard_count: int, stats_queue, command_queue):
+    """Worker process entry point: run one shard with its own sink connections"""
+    # The coordinator owns shutdown; ignore terminal interrupts delivered to the process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=settings.LOG_LEVEL,
+        format=f"{{time:YYYY-MM-DD HH:mm:ss}} | {{level: <8}} | shard {shard_index} | {{message}}"
+    )
+
+    asyncio.run(_run_shard(shard_index, shard_count, stats_queue, command_queue))
+
+
+async def _run_shard(shard_index: int, shard_count: int, stats_queue, command_queue):
+    """Run the simulator for one partition while reporting stats and applying commands"""
+    from simulator import GridSimulator
+
+    simulator = GridSimulator(shard_index=shard_index, shard_count=shard_count)
+    await simulator.initialize()
+
+    def report():
+        stats_queue.put((
+            shard_index, simulator.get_state().dict(), simulator.clock.snapshot(), simulator.scenarios.snapshot(),
+            simulator.component_stats()
+        ))
+    
+    async def report_stats():
+        while simulator.state.is_running:
+            report()
+            await asyncio.sleep(settings.SHARD_STATS_INTERVAL)
+
+    async def apply_commands():
+        loop = asyncio.get_running_loop()
+        while simulator.state.is_running:
+            try:
+                command, payload = await loop.run_in_executor(None, command_queue.get, True, 1.0)
+            except queue.Empty:
+                continue
+
+            if command == "stop":
+                await simulator.stop()
+            elif command == "clock.configure":
+                simulator.clock.configure(**payload)
+            elif command == "clock.pause":
+                simulator.clock.pause()
+            elif command == "clock.resume":
+                simulator.clock.resume()
+            elif command == "clock.step":
+                simulator.clock.step(payload)
+            elif command == "scenario.start":
+                try:
+                    simulator.scenarios.start(SimulationScenario(**payload))
+                except Exception as e:
+                    logger.error(f"Failed to start scenario: {e}")
+            elif command == "scenario.stop":
+                simulator.scenarios.stop()
+            else:
+                logger.warning(f"Unknown shard command: {command}")
+
+    tasks = [asyncio.create_task(report_stats()), asyncio.create_task(apply_commands())]
+    try:
+        await simulator.run()
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Final stats so the coordinator sees the shard's last counters
+        report()
+
+
+class ShardClockProxy:
+    """Fans clock control out to every shard worker"""
+
+    def __init__(self, coordinator: "ShardCoordinator"):
+        self.coordinator = coordinator
+
+    def configure(self, mode=None, speed=None, start_time: Optional[datetime] = None, overrun_policy=None):
+        self.coordinator.broadcast("clock.configure", {
+            "mode": mode, "speed": speed, "start_time": start_time, "overrun_policy": overrun_policy
+        })
+
+    def pause(self):
+        self.coordinator.broadcast("clock.pause")
+
+    def resume(self):
+        self.coordinator.broadcast("clock.resume")
+
+    def step(self, count: int = 1):
+        self.coordinator.broadcast("clock.step", count)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Clock state as last reported by the first shard"""
+        snapshots = self.coordinator.clock_snapshots
+        return snapshots[min(snapshots)] if snapshots else {}
+
+
+class ShardScenarioProxy:
+    """Starts and stops scenarios on every shard worker"""
+
+    def __init__(self, coordinator: "ShardCoordinator"):
+        self.coordinator = coordinator
+
+    def start(self, scenario: SimulationScenario):
+        # Compile locally first so invalid scenarios are rejected before reaching the workers
+        from scenarios import compile_timeline
+        compile_timeline(scenario)
+        self.coordinator.broadcast("scenario.start", scenario.dict(exclude_unset=True))
+
+    def stop(self):
+        self.coordinator.broadcast("scenario.stop")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Scenario progress as last reported by the first shard"""
+        snapshots = self.coordinator.scenario_snapshots
+        return snapshots[min(snapshots)] if snapshots else {"active": False}
+
+
+class ShardCoordinator:
+    """Partitions the grid across worker processes and aggregates their state"""
+
+    def __init__(self, shard_count: int):
+        self.shard_count = shard_count
+        self.state = SimulatorState()
+        self.clock = ShardClockProxy(self)
+        self.scenarios = ShardScenarioProxy(self)
+        self.shard_states: Dict[int, SimulatorState] = {}
+        self.clock_snapshots: Dict[int, Dict[str, Any]] = {}
+        self.scenario_snapshots: Dict[int, Dict[str, Any]] = {}
+        self.shard_component_stats: Dict[int, Dict[str, Any]] = {}
+
+        self._context = get_context("spawn")
+        self._stats_queue = self._context.Queue()
+        self._command_queues = []
+        self._processes = []
+        self._reported_exits = set()
+
+    async def initialize(self):
+        """Start one worker process per shard"""
+        # The coordinator only needs connections for its own health reporting
+        await db_manager.initialize()
+
+        for shard_index in range(self.shard_count):
+            command_queue = self._context.Queue()
+            process = self._context.Process(
+                target=_shard_worker_main,
+                args=(shard_index, self.shard_count, self._stats_queue, command_queue),
+                name=f"simulator-shard-{shard_index}",
+                daemon=True
+            )
+            process.start()
+            self._command_queues.append(command_queue)
+            self._processes.append(process)
+
+        self.state.is_running = True
+        self.state.start_time = datetime.now()
+        logger.info(f"Shard coordinator started {self.shard_count} simulator workers")
+
+    def broadcast(self, command: str, payload: Any = None):
+        """Send a control command to every shard"""
+        for command_queue in self._command_queues:
+            command_queue.put((command, payload))
+
+    def _drain_stats(self):
+        """Apply all pending per-shard stats reports"""
+        try:
+            while True:
+                shard_index, state, clock, scenario, components = self._stats_queue.get_nowait()
+                self.shard_states[shard_index] = SimulatorState(**state)
+                self.clock_snapshots[shard_index] = clock
+                self.scenario_snapshots[shard_index] = scenario
+                self.shard_component_stats[shard_index] = components
+        except queue.Empty:
+            pass
+
+    async def run(self):
+        """Aggregate shard stats until stopped and report shards that die"""
+        logger.info("Starting sharded grid simulation...")
+
+        while self.state.is_running:
+            self._drain_stats()
+
+            for shard_index, process in enumerate(self._processes):
+                if process.exitcode not in (0, None) and shard_index not in self._reported_exits:
+                    logger.error(f"Shard {shard_index} exited with code {process.exitcode}")
+                    self.state.error_count += 1
+                    self._reported_exits.add(shard_index)
+
+            if self._processes and not any(p.is_alive() for p in self._processes):
+                logger.error("All simulator shards have exited")
+                break
+
+            await asyncio.sleep(settings.SHARD_STATS_INTERVAL)
+
+    async def stop(self):
+        """Stop all shards and wait for them to flush their sinks"""
+        self.state.is_running = False
+        self.broadcast("stop")
+
+        loop = asyncio.get_running_loop()
+        for process in self._processes:
+            await loop.run_in_executor(None, process.join, settings.SHARD_STOP_TIMEOUT)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not stop in time, terminating")
+                process.terminate()
+
+        self._drain_stats()
+        await db_manager.close()
+        logger.info("Sharded grid simulation stopped")
+
+    def get_state(self) -> SimulatorState:
+        """Service-wide state aggregated from every shard"""
+        self._drain_stats()
+        aggregated = aggregate_states(list(self.shard_states.values()))
+        aggregated.is_running = self.state.is_running and aggregated.is_running
+        aggregated.error_count += self.state.error_count
+        return aggregated
+
+    def component_stats(self) -> Dict[str, Any]:
+        """Sink and dependency stats summed over every shard; the coordinator's own sinks stay idle"""
+        self._drain_stats()
+        return aggregate_stats(list(self.shard_component_stats.values()))
@@ -0,0 +1,233 @@
+# telemetry-simulator/sim_clock.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Dict, Optional
+from loguru import logger
+
+
+class ClockMode(str, Enum):
+    REALTIME = "realtime"        # Simulated time follows the wall clock
+    ACCELERATED = "accelerated"  # Simulated time runs N× faster than the wall clock
+    FREE_RUN = "free_run"        # Cycles run back to back, as fast as the sinks accept
+    STEP = "step"                # One cycle per explicit step request
+
+
+class OverrunPolicy(str, Enum):
+    SKIP = "skip"                # Drop missed deadlines and wait for the next one on the grid
+    CATCH_UP = "catch_up"        # Run missed cycles back to back until on schedule again
+    COALESCE = "coalesce"        # Run one cycle now for all missed deadlines, then stay on the grid
+
+
+class SimulationClock:
+    """Pluggable simulation clock with time-warp and pause/step control
+
+    Continuous modes fire ticks on absolute monotonic deadlines spaced interval/speed
+    apart, so the cycle period does not stretch by the time a cycle takes. When a
+    cycle overruns its slot the overrun policy decides what happens to the deadlines
+    that went by in the meantime.
+    """
+
+    def __init__(self, mode: ClockMode = ClockMode.REALTIME, speed: float = 1.0,
+                 start_time: Optional[datetime] = None,
+                 overrun_policy: OverrunPolicy = OverrunPolicy.COALESCE, max_catch_up: int = 10):
+        self.mode = ClockMode(mode)
+        self.speed = speed if self.mode == ClockMode.ACCELERATED else 1.0
+        self.paused = False
+        self.ticks = 0
+        self.overrun_policy = OverrunPolicy(overrun_policy)
+        self.max_catch_up = max_catch_up
+
+        # Continuous modes map the monotonic clock onto simulated time from an anchor point
+        self._anchor_sim = start_time or datetime.now()
+        self._anchor_wall = time.monotonic()
+
+        # Discrete modes advance simulated time by one interval per tick
+        self._sim_time = self._anchor_sim
+
+        # Monotonic deadline of the last tick; the next one is due one period later
+        self._deadline = self._anchor_wall
+
+        self._pending_steps = 0
+        self._wakeup = asyncio.Event()
+
+        self.schedule_stats: Dict[str, Any] = {
+            "scheduled_ticks": 0,
+            "overruns": 0,
+            "missed_deadlines": 0,
+            "last_lateness": 0.0,
+            "max_lateness": 0.0,
+            "mean_lateness": 0.0
+        }
+
+    @property
+    def is_continuous(self) -> bool:
+        return self.mode in (ClockMode.REALTIME, ClockMode.ACCELERATED)
+
+    def now(self) -> datetime:
+        """Current simulated time"""
+        if not self.is_continuous:
+            return self._sim_time
+
+        if self.paused:
+            return self._anchor_sim
+
+        elapsed = (time.monotonic() - self._anchor_wall) * self.speed
+        return self._anchor_sim + timedelta(seconds=elapsed)
+
+    def tick_time(self) -> datetime:
+        """Simulated time the current tick was scheduled for
+
+        Equals now() in discrete modes; in continuous modes it sits exactly on the
+        deadline grid, so timestamps keep the configured cadence even when a cycle
+        starts late or is being caught up.
+        """
+        if not self.is_continuous or self.paused:
+            return self.now()
+        elapsed = (self._deadline - self._anchor_wall) * self.speed
+        return self._anchor_sim + timedelta(seconds=elapsed)
+
+    def _reanchor(self, sim_time: datetime):
+        """Restart time tracking from the given simulated time"""
+        self._anchor_sim = sim_time
+        self._anchor_wall = time.monotonic()
+        self._sim_time = sim_time
+        # Restart the deadline grid, ticks from the old speed or anchor no longer apply
+        self._deadline = self._anchor_wall
+
+    def configure(self, mode: Optional[ClockMode] = None, speed: Optional[float] = None,
+                  start_time: Optional[datetime] = None, overrun_policy: Optional[OverrunPolicy] = None):
+        """Switch clock mode, warp factor or simulated time without losing continuity"""
+        current = start_time or self.now()
+
+        if overrun_policy is not None:
+            self.overrun_policy = OverrunPolicy(overrun_policy)
+
+        if mode is not None:
+            self.mode = ClockMode(mode)
+        if speed is not None:
+            if speed <= 0:
+                raise ValueError("Clock speed must be positive")
+            self.speed = speed
+        if self.mode == ClockMode.REALTIME:
+            self.speed = 1.0
+
+        self._reanchor(current)
+        self._wakeup.set()
+        logger.info(f"Simulation clock set to {self.mode.value} (x{self.speed}) at {current.isoformat()}")
+
+    def reset_schedule(self):
+        """Start the deadline grid from now, e.g. right before the first cycle"""
+        self._deadline = time.monotonic()
+
+    def pause(self):
+        """Freeze simulated time and hold the cycle loop"""
+        if not self.paused:
+            self._reanchor(self.now())
+            self.paused = True
+            logger.info("Simulation clock paused")
+
+    def resume(self):
+        """Continue from the simulated time at which the clock was paused"""
+        if self.paused:
+            self._reanchor(self.now())
+            self.paused = False
+            self._wakeup.set()
+            logger.info("Simulation clock resumed")
+
+    def advance(self, seconds: float):
+        """Move simulated time forward directly (discrete modes, e.g. offline generation)"""
+        if self.is_continuous:
+            raise RuntimeError("Clock can only be advanced manually in free_run or step mode")
+        self._sim_time += timedelta(seconds=seconds)
+
+    def step(self, count: int = 1):
+        """Release a number of cycles while in step mode"""
+        self._pending_steps += max(0, count)
+        self._wakeup.set()
+
+    async def _wait_for_wakeup(self):
+        self._wakeup.clear()
+        await self._wakeup.wait()
+
+    def _record_lateness(self, lateness: float):
+        stats = self.schedule_stats
+        stats["last_lateness"] = lateness
+        stats["max_lateness"] = max(stats["max_lateness"], lateness)
+        stats["scheduled_ticks"] += 1
+        stats["mean_lateness"] += (lateness - stats["mean_lateness"]) / stats["scheduled_ticks"]
+
+    async def _wait_deadline(self, period: float) -> bool:
+        """Sleep until the next deadline; False if reconfigured or paused meanwhile"""
+        deadline = self._deadline + period
+        now = time.monotonic()
+
+        if now > deadline:
+            # The last cycle ran past its slot
+            self.schedule_stats["overruns"] += 1
+            missed = int((now - deadline) // period)
+
+            if self.overrun_policy == OverrunPolicy.SKIP:
+                deadline += (missed + 1) * period
+                self.schedule_stats["missed_deadlines"] += missed + 1
+            elif self.overrun_policy == OverrunPolicy.COALESCE:
+                deadline += missed * period
+                self.schedule_stats["missed_deadlines"] += missed
+            elif missed > self.max_catch_up:
+                # Too far behind to replay everything, drop the oldest backlog
+                dropped = missed - self.max_catch_up
+                deadline += dropped * period
+                self.schedule_stats["missed_deadlines"] += dropped
+
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._wait_for_wakeup(), timeout=delay)
+                return False
+            except asyncio.TimeoutError:
+                if self.paused:
+                    return False
+
+        self._deadline = deadline
+        self._record_lateness(max(0.0, time.monotonic() - deadline))
+        return True
+
+    async def wait_next(self, interval: float):
+        """Wait until the next cycle is due and advance simulated time accordingly"""
+        while True:
+            if self.paused:
+                await self._wait_for_wakeup()
+                continue
+
+            if self.mode == ClockMode.STEP:
+                if self._pending_steps == 0:
+                    await self._wait_for_wakeup()
+                    continue
+                self._pending_steps -= 1
+                self._sim_time += timedelta(seconds=interval)
+                break
+
+            if self.mode == ClockMode.FREE_RUN:
+                self._sim_time += timedelta(seconds=interval)
+                await asyncio.sleep(0)  # Let sinks and endpoints make progress
+                break
+
+            # Continuous modes: sleep until the next warped deadline unless reconfigured meanwhile
+            if await self._wait_deadline(interval / self.speed):
+                break
+
+        self.ticks += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Clock state for the control endpoints"""
+        return {
+            "mode": self.mode.value,
+            "speed": self.speed,
+            "paused": self.paused,
+            "sim_time": self.now().isoformat(),
+            "ticks": self.ticks,
+            "pending_steps": self._pending_steps,
+            "overrun_policy": self.overrun_policy.value,
+            "schedule": dict(self.schedule_stats)
+        }
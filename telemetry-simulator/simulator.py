@@ -16,85 +16,197 @@ from models import (
 )
 from database import db_manager
 from websocket_client import WebSocketClient
+from engine import VectorizedEngine, CycleContext, CycleResult
+from alarms import AlarmEngine, AlarmTransition, ActiveAlarmIndex, CLEAR, UPDATE
+from alarm_sink import AlarmSink
+from sim_clock import SimulationClock
+from rng import RandomStreams
+from sharding import shard_of
+from topology_sync import TopologySynchronizer
+from topology_snapshot import TopologySnapshotManager
+from scenarios import ScenarioEngine
+from sampling import SamplingScheduler
+from telemetry_batch import TelemetryBatch
+from pipeline import TelemetryPipeline
+from pmu import PMUStreamer
 
 
 class GridSimulator:
     """Advanced grid telemetry simulator with realistic power system modeling"""
     
-    def __init__(self):
+    def __init__(self, shard_index: int = 0, shard_count: int = 1):
         self.elements: Dict[str, GridElement] = {}
+        self.shard_index = shard_index
+        self.shard_count = shard_count
         self.state = SimulatorState()
         self.ws_client = WebSocketClient()
         self.base_values: Dict[str, Dict] = {}
+        self.random = RandomStreams(
+            seed=settings.SIMULATION_SEED,
+            shard=shard_index,
+            block_cycles=settings.NOISE_BLOCK_CYCLES
+        )
+        # A shard only holds its crc32 slice of buses, branches and devices: a network solved on
+        # that slice would drop cross-shard branches and injections, so shards keep the statistical model
+        if settings.POWER_FLOW_ENABLED and shard_count > 1:
+            logger.warning("DC power flow is disabled in sharded mode (SIMULATOR_SHARDS > 1), "
+                           "line and transformer flows use the statistical model")
+        self.engine = VectorizedEngine(self.random, power_flow_enabled=shard_count == 1)
+        self.topology_sync = TopologySynchronizer(self)
+        self.topology_snapshot = TopologySnapshotManager(self)
+        self.scenarios = ScenarioEngine(self)
+        self.clock = SimulationClock(
+            mode=settings.SIM_CLOCK_MODE,
+            speed=settings.SIM_CLOCK_SPEED,
+            start_time=settings.SIM_START_TIME,
+            overrun_policy=settings.SIM_OVERRUN_POLICY,
+            max_catch_up=settings.SIM_MAX_CATCH_UP
+        )
         self.load_curve = self._generate_daily_load_curve()
         self.seasonal_factors = self._generate_seasonal_factors()
+        self._seasonal_day = self.clock.now().timetuple().tm_yday
+        self.sampling = SamplingScheduler()
+        self.pmu = PMUStreamer(self)
         self.weather_effects = {"temperature": 20, "wind_speed": 5, "solar_irradiance": 0.8}
+        self.load_hour_override: Optional[float] = None  # fixed load curve hour set by scenarios
         
-        # Alarm thresholds
+        # Alarm thresholds (per class; elements can override with an alarm_<key> property)
         self.alarm_thresholds = {
             "voltage_high": 1.05,
             "voltage_low": 0.95,
             "frequency_high": 50.5,
             "frequency_low": 49.5,
+            "generator_overload": 95,
             "line_overload": 0.9,
             "temperature_high": 80,
-            "oil_temp_high": 85
+            "oil_temp_high": 85,
+            "transformer_overload": 90
         }
+        self.alarms = AlarmEngine(self.engine, self.alarm_thresholds, self.base_values)
+        
+        # Recently raised alarms, bounded and expiring, for the active alarm count
+        self.alarm_index = ActiveAlarmIndex(
+            active_window=settings.ALARM_ACTIVE_WINDOW,
+            max_entries=settings.ALARM_INDEX_MAX_ENTRIES
+        )
+        self.alarm_sink = AlarmSink(self.ws_client)
         
-        # Recent alarms tracking (to avoid spam)
-        self.recent_alarms: Dict[str, datetime] = {}
+        # Sink I/O runs in its own stages behind bounded queues
+        self.pipeline = TelemetryPipeline()
+        self._configure_pipeline()
+    
+    def _configure_pipeline(self):
+        """Register a pipeline stage per sink for the configured submission method"""
+        if settings.FIELD_DEVICE_MODE:
+            # Send via API as field device
+            self.pipeline.add_sink("http", "telemetry", self._send_telemetry_via_api,
+                                   settings.PIPELINE_HTTP_QUEUE_DEPTH, settings.PIPELINE_HTTP_DROP_POLICY)
+        else:
+            # Original method: store in DB, cache and emit via WebSocket
+            if settings.TELEMETRY_DIRECT_WRITE:
+                self.pipeline.add_sink("postgres", "telemetry", db_manager.store_telemetry_batch,
+                                       settings.PIPELINE_POSTGRES_QUEUE_DEPTH, settings.PIPELINE_POSTGRES_DROP_POLICY)
+            if settings.REDIS_STREAM_ENABLED:
+                # Durable fan-out; telemetry_streams.py consumers ingest into TimescaleDB
+                self.pipeline.add_sink("stream", "telemetry", db_manager.publish_telemetry_stream,
+                                       settings.PIPELINE_STREAM_QUEUE_DEPTH, settings.PIPELINE_STREAM_DROP_POLICY)
+            self.pipeline.add_sink("redis", "telemetry", db_manager.cache_latest_telemetry,
+                                   settings.PIPELINE_REDIS_QUEUE_DEPTH, settings.PIPELINE_REDIS_DROP_POLICY)
+            self.pipeline.add_sink("websocket", "telemetry", self.ws_client.emit_telemetry,
+                                   settings.PIPELINE_WEBSOCKET_QUEUE_DEPTH, settings.PIPELINE_WEBSOCKET_DROP_POLICY)
+        
+        self.pipeline.add_sink("alarms", "alarms", self._deliver_alarms,
+                               settings.PIPELINE_ALARMS_QUEUE_DEPTH, settings.PIPELINE_ALARMS_DROP_POLICY)
     
     async def initialize(self):
         """Initialize the simulator"""
         await db_manager.initialize()
+        # Each shard spools into its own locked directory
+        if db_manager.telemetry_spool:
+            db_manager.telemetry_spool.open(self.shard_index)
+        # Shards share the database, one of them owning the hypertable policies is enough
+        if settings.TIMESCALE_MANAGE_POLICIES and self.shard_index == 0:
+            await db_manager.timescale.apply()
         await self.ws_client.connect()
         await self.load_grid_elements()
         self._initialize_base_values()
+        self.engine.load(self.elements, self.base_values)
+        self.sampling.load(self.engine, self.base_values)
+        self.topology_sync.mark()
         self.state.is_running = True
         self.state.start_time = datetime.now()
-        logger.info("Grid simulator initialized")
+        logger.info(f"Grid simulator initialized (clock: {self.clock.mode.value})")
     
     async def load_grid_elements(self):
-        """Load grid elements from Neo4j database"""
-        elements = await db_manager.get_grid_elements()
+        """Load grid elements from the local snapshot or the Neo4j database"""
+        if settings.TOPOLOGY_SNAPSHOT_ENABLED:
+            elements = await self.topology_snapshot.load_elements()
+        else:
+            elements = await db_manager.get_grid_elements()
+        
+        # In sharded mode each worker only simulates its own partition of the grid
+        if self.shard_count > 1:
+            elements = [e for e in elements if shard_of(e.id, self.shard_count) == self.shard_index]
+        
         self.elements = {element.id: element for element in elements}
         self.state.active_elements = len([e for e in elements if e.status == ElementStatus.ACTIVE])
         logger.info(f"Loaded {len(self.elements)} grid elements")
     
+    def apply_topology_changes(self, changed: List[GridElement], removed: List[str]) -> bool:
+        """Apply element deltas without reloading the grid; returns True if the power flow needs a rebuild"""
+        for element_id in removed:
+            self.elements.pop(element_id, None)
+            self.base_values.pop(element_id, None)
+        
+        for element in changed:
+            self.elements[element.id] = element
+            self.base_values[element.id] = self._base_value(element)
+        
+        self.state.active_elements = sum(1 for e in self.elements.values() if e.status == ElementStatus.ACTIVE)
+        self.alarms.invalidate()
+        network_changed = self.engine.apply_changes(
+            self.elements, self.base_values, [element.id for element in changed], removed
+        )
+        self.sampling.load(self.engine, self.base_values)
+        return network_changed
+    
     def _initialize_base_values(self):
         """Initialize base values for simulation"""
         for element_id, element in self.elements.items():
-            base_value = {
-                "type": element.element_type,
-                "status": element.status,
-                "properties": element.properties
-            }
+            self.base_values[element_id] = self._base_value(element)
+    
+    def _base_value(self, element: GridElement) -> Dict:
+        """Base values for one element"""
+        base_value = {
+            "type": element.element_type,
+            "status": element.status,
+            "properties": element.properties
+        }
+        
+        # Set type-specific base values
+        if element.element_type == ElementType.BUS:
+            base_value["voltage"] = element.voltage_level or 110
             
-            # Set type-specific base values
-            if element.element_type == ElementType.BUS:
-                base_value["voltage"] = element.voltage_level or 110
-                
-            elif element.element_type == ElementType.GENERATOR:
-                base_value["capacity"] = element.capacity or 100
-                base_value["output"] = element.output or 0
-                base_value["efficiency"] = element.properties.get("efficiency", 90)
-                
-            elif element.element_type == ElementType.LOAD:
-                base_value["demand"] = element.demand or 50
-                base_value["power_factor"] = element.properties.get("power_factor", 0.95)
-                base_value["priority"] = element.properties.get("priority", "medium")
-                
-            elif element.element_type == ElementType.LINE:
-                base_value["capacity"] = element.properties.get("capacity", 100)
-                base_value["resistance"] = element.resistance or 0.01
-                base_value["reactance"] = element.reactance or 0.05
-                
-            elif element.element_type == ElementType.TRANSFORMER:
-                base_value["rating"] = element.rating or 100
-                base_value["tap_ratio"] = element.tap_ratio or 1.0
-                base_value["oil_temp_base"] = 40
+        elif element.element_type == ElementType.GENERATOR:
+            base_value["capacity"] = element.capacity or 100
+            base_value["output"] = element.output or 0
+            base_value["efficiency"] = element.properties.get("efficiency", 90)
+            
+        elif element.element_type == ElementType.LOAD:
+            base_value["demand"] = element.demand or 50
+            base_value["power_factor"] = element.properties.get("power_factor", 0.95)
+            base_value["priority"] = element.properties.get("priority", "medium")
             
-            self.base_values[element_id] = base_value
+        elif element.element_type == ElementType.LINE:
+            base_value["capacity"] = element.properties.get("capacity", 100)
+            base_value["resistance"] = element.resistance or 0.01
+            base_value["reactance"] = element.reactance or 0.05
+            
+        elif element.element_type == ElementType.TRANSFORMER:
+            base_value["rating"] = element.rating or 100
+            base_value["tap_ratio"] = element.tap_ratio or 1.0
+        
+        return base_value
     
     def _generate_daily_load_curve(self) -> List[float]:
         """Generate realistic daily load curve (24 hours)"""
@@ -129,7 +241,7 @@ class GridSimulator:
     
     def _generate_seasonal_factors(self) -> Dict[str, float]:
         """Generate seasonal adjustment factors"""
-        now = datetime.now()
+        now = self.clock.now()
         day_of_year = now.timetuple().tm_yday
         
         # Seasonal load variation (higher in summer and winter)
@@ -147,10 +259,12 @@ class GridSimulator:
             "wind": max(0.3, wind_seasonal)
         }
     
-    def get_current_load_factor(self) -> float:
-        """Get current load factor based on time of day"""
-        now = datetime.now()
+    def _base_load_factor(self) -> float:
+        """Get system load factor from the daily curve and season (without noise)"""
+        now = self.clock.now()
         hour = now.hour + now.minute / 60.0
+        if self.load_hour_override is not None:
+            hour = self.load_hour_override
         
         # Interpolate load curve
         hour_index = int(hour)
@@ -163,268 +277,39 @@ class GridSimulator:
         )
         
         # Apply seasonal variation
-        current_factor *= self.seasonal_factors["load"]
+        return current_factor * self.seasonal_factors["load"]
+    
+    def get_current_load_factor(self) -> float:
+        """Get current load factor based on time of day"""
+        current_factor = self._base_load_factor()
         
         # Add small random variation
-        current_factor *= (1 + np.random.normal(0, 0.02))
+        current_factor *= (1 + self.random.normal("system.load_factor", 1, 0, 0.02)[0])
         
         return max(0.3, min(1.5, current_factor))
     
-    def add_noise(self, value: float, noise_factor: float, distribution: str = "normal") -> float:
-        """Add realistic noise to measurements"""
-        if distribution == "normal":
-            noise = np.random.normal(0, noise_factor)
-        elif distribution == "uniform":
-            noise = np.random.uniform(-noise_factor, noise_factor)
-        else:
-            noise = 0
-        
-        return value * (1 + noise)
-    
-    async def simulate_bus_telemetry(self, element_id: str, base_value: Dict) -> TelemetryMetrics:
-        """Simulate bus telemetry with voltage regulation effects"""
-        nominal_voltage = base_value["voltage"]
-        
-        # Base voltage with load-dependent variation
-        load_factor = self.get_current_load_factor()
-        voltage_drop = 0.03 * load_factor  # 3% drop at full load
-        
-        voltage = nominal_voltage * (1 - voltage_drop)
-        voltage = self.add_noise(voltage, settings.VOLTAGE_NOISE_FACTOR)
-        
-        # Calculate voltage change percentage
-        voltage_change = ((voltage - nominal_voltage) / nominal_voltage) * 100
-        
-        # Check for voltage regulation issues
-        await self._check_voltage_alarms(element_id, voltage, nominal_voltage)
-        
-        return TelemetryMetrics(
-            element_id=element_id,
-            element_type=ElementType.BUS,
-            status=ElementStatus(base_value["status"]),
-            voltage=voltage,
-            voltage_level=nominal_voltage,
-            voltage_change=voltage_change,
-            frequency=self.add_noise(50.0, settings.FREQUENCY_NOISE_FACTOR)
-        )
-    
-    async def simulate_generator_telemetry(self, element_id: str, base_value: Dict) -> TelemetryMetrics:
-        """Simulate generator telemetry with realistic power plant behavior"""
-        if base_value["status"] != "active":
-            return TelemetryMetrics(
-                element_id=element_id,
-                element_type=ElementType.GENERATOR,
-                status=ElementStatus(base_value["status"]),
-                power=0, frequency=0, voltage=0, efficiency=0
-            )
-        
-        capacity = base_value["capacity"]
-        base_efficiency = base_value["efficiency"]
-        
-        # Determine generator type and adjust output
-        gen_type = base_value["properties"].get("fuel_type", "thermal")
-        load_factor = self.get_current_load_factor()
-        
-        if gen_type == "solar":
-            # Solar generation based on time of day and weather
-            solar_factor = self._calculate_solar_factor()
-            target_output = capacity * solar_factor * self.seasonal_factors["solar"]
-        elif gen_type == "wind":
-            # Wind generation based on wind speed
-            wind_factor = self._calculate_wind_factor()
-            target_output = capacity * wind_factor * self.seasonal_factors["wind"]
-        else:
-            # Thermal/hydro generation follows load
-            target_output = min(capacity * load_factor * np.random.uniform(0.8, 1.0), capacity)
-        
-        # Add generation constraints and ramp rates
-        current_output = base_value.get("current_output", target_output)
-        max_ramp_rate = capacity * 0.05  # 5% per minute
-        
-        if abs(target_output - current_output) > max_ramp_rate:
-            if target_output > current_output:
-                power_output = current_output + max_ramp_rate
-            else:
-                power_output = current_output - max_ramp_rate
-        else:
-            power_output = target_output
-        
-        # Update current output for next iteration
-        base_value["current_output"] = power_output
-        
-        # Calculate efficiency based on loading
-        load_ratio = power_output / capacity if capacity > 0 else 0
-        efficiency = base_efficiency * self._efficiency_curve(load_ratio)
-        
-        # Frequency regulation
-        frequency = 50.0 + np.random.normal(0, 0.05)
-        
-        # Voltage regulation
-        voltage_level = base_value["properties"].get("voltage_level", 22)
-        voltage = self.add_noise(voltage_level, 0.01)
-        
-        # Check for generator alarms
-        await self._check_generator_alarms(element_id, power_output, capacity, frequency)
-        
-        return TelemetryMetrics(
-            element_id=element_id,
-            element_type=ElementType.GENERATOR,
-            status=ElementStatus.ACTIVE,
-            power=power_output,
-            capacity=capacity,
-            load_factor=load_ratio * 100,
-            efficiency=efficiency,
-            frequency=frequency,
-            voltage=voltage,
-            voltage_level=voltage_level
-        )
-    
-    async def simulate_load_telemetry(self, element_id: str, base_value: Dict) -> TelemetryMetrics:
-        """Simulate load telemetry with demand response and priority shedding"""
-        if base_value["status"] != "active":
-            return TelemetryMetrics(
-                element_id=element_id,
-                element_type=ElementType.LOAD,
-                status=ElementStatus(base_value["status"]),
-                power=0, current=0, power_factor=0
-            )
-        
-        base_demand = base_value["demand"]
-        priority = base_value["priority"]
-        load_factor = self.get_current_load_factor()
-        
-        # Adjust demand based on load factor and priority
-        demand_multiplier = load_factor
-        
-        # Priority-based load shedding simulation
-        if load_factor > 1.1:  # System stress
-            if priority == "low":
-                demand_multiplier *= 0.7  # 30% reduction
-            elif priority == "medium":
-                demand_multiplier *= 0.9  # 10% reduction
-            # High priority loads maintain full demand
-        
-        # Add random consumer behavior
-        demand_variation = np.random.uniform(0.85, 1.15)
-        actual_demand = base_demand * demand_multiplier * demand_variation
-        
-        # Power factor variation
-        base_pf = base_value["power_factor"]
-        power_factor = self.add_noise(base_pf, 0.05)
-        power_factor = max(0.7, min(1.0, power_factor))
-        
-        # Calculate current (simplified)
-        voltage_level = base_value["properties"].get("voltage_level", 11)
-        current = actual_demand / (voltage_level * np.sqrt(3) * power_factor) if voltage_level > 0 else 0
-        
-        # Utilization rate
-        utilization_rate = (actual_demand / base_demand) * 100 if base_demand > 0 else 0
-        
-        return TelemetryMetrics(
-            element_id=element_id,
-            element_type=ElementType.LOAD,
-            status=ElementStatus.ACTIVE,
-            power=actual_demand,
-            demand=base_demand,
-            current=current,
-            power_factor=power_factor,
-            utilization_rate=utilization_rate,
-            voltage_level=voltage_level
-        )
-    
-    async def simulate_line_telemetry(self, element_id: str, base_value: Dict) -> TelemetryMetrics:
-        """Simulate transmission line telemetry with thermal modeling"""
-        if base_value["status"] != "active":
-            return TelemetryMetrics(
-                element_id=element_id,
-                element_type=ElementType.LINE,
-                status=ElementStatus(base_value["status"]),
-                current=0, loading=0, power_flow=0
-            )
-        
-        capacity = base_value["capacity"]
-        resistance = base_value["resistance"]
-        load_factor = self.get_current_load_factor()
-        
-        # Simulate power flow based on system loading
-        base_loading = np.random.uniform(20, 85) * load_factor
-        loading_percent = min(100, base_loading)
-        
-        # Calculate current and power flow
-        current = (loading_percent / 100) * capacity * 10  # Simplified
-        power_flow = (loading_percent / 100) * capacity
-        
-        # I²R losses
-        power_loss = (current / 1000) ** 2 * resistance
-        
-        # Thermal effects
-        ambient_temp = self.weather_effects["temperature"]
-        temperature = ambient_temp + (loading_percent / 100) * 50  # Up to 50°C rise
-        
-        # Check for line alarms
-        await self._check_line_alarms(element_id, loading_percent, temperature)
-        
-        return TelemetryMetrics(
-            element_id=element_id,
-            element_type=ElementType.LINE,
-            status=ElementStatus.ACTIVE,
-            current=current,
-            loading=loading_percent,
-            power_flow=power_flow,
-            power_loss=power_loss,
-            temperature=temperature,
-            capacity=capacity
-        )
-    
-    async def simulate_transformer_telemetry(self, element_id: str, base_value: Dict) -> TelemetryMetrics:
-        """Simulate transformer telemetry with thermal and tap position modeling"""
-        if base_value["status"] != "active":
-            return TelemetryMetrics(
-                element_id=element_id,
-                element_type=ElementType.TRANSFORMER,
-                status=ElementStatus(base_value["status"]),
-                loading=0, oil_temperature=0, winding_temperature=0
-            )
-        
-        rating = base_value["rating"]
-        tap_ratio = base_value["tap_ratio"]
-        base_oil_temp = base_value["oil_temp_base"]
-        load_factor = self.get_current_load_factor()
-        
-        # Loading calculation
-        loading_percent = np.random.uniform(30, 90) * load_factor
-        loading_percent = min(100, loading_percent)
-        
-        power_flow = (loading_percent / 100) * rating
-        
-        # Thermal modeling
-        ambient_temp = self.weather_effects["temperature"]
-        oil_temperature = base_oil_temp + (loading_percent / 100) * 35
-        winding_temperature = oil_temperature + 15 + (loading_percent / 100) * 10
-        
-        # Tap position variation (voltage regulation)
-        tap_variation = np.random.normal(0, 0.1)
-        current_tap = tap_ratio + tap_variation
-        current_tap = max(0.8, min(1.2, current_tap))
-        
-        # Check for transformer alarms
-        await self._check_transformer_alarms(element_id, oil_temperature, loading_percent)
-        
-        return TelemetryMetrics(
-            element_id=element_id,
-            element_type=ElementType.TRANSFORMER,
-            status=ElementStatus.ACTIVE,
-            loading=loading_percent,
-            power_flow=power_flow,
-            oil_temperature=oil_temperature,
-            winding_temperature=winding_temperature,
-            tap_position=current_tap,
-            rating=rating
+    def _cycle_context(self) -> CycleContext:
+        """Collect the system-wide inputs for one batched simulation pass"""
+        # Seasonal factors only change with the simulated day
+        day_of_year = self.clock.now().timetuple().tm_yday
+        if day_of_year != self._seasonal_day:
+            self.seasonal_factors = self._generate_seasonal_factors()
+            self._seasonal_day = day_of_year
+        
+        return CycleContext(
+            load_factor=self._base_load_factor(),
+            solar_factor=self._calculate_solar_factor(),
+            wind_factor=self._calculate_wind_factor(),
+            seasonal_factors=self.seasonal_factors,
+            ambient_temperature=self.weather_effects["temperature"],
+            wind_speed=self.weather_effects["wind_speed"],
+            # Thermal state advances by simulated (not wall-clock) time since each element's last sample
+            time=self.clock.tick_time().timestamp()
         )
     
     def _calculate_solar_factor(self) -> float:
         """Calculate solar generation factor based on time and weather"""
-        now = datetime.now()
+        now = self.clock.now()
         hour = now.hour + now.minute / 60.0
         
         # Solar irradiance curve (sunrise to sunset)
@@ -453,164 +338,73 @@ class GridSimulator:
         else:
             return 0  # Turbine shutdown
     
-    def _efficiency_curve(self, load_ratio: float) -> float:
-        """Generator efficiency curve based on loading"""
-        # Typical thermal plant efficiency curve
-        optimal_load = 0.85
-        if load_ratio <= optimal_load:
-            return 0.7 + 0.3 * (load_ratio / optimal_load)
-        else:
-            return 1.0 - 0.2 * ((load_ratio - optimal_load) / (1 - optimal_load))
-    
-    async def _check_voltage_alarms(self, element_id: str, voltage: float, nominal: float):
-        """Check and generate voltage-related alarms"""
-        voltage_ratio = voltage / nominal
-        
-        if voltage_ratio > self.alarm_thresholds["voltage_high"]:
-            await self._create_alarm(
-                element_id, "HIGH_VOLTAGE", AlarmSeverity.WARNING,
-                f"High voltage: {voltage:.2f}kV ({((voltage_ratio-1)*100):+.1f}%)"
-            )
-        elif voltage_ratio < self.alarm_thresholds["voltage_low"]:
-            await self._create_alarm(
-                element_id, "LOW_VOLTAGE", AlarmSeverity.CRITICAL,
-                f"Low voltage: {voltage:.2f}kV ({((voltage_ratio-1)*100):+.1f}%)"
-            )
-    
-    async def _check_generator_alarms(self, element_id: str, power: float, capacity: float, frequency: float):
-        """Check generator-specific alarms"""
-        load_factor = (power / capacity) * 100 if capacity > 0 else 0
-        
-        if frequency > self.alarm_thresholds["frequency_high"]:
-            await self._create_alarm(
-                element_id, "HIGH_FREQUENCY", AlarmSeverity.WARNING,
-                f"High frequency: {frequency:.2f}Hz"
-            )
-        elif frequency < self.alarm_thresholds["frequency_low"]:
-            await self._create_alarm(
-                element_id, "LOW_FREQUENCY", AlarmSeverity.WARNING,
-                f"Low frequency: {frequency:.2f}Hz"
-            )
-        
-        if load_factor > 95:
-            await self._create_alarm(
-                element_id, "GENERATOR_OVERLOAD", AlarmSeverity.WARNING,
-                f"Generator near capacity: {load_factor:.1f}%"
-            )
-    
-    async def _check_line_alarms(self, element_id: str, loading: float, temperature: float):
-        """Check transmission line alarms"""
-        if loading > self.alarm_thresholds["line_overload"] * 100:
-            severity = AlarmSeverity.CRITICAL if loading > 95 else AlarmSeverity.WARNING
-            await self._create_alarm(
-                element_id, "LINE_OVERLOAD", severity,
-                f"Line overload: {loading:.1f}%"
-            )
-        
-        if temperature > self.alarm_thresholds["temperature_high"]:
-            await self._create_alarm(
-                element_id, "HIGH_TEMPERATURE", AlarmSeverity.WARNING,
-                f"High conductor temperature: {temperature:.1f}°C"
-            )
-    
-    async def _check_transformer_alarms(self, element_id: str, oil_temp: float, loading: float):
-        """Check transformer-specific alarms"""
-        if oil_temp > self.alarm_thresholds["oil_temp_high"]:
-            await self._create_alarm(
-                element_id, "HIGH_OIL_TEMP", AlarmSeverity.WARNING,
-                f"High oil temperature: {oil_temp:.1f}°C"
-            )
-        
-        if loading > 90:
-            await self._create_alarm(
-                element_id, "TRANSFORMER_OVERLOAD", AlarmSeverity.WARNING,
-                f"Transformer overload: {loading:.1f}%"
-            )
+    async def _publish_alarms(self, transitions: List[AlarmTransition]):
+        """Hand one cycle's alarm transitions to the batched alarm sink"""
+        alarms = []
+        updates = []
+        resolutions = []
+        
+        for transition in transitions:
+            if transition.kind == CLEAR:
+                # The backend API has no resolve endpoint, field devices only report raises
+                if not settings.FIELD_DEVICE_MODE:
+                    resolutions.append((transition.element_id, transition.alarm_type, transition.timestamp))
+                continue
+            
+            # The element may have been deleted by a topology sync since this cycle ran
+            if transition.element_id not in self.elements:
+                continue
+            
+            alarm = transition.to_alarm()
+            if transition.kind == UPDATE:
+                # Severity change of the alarm that is already open
+                updates.append(alarm)
+                continue
+            
+            # Deadtime and hysteresis already debounce raises, the index only counts them
+            self.alarm_index.record(transition.element_id, transition.alarm_type, transition.timestamp)
+            alarms.append(alarm)
+            logger.debug(f"Alarm generated: {alarm.alarm_type} for {alarm.element_id} - {alarm.message}")
+        
+        if alarms or updates or resolutions:
+            self.state.total_alarms_generated += len(alarms)
+            if alarms:
+                logger.warning(f"{len(alarms)} alarms generated this cycle")
+            await self.pipeline.publish("alarms", (alarms, updates, resolutions))
     
-    async def _create_alarm(self, element_id: str, alarm_type: str, severity: AlarmSeverity, message: str):
-        """Create and emit alarm if not recently created"""
-        alarm_key = f"{element_id}:{alarm_type}"
-        now = datetime.now()
-        
-        # Check if similar alarm was created recently (within 5 minutes)
-        if alarm_key in self.recent_alarms:
-            if now - self.recent_alarms[alarm_key] < timedelta(minutes=5):
-                return  # Skip duplicate alarm
-        
-        self.recent_alarms[alarm_key] = now
-        
-        # Create alarm object
-        alarm = AlarmData(
-            id = str(uuid4()),
-            element_id=element_id,
-            element_type=self.elements[element_id].element_type,
-            alarm_type=alarm_type,
-            severity=severity,
-            message=message
-        )
-        
-        # Choose submission method based on configuration
-        if settings.FIELD_DEVICE_MODE:
-            # Send via API as field device
-            await self.ws_client.submit_alarm_via_api(alarm)
-        else:
-            # Original method: store in DB and emit via WebSocket
-            await db_manager.store_alarm(alarm)
-            await self.ws_client.emit_alarm(alarm)
-        
-        self.state.total_alarms_generated += 1
-        logger.warning(f"Alarm generated: {alarm_type} for {element_id} - {message}")
+    async def _deliver_alarms(self, item: Tuple[List[AlarmData], List[AlarmData], List[Tuple[str, str, datetime]]]):
+        """Alarm pipeline stage"""
+        alarms, updates, resolutions = item
+        await self.alarm_sink.publish(alarms, resolutions, updates)
     
     async def run_simulation_cycle(self):
         """Run one simulation cycle for all elements"""
         start_time = datetime.now()
-        telemetry_batch = []
-        api_telemetry_batch = []
         
         try:
-            for element_id, element in self.elements.items():
-                if element.status != ElementStatus.ACTIVE:
-                    continue
-                
-                base_value = self.base_values[element_id]
-                
-                # Generate telemetry based on element type
-                if element.element_type == ElementType.BUS:
-                    metrics = await self.simulate_bus_telemetry(element_id, base_value)
-                elif element.element_type == ElementType.GENERATOR:
-                    metrics = await self.simulate_generator_telemetry(element_id, base_value)
-                elif element.element_type == ElementType.LOAD:
-                    metrics = await self.simulate_load_telemetry(element_id, base_value)
-                elif element.element_type == ElementType.LINE:
-                    metrics = await self.simulate_line_telemetry(element_id, base_value)
-                elif element.element_type == ElementType.TRANSFORMER:
-                    metrics = await self.simulate_transformer_telemetry(element_id, base_value)
-                else:
-                    continue
-                
-                telemetry_batch.append(metrics)
-                
-                # Choose submission method based on configuration
-                if settings.FIELD_DEVICE_MODE:
-                    # Send via API as field device
-                    api_telemetry_batch.append((element_id, metrics))
-                    
-                    # Send in batches
-                    if len(api_telemetry_batch) >= settings.API_BATCH_SIZE:
-                        await self._send_telemetry_batch_via_api(api_telemetry_batch)
-                        api_telemetry_batch = []
-                else:
-                    # Original method: cache and emit via WebSocket
-                    await db_manager.cache_latest_telemetry(element_id, metrics)
-                    await self.ws_client.emit_telemetry(element_id, metrics)
+            # Apply due scenario events before the batched pass
+            self.scenarios.advance(self.clock.tick_time())
+            
+            # Generate telemetry for every element type in one batched pass each
+            # Only the elements whose reporting period is up are simulated and sent
+            context = self._cycle_context()
+            results = self.engine.run_cycle(context, self.sampling.due(context.time))
+            timestamp = self.clock.tick_time()
             
-            # Send remaining batch if in field device mode
-            if settings.FIELD_DEVICE_MODE and api_telemetry_batch:
-                await self._send_telemetry_batch_via_api(api_telemetry_batch)
+            # Evaluate all alarm rules on the cycle arrays; sinks get the transitions after telemetry
+            transitions = [
+                transition for result in results
+                for transition in self.alarms.evaluate(result, timestamp)
+            ]
             
-            # Store telemetry batch (only if not in field device mode)
-            if not settings.FIELD_DEVICE_MODE and telemetry_batch:
-                await db_manager.store_telemetry_batch(telemetry_batch)
+            # One columnar batch per cycle, every sink reads it directly
+            telemetry_batch = TelemetryBatch.from_results(results, timestamp)
+            
+            # Hand the batch to the sink stages; only a full queue with the block policy waits here
+            if telemetry_batch:
+                await self.pipeline.publish("telemetry", telemetry_batch)
+            
+            await self._publish_alarms(transitions)
             
             # Update state
             self.state.update_count += 1
@@ -630,13 +424,21 @@ class GridSimulator:
             self.state.error_count += 1
             logger.error(f"Simulation cycle error: {e}")
 
-    async def _send_telemetry_batch_via_api(self, telemetry_batch):
+    async def _send_telemetry_via_api(self, telemetry_batch: TelemetryBatch):
+        """HTTP pipeline stage: post a cycle's points in API_BATCH_SIZE chunks"""
+        points = telemetry_batch.points()
+        for start in range(0, len(points), settings.API_BATCH_SIZE):
+            await self._send_telemetry_batch_via_api(
+                points[start:start + settings.API_BATCH_SIZE], telemetry_batch.status
+            )
+    
+    async def _send_telemetry_batch_via_api(self, telemetry_batch, status: str):
         """Send batch of telemetry data via API with retry logic"""
         for attempt in range(settings.API_RETRY_ATTEMPTS):
             try:
                 success_count = 0
-                for element_id, metrics in telemetry_batch:
-                    if await self.ws_client.emit_telemetry_via_api(element_id, metrics):
+                for element_id, _, metrics in telemetry_batch:
+                    if await self.ws_client.emit_telemetry_via_api(element_id, metrics, status):
                         success_count += 1
                     else:
                         # Small delay between failed attempts
@@ -657,23 +459,72 @@ class GridSimulator:
         """Main simulation loop"""
         logger.info("Starting grid simulation...")
         
-        while self.state.is_running:
-            try:
-                await self.run_simulation_cycle()
-                await asyncio.sleep(settings.UPDATE_INTERVAL)
-                
-            except Exception as e:
-                logger.error(f"Simulation error: {e}")
-                self.state.error_count += 1
-                await asyncio.sleep(5)  # Wait before retrying
+        # Topology changes are applied between cycles, the loop itself never waits for them
+        sync_task = asyncio.create_task(self.topology_sync.run()) if settings.TOPOLOGY_SYNC_ENABLED else None
+        
+        # Validates the snapshot the grid was loaded from and refreshes it when Neo4j moved on
+        snapshot_task = asyncio.create_task(self.topology_snapshot.run()) if settings.TOPOLOGY_SNAPSHOT_ENABLED else None
+        
+        # Reconnects PostgreSQL after an outage and replays what was spooled meanwhile
+        spool_task = asyncio.create_task(db_manager.telemetry_spool.run()) if db_manager.telemetry_spool else None
+        
+        # Alarms buffered in a flush window go out when it ends, not with the next transition
+        alarm_flush_task = asyncio.create_task(self.alarm_sink.run())
+        
+        # Likewise telemetry rows once TELEMETRY_COPY_MAX_DELAY has passed
+        telemetry_flush_task = asyncio.create_task(db_manager.telemetry_writer.run())
+        
+        # Synchrophasor frames run at their own rate, off the telemetry cycle
+        pmu_task = asyncio.create_task(self.pmu.run()) if settings.PMU_ENABLED else None
+        
+        # Cycles fire on a fixed-rate grid starting now, however long initialization took
+        self.clock.reset_schedule()
+        
+        try:
+            while self.state.is_running:
+                try:
+                    await self.run_simulation_cycle()
+                    await self.clock.wait_next(self.sampling.tick_interval)
+                    
+                except Exception as e:
+                    logger.error(f"Simulation error: {e}")
+                    self.state.error_count += 1
+                    await asyncio.sleep(5)  # Wait before retrying
+        finally:
+            if sync_task:
+                sync_task.cancel()
+            if snapshot_task:
+                snapshot_task.cancel()
+            if spool_task:
+                spool_task.cancel()
+            alarm_flush_task.cancel()
+            telemetry_flush_task.cancel()
+            if pmu_task:
+                pmu_task.cancel()
     
     async def stop(self):
         """Stop the simulation"""
         self.state.is_running = False
+        await self.pipeline.stop(settings.PIPELINE_DRAIN_TIMEOUT)
+        await self.alarm_sink.flush()
         await self.ws_client.disconnect()
         await db_manager.close()
         logger.info("Grid simulation stopped")
     
+    def component_stats(self) -> Dict:
+        """Stats of the sinks and dependency checks behind this simulator, as reported per shard"""
+        return {
+            "alarm_sink": self.alarm_sink.stats,
+            "pmu": self.pmu.stats if settings.PMU_ENABLED else None,
+            "pipeline": self.pipeline.snapshot(),
+            "telemetry_writer": db_manager.telemetry_writer.stats,
+            "telemetry_cache": db_manager.telemetry_cache.stats,
+            "telemetry_spool": db_manager.telemetry_spool.stats if db_manager.telemetry_spool else None,
+            "telemetry_stream": db_manager.telemetry_stream.stats if settings.REDIS_STREAM_ENABLED else None,
+            "databases": db_manager.health.results,
+            "health_monitor": db_manager.health.stats
+        }
+
     def get_state(self) -> SimulatorState:
         """Get current simulator state"""
         if self.state.start_time:
@@ -681,8 +532,6 @@ class GridSimulator:
         else:
             uptime = 0
         
-        return SimulatorState(
-            **self.state.dict(),
-            active_alarms=len([a for a in self.recent_alarms.values() 
-                             if datetime.now() - a < timedelta(minutes=30)])
-        )
\ No newline at end of file
+        return self.state.copy(update={
+            "active_alarms": self.alarm_index.active_count(self.clock.now())
+        })
\ No newline at end of file
@@ -0,0 +1,96 @@
+# telemetry-simulator/telemetry_batch.py
+from datetime import datetime
+from itertools import repeat
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from models import ElementType, ElementStatus
+
+
+class TelemetryBatch:
+    """Columnar telemetry for one cycle, consumed directly by every sink
+
+    Holds one timestamp, the element ids in row order, the element type of each
+    contiguous run of rows and one float64 column per metric. A metric an element
+    does not report is NaN. Per-point payloads are materialized at most once, when
+    the first JSON sink asks for them.
+    """
+
+    __slots__ = ("timestamp", "element_ids", "segments", "columns", "_points")
+
+    def __init__(self, timestamp: datetime, element_ids: List[str],
+                 segments: List[Tuple[ElementType, int, int]], columns: Dict[str, np.ndarray]):
+        self.timestamp = timestamp
+        self.element_ids = element_ids
+        self.segments = segments  # (element_type, start row, stop row)
+        self.columns = columns
+        self._points: Optional[List[Tuple[str, ElementType, Dict[str, float]]]] = None
+
+    @classmethod
+    def from_results(cls, results, timestamp: datetime) -> "TelemetryBatch":
+        """Concatenate one cycle's engine results into a single batch"""
+        element_ids: List[str] = []
+        segments = []
+        for result in results:
+            segments.append((result.element_type, len(element_ids), len(element_ids) + len(result)))
+            element_ids.extend(result.element_ids)
+
+        size = len(element_ids)
+        columns: Dict[str, np.ndarray] = {}
+        for result, (_, start, stop) in zip(results, segments):
+            for name, values in result.metrics.items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = np.full(size, np.nan)
+                column[start:stop] = values
+        return cls(timestamp, element_ids, segments, columns)
+
+    def __len__(self) -> int:
+        return len(self.element_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.element_ids)
+
+    @property
+    def measurement_count(self) -> int:
+        """Number of (element, metric) values present"""
+        return int(sum(np.count_nonzero(~np.isnan(values)) for values in self.columns.values()))
+
+    def element_types(self) -> np.ndarray:
+        """Element type value of every row"""
+        types = np.empty(len(self), dtype=object)
+        for element_type, start, stop in self.segments:
+            types[start:stop] = element_type.value
+        return types
+
+    def points(self) -> List[Tuple[str, ElementType, Dict[str, float]]]:
+        """(element_id, element_type, metrics) per element with only the metrics it reports"""
+        if self._points is None:
+            points = []
+            for element_type, start, stop in self.segments:
+                names = [name for name, values in self.columns.items() if not np.isnan(values[start:stop]).all()]
+                lists = [self.columns[name][start:stop].tolist() for name in names]
+                for i, element_id in enumerate(self.element_ids[start:stop]):
+                    # NaN != NaN drops values missing for this element
+                    points.append((element_id, element_type, {
+                        name: column[i] for name, column in zip(names, lists) if column[i] == column[i]
+                    }))
+            self._points = points
+        return self._points
+
+    def records(self) -> Iterator[Tuple[datetime, str, str, str, float]]:
+        """Narrow (time, element_id, element_type, metric_name, metric_value) rows"""
+        ids = np.asarray(self.element_ids, dtype=object)
+        types = self.element_types()
+        for name, values in self.columns.items():
+            present = ~np.isnan(values)
+            yield from zip(
+                repeat(self.timestamp), ids[present].tolist(), types[present].tolist(),
+                repeat(name), values[present].tolist()
+            )
+
+    @property
+    def status(self) -> str:
+        # The engine only reports in-service elements
+        return ElementStatus.ACTIVE.value
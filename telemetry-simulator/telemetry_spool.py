@@ -0,0 +1,367 @@
+# telemetry-simulator/telemetry_spool.py
+import asyncio
+import fcntl
+import json
+import mmap
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+
+
+# Record header: magic, payload length, payload CRC32, row count
+_HEADER = struct.Struct("<IIII")
+_MAGIC = 0x54535031  # "TSP1"
+_SEGMENT_SUFFIX = ".spool"
+_CURSOR = "cursor.json"
+_LOCK = "spool.lock"
+
+_TEXT_COLUMNS = {"element_id", "element_type", "metric_name"}
+_SEPARATOR = "\x1f"
+
+
+def encode_chunk(table: str, columns: List[str], records: List[Tuple]) -> bytes:
+    """Columnar encoding of COPY records: a JSON header, then one length-prefixed blob per column"""
+    header = json.dumps({"table": table, "columns": columns}).encode()
+    parts = [struct.pack("<I", len(header)), header]
+    for name, values in zip(columns, zip(*records)):
+        if name == "time":
+            blob = np.array(values, dtype="datetime64[us]").view(np.int64).tobytes()
+        elif name in _TEXT_COLUMNS:
+            blob = _SEPARATOR.join(values).encode()
+        else:
+            # None becomes NaN and is turned back into None on decode
+            blob = np.array(values, dtype=np.float64).tobytes()
+        parts += [struct.pack("<I", len(blob)), blob]
+    return b"".join(parts)
+
+
+def decode_chunk(payload: bytes) -> Tuple[str, List[str], List[Tuple]]:
+    """Inverse of encode_chunk"""
+    view = memoryview(payload)
+    (length,) = struct.unpack_from("<I", view, 0)
+    header = json.loads(bytes(view[4:4 + length]))
+    offset = 4 + length
+
+    values = []
+    for name in header["columns"]:
+        (length,) = struct.unpack_from("<I", view, offset)
+        blob = view[offset + 4:offset + 4 + length]
+        offset += 4 + length
+        if name == "time":
+            values.append(np.frombuffer(blob, dtype=np.int64).view("datetime64[us]").astype(object).tolist())
+        elif name in _TEXT_COLUMNS:
+            values.append(bytes(blob).decode().split(_SEPARATOR))
+        else:
+            column = np.frombuffer(blob, dtype=np.float64)
+            values.append([None if value != value else value for value in column.tolist()])
+    return header["table"], header["columns"], list(zip(*values))
+
+
+class _Segment:
+    """One preallocated, memory-mapped spool file that records are appended to"""
+
+    def __init__(self, path: str, size: int = 0):
+        self.path = path
+        self.seq = int(os.path.basename(path)[:-len(_SEGMENT_SUFFIX)])
+        if size:
+            with open(path, "wb") as f:
+                f.truncate(size)
+        self._file = open(path, "r+b")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.map = mmap.mmap(self._file.fileno(), self.size)
+        self.end = 0
+        self.rows: List[Tuple[int, int]] = []  # (record offset, row count)
+        self._recover()
+
+    def _recover(self):
+        """Find the end of the valid records; a torn or zeroed header marks the end after a crash"""
+        offset = 0
+        while offset + _HEADER.size <= self.size:
+            magic, length, crc, rows = _HEADER.unpack_from(self.map, offset)
+            start = offset + _HEADER.size
+            if magic != _MAGIC or start + length > self.size or zlib.crc32(self.map[start:start + length]) != crc:
+                break
+            self.rows.append((offset, rows))
+            offset = start + length
+        self.end = offset
+
+    def fits(self, length: int) -> bool:
+        return self.end + _HEADER.size + length <= self.size
+
+    def append(self, payload: bytes, rows: int, sync: bool):
+        start = self.end + _HEADER.size
+        # Payload first, header last: a crash in between leaves no valid header behind
+        self.map[start:start + len(payload)] = payload
+        self.map[self.end:start] = _HEADER.pack(_MAGIC, len(payload), zlib.crc32(payload), rows)
+        if sync:
+            page = self.end - self.end % mmap.PAGESIZE
+            self.map.flush(page, start + len(payload) - page)
+        self.rows.append((self.end, rows))
+        self.end = start + len(payload)
+
+    def records(self, offset: int) -> Iterator[Tuple[int, int, bytes]]:
+        """(record offset, next offset, payload) from an offset to the current end"""
+        while offset < self.end:
+            _, length, _, _ = _HEADER.unpack_from(self.map, offset)
+            start = offset + _HEADER.size
+            yield offset, start + length, bytes(self.map[start:start + length])
+            offset = start + length
+
+    def rows_after(self, offset: int) -> int:
+        return sum(rows for record, rows in self.rows if record >= offset)
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        self._file.close()
+
+
+class TelemetrySpool:
+    """Crash-safe write-ahead spool for telemetry the database could not take
+
+    COPY chunks that fail, time out or arrive while PostgreSQL is down are appended
+    to preallocated memory-mapped segment files, each record carrying its length
+    and CRC32 so a crash mid-write is detected on restart. A background task
+    reconnects with exponential backoff and replays the backlog through the COPY
+    writer at TELEMETRY_SPOOL_REPLAY_ROWS_PER_SEC, persisting its position so a
+    restart resumes where it left off. The oldest segments are dropped once the
+    spool would exceed TELEMETRY_SPOOL_MAX_BYTES.
+
+    Each process spools into its own shard-<index> directory under
+    TELEMETRY_SPOOL_DIR and holds an exclusive lock on it, so shard workers never
+    append to or replay each other's segments.
+    """
+
+    def __init__(self, db, directory: str = None):
+        self.db = db
+        self.base_directory = directory or settings.TELEMETRY_SPOOL_DIR
+        self.directory: Optional[str] = None
+        self.shard = 0
+        self.segment_bytes = settings.TELEMETRY_SPOOL_SEGMENT_BYTES
+        self.max_bytes = settings.TELEMETRY_SPOOL_MAX_BYTES
+        self.replay_rate = settings.TELEMETRY_SPOOL_REPLAY_ROWS_PER_SEC
+        self.sync = settings.TELEMETRY_SPOOL_FSYNC
+
+        self.segments: List[_Segment] = []
+        self.cursor = (None, 0)  # (segment seq, offset) of the next record to replay
+        self._next_seq = 0
+        self._opened = False
+        self._lock_file = None
+        # Set while run() is reconnecting PostgreSQL in this process, so the health monitor leaves it alone
+        self.running = False
+        # Segment replay is reading from; never evicted under it
+        self._replaying: Optional[_Segment] = None
+        self._pending_rows = 0
+        self._pending_bytes = 0
+
+        self.stats: Dict[str, Any] = {
+            "rows_spooled": 0,
+            "rows_replayed": 0,
+            "rows_dropped": 0,
+            "rows_pending": 0,
+            "bytes_pending": 0,
+            "segments": 0,
+            "replaying": False,
+            "reconnect_attempts": 0,
+            "errors": 0
+        }
+
+    def open(self, shard: int = None):
+        """Lock this shard's spool directory and recover what a previous run left in it"""
+        if self._opened:
+            return
+        if shard is not None:
+            self.shard = shard
+        self.directory = os.path.join(self.base_directory, f"shard-{self.shard}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        lock_file = open(os.path.join(self.directory, _LOCK), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(f"Telemetry spool {self.directory} is in use by another process")
+        self._lock_file = lock_file
+
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(_SEGMENT_SUFFIX))
+        self.segments = [_Segment(os.path.join(self.directory, name)) for name in names]
+        self._next_seq = self.segments[-1].seq + 1 if self.segments else 0
+
+        try:
+            with open(os.path.join(self.directory, _CURSOR)) as f:
+                cursor = json.load(f)
+            self.cursor = (cursor["segment"], cursor["offset"])
+        except (FileNotFoundError, ValueError, KeyError):
+            self.cursor = (None, 0)
+
+        self._opened = True
+        self._count_pending()
+        self._update_stats()
+        if self.stats["rows_pending"]:
+            logger.info(
+                f"Telemetry spool holds {self.stats['rows_pending']} rows in "
+                f"{len(self.segments)} segment(s) from a previous run"
+            )
+
+    @property
+    def pending(self) -> bool:
+        return self.stats["rows_pending"] > 0
+
+    def append(self, table: str, columns: List[str], records: List[Tuple]):
+        """Spool a COPY chunk"""
+        self.open()
+        payload = encode_chunk(table, columns, records)
+
+        active = self.segments[-1] if self.segments else None
+        if active is None or not active.fits(len(payload)):
+            self._enforce_bound(len(payload))
+            path = os.path.join(self.directory, f"{self._next_seq:010d}{_SEGMENT_SUFFIX}")
+            self._next_seq += 1
+            active = _Segment(path, max(self.segment_bytes, _HEADER.size + len(payload)))
+            self.segments.append(active)
+
+        active.append(payload, len(records), self.sync)
+        self.stats["rows_spooled"] += len(records)
+        self._pending_rows += len(records)
+        self._pending_bytes += _HEADER.size + len(payload)
+        self._update_stats()
+
+    def _enforce_bound(self, incoming: int):
+        """Drop the oldest segments until a new one fits in TELEMETRY_SPOOL_MAX_BYTES"""
+        needed = max(self.segment_bytes, _HEADER.size + incoming)
+        size = sum(segment.size for segment in self.segments)
+        while size + needed > self.max_bytes:
+            # The segment being replayed stays; the next oldest goes in its place
+            oldest = next((segment for segment in self.segments if segment is not self._replaying), None)
+            if oldest is None:
+                break
+            self.segments.remove(oldest)
+            size -= oldest.size
+
+            start = self._replay_offset(oldest)
+            if start is not None:
+                lost = oldest.rows_after(start)
+                self._pending_rows -= lost
+                self._pending_bytes -= oldest.end - start
+                self.stats["rows_dropped"] += lost
+                logger.warning(f"Telemetry spool full, dropped segment {oldest.seq} with {lost} unreplayed rows")
+            self._remove(oldest)
+
+    def _replay_offset(self, segment: _Segment) -> Optional[int]:
+        """Offset from which a segment is still to be replayed, None if it was replayed already"""
+        seq, offset = self.cursor
+        if seq is None or segment.seq > seq:
+            return 0
+        if segment.seq == seq:
+            return offset
+        return None
+
+    def _remove(self, segment: _Segment):
+        segment.close()
+        os.remove(segment.path)
+        seq, _ = self.cursor
+        if seq is None or seq == segment.seq:
+            # Replay continues with the next remaining segment
+            following = next((s.seq for s in self.segments if s.seq > segment.seq), None)
+            self._save_cursor(following, 0)
+
+    def _save_cursor(self, seq: Optional[int], offset: int):
+        self.cursor = (seq, offset)
+        path = os.path.join(self.directory, _CURSOR)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump({"segment": seq, "offset": offset}, f)
+        os.replace(f"{path}.tmp", path)
+
+    def _count_pending(self):
+        """Rows and bytes not yet replayed, scanned once on open and kept as running counters after"""
+        self._pending_rows = self._pending_bytes = 0
+        for segment in self.segments:
+            start = self._replay_offset(segment)
+            if start is not None:
+                self._pending_rows += segment.rows_after(start)
+                self._pending_bytes += segment.end - start
+
+    def _update_stats(self):
+        self.stats.update(
+            rows_pending=self._pending_rows, bytes_pending=self._pending_bytes, segments=len(self.segments)
+        )
+
+    async def replay(self):
+        """Write the backlog through the COPY writer, oldest first, at the throttled rate"""
+        self.stats["replaying"] = True
+        try:
+            while self.segments and self.db._connection_status["postgresql"]:
+                segment = self._replaying = self.segments[0]
+                seq, offset = self.cursor
+                offset = offset if seq == segment.seq else 0
+
+                for record, next_offset, payload in segment.records(offset):
+                    started = time.monotonic()
+                    table, columns, records = decode_chunk(payload)
+                    # Raises on failure, the cursor then stays on this record
+                    await self.db.telemetry_writer.copy_now(table, columns, records)
+                    self._save_cursor(segment.seq, next_offset)
+                    self.stats["rows_replayed"] += len(records)
+                    self._pending_rows -= len(records)
+                    self._pending_bytes -= next_offset - record
+                    self._update_stats()
+
+                    pause = len(records) / self.replay_rate - (time.monotonic() - started)
+                    if pause > 0:
+                        await asyncio.sleep(pause)
+
+                if segment is self.segments[-1] and segment.end > self.cursor[1]:
+                    continue  # Appended to while replaying
+                self.segments.remove(segment)
+                self._remove(segment)
+                self._update_stats()
+        finally:
+            self._replaying = None
+            self.stats["replaying"] = False
+
+    async def run(self):
+        """Reconnect with backoff while PostgreSQL is down, replay the spool once it is up"""
+        self.open()
+        backoff = settings.TELEMETRY_SPOOL_RECONNECT_MIN
+        self.running = True
+        try:
+            while True:
+                if not self.db._connection_status["postgresql"]:
+                    self.stats["reconnect_attempts"] += 1
+                    if await self.db.reconnect_postgresql():
+                        backoff = settings.TELEMETRY_SPOOL_RECONNECT_MIN
+                        continue
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, settings.TELEMETRY_SPOOL_RECONNECT_MAX)
+                    continue
+
+                if self.pending:
+                    try:
+                        await self.replay()
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logger.error(f"Telemetry spool replay failed: {e}")
+                        await asyncio.sleep(backoff)
+                        backoff = min(backoff * 2, settings.TELEMETRY_SPOOL_RECONNECT_MAX)
+                        continue
+                    backoff = settings.TELEMETRY_SPOOL_RECONNECT_MIN
+
+                await asyncio.sleep(1.0)
+        finally:
+            self.running = False
+
+    def close(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments = []
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+        self._opened = False
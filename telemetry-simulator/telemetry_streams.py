@@ -0,0 +1,341 @@
+# telemetry-simulator/telemetry_streams.py
+import argparse
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import asyncpg
+import numpy as np
+import redis.asyncio as redis
+from loguru import logger
+
+from config import settings
+from models import ElementType
+from telemetry_batch import TelemetryBatch
+from telemetry_writer import table_records
+
+
+# Joins the element ids of an entry; a control character ids do not contain
+_ID_SEPARATOR = "\x1f"
+
+
+def stream_key(element_type: ElementType) -> str:
+    return f"{settings.REDIS_STREAM_PREFIX}:{element_type.value}"
+
+
+def dead_letter_key() -> str:
+    """Stream keeping entries that could not be decoded, with their origin and error"""
+    return f"{settings.REDIS_STREAM_PREFIX}:dead_letter"
+
+
+def encode_entries(batch: TelemetryBatch, rows_per_entry: int) -> List[Tuple[str, Dict[str, Any]]]:
+    """(stream, fields) per entry: element ids plus one packed float64 column per metric"""
+    entries = []
+    timestamp = batch.timestamp.isoformat()
+    for element_type, start, stop in batch.segments:
+        for chunk_start in range(start, stop, rows_per_entry):
+            chunk_stop = min(chunk_start + rows_per_entry, stop)
+            fields: Dict[str, Any] = {
+                "time": timestamp,
+                "ids": _ID_SEPARATOR.join(batch.element_ids[chunk_start:chunk_stop])
+            }
+            for name, values in batch.columns.items():
+                column = values[chunk_start:chunk_stop]
+                if not np.isnan(column).all():
+                    fields[f"m:{name}"] = column.astype("<f8").tobytes()
+            entries.append((stream_key(element_type), fields))
+    return entries
+
+
+def decode_entry(element_type: ElementType, fields: Dict[bytes, bytes]) -> TelemetryBatch:
+    """Rebuild the TelemetryBatch slice carried by one stream entry"""
+    element_ids = fields[b"ids"].decode().split(_ID_SEPARATOR)
+    columns = {
+        key[2:].decode(): np.frombuffer(value, dtype="<f8")
+        for key, value in fields.items() if key.startswith(b"m:")
+    }
+    return TelemetryBatch(
+        datetime.fromisoformat(fields[b"time"].decode()), element_ids,
+        [(element_type, 0, len(element_ids))], columns
+    )
+
+
+class TelemetryStreamPublisher:
+    """Publishes each cycle to per-element-type Redis Streams for consumer groups
+
+    A cycle becomes one entry per element type (split every REDIS_STREAM_ENTRY_ROWS
+    elements) carrying the element ids and a packed float64 column per metric. All
+    XADDs of a cycle share one pipeline round trip and trim the streams to about
+    REDIS_STREAM_MAXLEN entries.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.rows_per_entry = max(1, settings.REDIS_STREAM_ENTRY_ROWS)
+        self.maxlen = settings.REDIS_STREAM_MAXLEN
+
+        self.stats: Dict[str, Any] = {
+            "entries_published": 0,
+            "bytes_published": 0,
+            "errors": 0,
+            "last_publish_ms": 0.0
+        }
+
+    async def publish(self, batch: TelemetryBatch):
+        entries = encode_entries(batch, self.rows_per_entry)
+        if not entries:
+            return
+
+        pipe = self.db.redis_client.pipeline(transaction=False)
+        size = 0
+        for key, fields in entries:
+            size += sum(len(name) + len(value) for name, value in fields.items())
+            pipe.xadd(key, fields, maxlen=self.maxlen, approximate=True)
+
+        started = time.perf_counter()
+        try:
+            await pipe.execute()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Failed to publish telemetry to Redis Streams: {e}")
+            return
+
+        self.stats["entries_published"] += len(entries)
+        self.stats["bytes_published"] += size
+        self.stats["last_publish_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+
+class TelemetryStreamConsumer:
+    """Consumer-group reader that batch-writes stream entries into TimescaleDB
+
+    Entries are acknowledged only after the COPY that carries them commits, so a
+    crashed consumer's entries stay pending and are picked up again on restart or
+    claimed by another consumer of the group once idle for REDIS_STREAM_CLAIM_IDLE
+    ms. Delivery is at least once. Entries that do not decode are copied to the
+    dead-letter stream and acknowledged, so one bad entry cannot stall the group.
+    Run one process per consumer name to scale out.
+    """
+
+    def __init__(self, consumer: str, group: str = None):
+        self.group = group or settings.REDIS_STREAM_GROUP
+        self.consumer = consumer
+        self.streams = [stream_key(element_type) for element_type in ElementType]
+        self.redis: redis.Redis = None
+        self.pg_pool: asyncpg.Pool = None
+        self._running = False
+
+        self.stats: Dict[str, Any] = {
+            "entries_written": 0,
+            "rows_written": 0,
+            "entries_claimed": 0,
+            "entries_dead_lettered": 0,
+            "errors": 0
+        }
+
+    async def start(self):
+        # Entry values are packed floats, so responses stay as bytes
+        self.redis = redis.from_url(settings.REDIS_URL, decode_responses=False)
+        self.pg_pool = await asyncpg.create_pool(settings.POSTGRES_URL, min_size=1, max_size=2)
+
+        for stream in self.streams:
+            try:
+                await self.redis.xgroup_create(stream, self.group, id="0", mkstream=True)
+                logger.info(f"Created consumer group {self.group} on {stream}")
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def run(self):
+        """Recover this consumer's pending entries, then follow the streams"""
+        await self.start()
+        self._running = True
+        logger.info(f"Stream consumer {self.consumer} reading {len(self.streams)} streams as group {self.group}")
+
+        try:
+            # Entries delivered to this consumer before a restart and never acknowledged
+            while self._running and await self._read({stream: "0" for stream in self.streams}, block=None):
+                pass
+
+            last_claim = 0.0
+            while self._running:
+                if time.monotonic() - last_claim >= settings.REDIS_STREAM_CLAIM_IDLE / 1000:
+                    await self._claim_stale()
+                    last_claim = time.monotonic()
+                await self._read({stream: ">" for stream in self.streams}, block=settings.REDIS_STREAM_BLOCK_MS)
+        finally:
+            await self.close()
+
+    def stop(self):
+        self._running = False
+
+    async def close(self):
+        if self.redis:
+            await self.redis.aclose()
+        if self.pg_pool:
+            await self.pg_pool.close()
+
+    async def _read(self, streams: Dict[str, str], block) -> int:
+        """Read, write and acknowledge one round of entries; returns how many were read"""
+        try:
+            response = await self.redis.xreadgroup(
+                self.group, self.consumer, streams,
+                count=settings.REDIS_STREAM_READ_COUNT, block=block
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Stream read failed: {e}")
+            await asyncio.sleep(1)
+            return 0
+
+        entries, trimmed = [], []
+        for stream, messages in response or []:
+            for entry_id, fields in messages:
+                if fields:
+                    entries.append((stream.decode(), entry_id, fields))
+                else:
+                    trimmed.append((stream.decode(), entry_id))
+
+        if trimmed:
+            # Pending entries that MAXLEN trimmed away before they were written
+            logger.warning(f"{len(trimmed)} pending stream entries were trimmed before they were written")
+            await self._acknowledge(trimmed)
+        await self._write(entries)
+        return len(entries) + len(trimmed)
+
+    async def _claim_stale(self):
+        """Take over entries another consumer read but never acknowledged
+
+        XAUTOCLAIM scans the pending list a page at a time, so each stream is
+        followed along the returned cursor until it wraps back to 0-0.
+        """
+        claimed = 0
+        for stream in self.streams:
+            cursor = "0-0"
+            while self._running:
+                try:
+                    cursor, messages, *_ = await self.redis.xautoclaim(
+                        stream, self.group, self.consumer, settings.REDIS_STREAM_CLAIM_IDLE,
+                        start_id=cursor, count=settings.REDIS_STREAM_READ_COUNT
+                    )
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Claiming stale entries of {stream} failed: {e}")
+                    break
+
+                entries = [(stream, entry_id, fields) for entry_id, fields in messages if fields]
+                if entries:
+                    self.stats["entries_claimed"] += len(entries)
+                    claimed += len(entries)
+                    await self._write(entries)
+                if cursor in (b"0-0", "0-0"):
+                    break
+
+        if claimed:
+            logger.info(f"Claimed {claimed} stale stream entries")
+
+    async def _write(self, entries: List[Tuple[str, bytes, Dict[bytes, bytes]]]):
+        """COPY the entries' rows in one transaction, then acknowledge them"""
+        if not entries:
+            return
+
+        types = {stream_key(element_type): element_type for element_type in ElementType}
+        buffers: Dict[str, Tuple[List[str], List[Tuple]]] = {}
+        rows = 0
+        decoded, rejected = [], []
+        for stream, entry_id, fields in entries:
+            try:
+                batch = decode_entry(types[stream], fields)
+                records_by_table = list(table_records(batch, settings.TELEMETRY_LAYOUT))
+            except Exception as e:
+                rejected.append((stream, entry_id, fields, e))
+                continue
+            decoded.append((stream, entry_id, fields))
+            for table, columns, records, _ in records_by_table:
+                buffers.setdefault(table, (columns, []))[1].extend(records)
+                rows += len(records)
+
+        if rejected:
+            await self._dead_letter(rejected)
+        entries = decoded
+        if not entries:
+            return
+
+        try:
+            async with self.pg_pool.acquire() as conn:
+                async with conn.transaction():
+                    for table, (columns, records) in buffers.items():
+                        await conn.copy_records_to_table(
+                            table, schema_name="monitoring",
+                            columns=columns, records=records
+                        )
+        except Exception as e:
+            # Left pending: re-read after a restart or claimed once idle
+            self.stats["errors"] += 1
+            logger.error(f"Writing {len(entries)} stream entries failed: {e}")
+            await asyncio.sleep(1)
+            return
+
+        await self._acknowledge([(stream, entry_id) for stream, entry_id, _ in entries])
+        self.stats["entries_written"] += len(entries)
+        self.stats["rows_written"] += rows
+        logger.debug(f"Wrote {rows} rows from {len(entries)} stream entries")
+
+    async def _dead_letter(self, rejected: List[Tuple[str, bytes, Dict[bytes, bytes], Exception]]):
+        """Move undecodable entries to the dead-letter stream and acknowledge them"""
+        pipe = self.redis.pipeline(transaction=False)
+        for stream, entry_id, fields, error in rejected:
+            pipe.xadd(dead_letter_key(), {
+                **fields,
+                b"source_stream": stream,
+                b"source_id": entry_id,
+                b"error": f"{type(error).__name__}: {error}"
+            }, maxlen=settings.REDIS_STREAM_MAXLEN, approximate=True)
+        try:
+            await pipe.execute()
+            await self._acknowledge([(stream, entry_id) for stream, entry_id, _, _ in rejected])
+        except Exception as e:
+            # Left pending and retried with the next claim
+            self.stats["errors"] += 1
+            logger.error(f"Dead-lettering {len(rejected)} stream entries failed: {e}")
+            return
+
+        self.stats["entries_dead_lettered"] += len(rejected)
+        logger.warning(f"Moved {len(rejected)} undecodable stream entries to {dead_letter_key()}: "
+                       f"{rejected[0][3]}")
+
+    async def _acknowledge(self, entries: List[Tuple[str, bytes]]):
+        by_stream: Dict[str, List[bytes]] = {}
+        for stream, entry_id in entries:
+            by_stream.setdefault(stream, []).append(entry_id)
+        pipe = self.redis.pipeline(transaction=False)
+        for stream, entry_ids in by_stream.items():
+            pipe.xack(stream, self.group, *entry_ids)
+        await pipe.execute()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Consume telemetry from the Redis Streams and write it into TimescaleDB"
+    )
+    parser.add_argument("--consumer", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Consumer name within the group, unique per process (default: host-pid)")
+    parser.add_argument("--group", default=settings.REDIS_STREAM_GROUP,
+                        help="Consumer group (default: REDIS_STREAM_GROUP)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from main import setup_logging
+
+    setup_logging()
+    args = parse_args()
+
+    try:
+        asyncio.run(TelemetryStreamConsumer(args.consumer, args.group).run())
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        logger.error(f"Stream consumer failed: {e}")
@@ -0,0 +1,244 @@
+# telemetry-simulator/telemetry_writer.py
+import asyncio
+import time
+from enum import Enum
+from itertools import repeat
+from typing import Any, Dict, Iterator, List, Tuple
+import asyncpg
+import numpy as np
+from loguru import logger
+
+from config import settings
+from models import ElementType
+
+
+class TelemetryLayout(str, Enum):
+    NARROW = "narrow"  # monitoring.telemetry: one row per element, metric and timestamp
+    WIDE = "wide"      # monitoring.telemetry_<type>: one row per element and timestamp
+    BOTH = "both"      # Write both, e.g. while moving readers over to the wide tables
+
+
+TELEMETRY_COLUMNS = ["time", "element_id", "element_type", "metric_name", "metric_value"]
+
+# Wide per-type hypertables and their metric columns (database/postgres/init/03-telemetry-wide.sql).
+# The nameplate capacity, demand and rating are left out: they only change with the topology
+WIDE_TABLES: Dict[ElementType, Tuple[str, List[str]]] = {
+    ElementType.BUS: ("telemetry_bus", [
+        "voltage", "voltage_level", "voltage_change", "frequency", "voltage_angle"
+    ]),
+    ElementType.GENERATOR: ("telemetry_generator", [
+        "power", "load_factor", "efficiency", "frequency", "voltage", "voltage_level"
+    ]),
+    ElementType.LOAD: ("telemetry_load", [
+        "power", "current", "power_factor", "utilization_rate", "voltage_level"
+    ]),
+    ElementType.LINE: ("telemetry_line", [
+        "current", "loading", "power_flow", "power_loss", "temperature"
+    ]),
+    ElementType.TRANSFORMER: ("telemetry_transformer", [
+        "loading", "power_flow", "oil_temperature", "winding_temperature", "tap_position"
+    ]),
+}
+
+# Failures that mean the server is gone rather than that a COPY was rejected
+_CONNECTION_ERRORS = (OSError, asyncpg.PostgresConnectionError, asyncpg.InterfaceError)
+
+# Binary COPY framing: a field count per row, then a length word per field
+_ROW_HEADER_BYTES = 2
+_FIELD_HEADER_BYTES = 4
+_TIMESTAMP_BYTES = 8
+_FLOAT_BYTES = 8
+
+
+def _nullable(values: np.ndarray) -> List:
+    """Column values with NaN turned into None so COPY stores NULL"""
+    missing = np.isnan(values)
+    if not missing.any():
+        return values.tolist()
+    column = values.astype(object)
+    column[missing] = None
+    return column.tolist()
+
+
+def table_records(batch, layout: TelemetryLayout) -> Iterator[Tuple[str, List[str], List[Tuple], int]]:
+    """(table, columns, records, estimated COPY bytes) for every table a batch writes to"""
+    layout = TelemetryLayout(layout)
+    id_bytes = sum(map(len, batch.element_ids)) / max(len(batch), 1)
+
+    if layout in (TelemetryLayout.NARROW, TelemetryLayout.BOTH):
+        records = list(batch.records())
+        if records:
+            names = sum(map(len, batch.columns)) / max(len(batch.columns), 1)
+            types = sum(len(element_type.value) for element_type, _, _ in batch.segments) / max(len(batch.segments), 1)
+            row_bytes = (_ROW_HEADER_BYTES + len(TELEMETRY_COLUMNS) * _FIELD_HEADER_BYTES
+                         + _TIMESTAMP_BYTES + _FLOAT_BYTES + id_bytes + names + types)
+            yield "telemetry", TELEMETRY_COLUMNS, records, int(len(records) * row_bytes)
+
+    if layout in (TelemetryLayout.WIDE, TelemetryLayout.BOTH):
+        for element_type, start, stop in batch.segments:
+            if stop == start:
+                continue
+            table, metrics = WIDE_TABLES[element_type]
+            missing = np.full(stop - start, np.nan)
+            values = [
+                _nullable(batch.columns[name][start:stop] if name in batch.columns else missing)
+                for name in metrics
+            ]
+            records = list(zip(repeat(batch.timestamp), batch.element_ids[start:stop], *values))
+            row_bytes = (_ROW_HEADER_BYTES + (2 + len(metrics)) * _FIELD_HEADER_BYTES
+                         + _TIMESTAMP_BYTES + id_bytes + len(metrics) * _FLOAT_BYTES)
+            yield table, ["time", "element_id", *metrics], records, int(len(records) * row_bytes)
+
+
+class TelemetryCopyWriter:
+    """Loads telemetry into TimescaleDB with binary COPY
+
+    Rows from consecutive batches are buffered per target table until
+    TELEMETRY_COPY_BATCH_ROWS, TELEMETRY_COPY_BATCH_BYTES or
+    TELEMETRY_COPY_MAX_DELAY is reached, then written with copy_records_to_table.
+    The age limit is also enforced by run(), so rows do not wait for the next
+    batch when cycles are far apart or the clock is paused.
+    Large flushes are split across up to TELEMETRY_COPY_STREAMS pool connections
+    that COPY concurrently. TELEMETRY_LAYOUT selects the narrow table, the wide
+    per-type tables or both. Rows that cannot be written, because PostgreSQL is
+    down or a COPY fails or exceeds TELEMETRY_COPY_TIMEOUT, go to the disk spool
+    when one is configured and are dropped otherwise.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.layout = TelemetryLayout(settings.TELEMETRY_LAYOUT)
+        self.batch_rows = settings.TELEMETRY_COPY_BATCH_ROWS
+        self.batch_bytes = settings.TELEMETRY_COPY_BATCH_BYTES
+        self.max_delay = settings.TELEMETRY_COPY_MAX_DELAY
+        self.streams = max(1, settings.TELEMETRY_COPY_STREAMS)
+        self.min_stream_rows = settings.TELEMETRY_COPY_MIN_STREAM_ROWS
+        self.timeout = settings.TELEMETRY_COPY_TIMEOUT
+
+        self._buffers: Dict[str, Tuple[List[str], List[Tuple]]] = {}
+        self._rows = 0
+        self._bytes = 0
+        self._oldest = None
+        self._lock = asyncio.Lock()
+        self._stream_slots = asyncio.Semaphore(self.streams)
+
+        self.stats: Dict[str, Any] = {
+            "layout": self.layout.value,
+            "rows_written": 0,
+            "bytes_written": 0,
+            "copies": 0,
+            "errors": 0,
+            "rows_dropped": 0,
+            "rows_spooled": 0,
+            "last_copy_ms": 0.0,
+            "last_rows_per_second": 0.0,
+            "rows_per_second": 0.0
+        }
+        self._started = time.monotonic()
+
+    async def write(self, batch):
+        """Buffer a batch's rows and flush once a size or age threshold is reached"""
+        for table, columns, records, size in table_records(batch, self.layout):
+            self._buffers.setdefault(table, (columns, []))[1].extend(records)
+            self._rows += len(records)
+            self._bytes += size
+
+        if not self._rows:
+            return
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+        if (self._rows >= self.batch_rows or self._bytes >= self.batch_bytes
+                or time.monotonic() - self._oldest >= self.max_delay):
+            await self.flush()
+
+    async def run(self):
+        """Flush rows once they have been buffered for max_delay seconds, whether or not a batch follows"""
+        if self.max_delay <= 0:
+            return  # write() flushes every batch
+        while True:
+            oldest = self._oldest
+            remaining = self.max_delay if oldest is None else oldest + self.max_delay - time.monotonic()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+                continue
+            # A cancelled timer must not lose rows that were already taken off the buffers
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """COPY everything buffered, in parallel streams when there is enough of it"""
+        async with self._lock:
+            buffers, rows, size = self._buffers, self._rows, self._bytes
+            self._buffers, self._rows, self._bytes, self._oldest = {}, 0, 0, None
+            if not rows:
+                return
+
+            if not self.db._connection_status["postgresql"]:
+                for table, (columns, records) in buffers.items():
+                    self._spill(table, columns, records)
+                return
+
+            # Each table's rows are split into chunks; at most TELEMETRY_COPY_STREAMS run at once
+            streams = max(1, min(self.streams, rows // max(self.min_stream_rows, 1)))
+            chunk = -(-rows // streams)
+            copies = [
+                (table, columns, records[start:start + chunk])
+                for table, (columns, records) in buffers.items()
+                for start in range(0, len(records), chunk)
+            ]
+
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(self._copy(table, columns, records) for table, columns, records in copies),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - started
+
+            written = 0
+            for (table, columns, records), result in zip(copies, results):
+                if isinstance(result, Exception):
+                    self.stats["errors"] += 1
+                    logger.error(f"Telemetry COPY into {table} failed: {result!r}")
+                    self._spill(table, columns, records)
+                else:
+                    written += len(records)
+
+            self.stats["rows_written"] += written
+            self.stats["bytes_written"] += int(size * written / rows)
+            self.stats["copies"] += len(copies)
+            self.stats["last_copy_ms"] = round(elapsed * 1000, 2)
+            self.stats["last_rows_per_second"] = round(written / elapsed) if elapsed > 0 else 0.0
+            self.stats["rows_per_second"] = round(self.stats["rows_written"] / max(time.monotonic() - self._started, 1e-9))
+            logger.debug(f"Copied {written} telemetry rows over {len(copies)} stream(s) in {elapsed * 1000:.1f}ms")
+
+    def _spill(self, table: str, columns: List[str], records: List[Tuple]):
+        """Hand rows that could not be written to the spool, or count them as dropped"""
+        spool = self.db.telemetry_spool
+        if spool is None:
+            self.stats["rows_dropped"] += len(records)
+            return
+        try:
+            spool.append(table, columns, records)
+            self.stats["rows_spooled"] += len(records)
+        except Exception as e:
+            self.stats["rows_dropped"] += len(records)
+            logger.error(f"Failed to spool {len(records)} telemetry rows: {e}")
+
+    async def copy_now(self, table: str, columns: List[str], records: List[Tuple]):
+        """COPY rows right away, bypassing the buffer; raises if they were not written"""
+        await self._copy(table, columns, records)
+        self.stats["rows_written"] += len(records)
+
+    async def _copy(self, table: str, columns: List[str], records: List[Tuple]):
+        try:
+            async with self._stream_slots, self.db.pg_pool.acquire() as conn:
+                await conn.copy_records_to_table(
+                    table, schema_name="monitoring",
+                    columns=columns, records=records, timeout=self.timeout
+                )
+        except TimeoutError:
+            # A slow server is not a lost one (TimeoutError is an OSError)
+            raise
+        except _CONNECTION_ERRORS:
+            self.db.mark_postgresql_down()
+            raise
@@ -0,0 +1,6 @@
+# telemetry-simulator/tests/conftest.py
+import sys
+from pathlib import Path
+
+# The simulator's modules import each other as top-level modules
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,199 @@
+# telemetry-simulator/tests/test_alarms.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+import alarm_sink
+from alarms import RAISE, UPDATE, CLEAR, ActiveAlarmIndex
+from config import settings
+from engine import CycleResult
+from models import AlarmSeverity, ElementType, GridElement
+from simulator import GridSimulator
+
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeAlarmTable:
+    """Stands in for monitoring.alarms behind the db_manager alarm calls"""
+
+    def __init__(self):
+        self.rows = []
+
+    async def store_alarms_batch(self, alarms):
+        self.rows += [alarm.dict() for alarm in alarms]
+
+    async def update_alarm_severities(self, alarms):
+        for alarm in alarms:
+            for row in self.active(alarm.element_id, alarm.alarm_type):
+                row.update(severity=alarm.severity, message=alarm.message)
+
+    async def resolve_alarms(self, resolutions):
+        for element_id, alarm_type, resolved_at in resolutions:
+            for row in self.active(element_id, alarm_type):
+                row.update(is_active=False, resolved_at=resolved_at)
+
+    def active(self, element_id, alarm_type):
+        return [row for row in self.rows
+                if row["element_id"] == element_id and row["alarm_type"] == alarm_type and row["is_active"]]
+
+
+@pytest.fixture
+def simulator(monkeypatch):
+    monkeypatch.setattr(settings, "FIELD_DEVICE_MODE", False)
+    monkeypatch.setattr(settings, "ALARM_RAISE_DEADTIME", 10.0)
+    monkeypatch.setattr(settings, "ALARM_CLEAR_DEADTIME", 30.0)
+
+    sim = GridSimulator()
+    sim.elements = {
+        "bus_1": GridElement(id="bus_1", name="bus_1", element_type=ElementType.BUS, voltage_level=110),
+        "bus_2": GridElement(id="bus_2", name="bus_2", element_type=ElementType.BUS, voltage_level=110),
+        "line_1": GridElement(id="line_1", name="line_1", element_type=ElementType.LINE,
+                              properties={"from_bus": "bus_1", "to_bus": "bus_2", "capacity": 100}),
+    }
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    return sim
+
+
+def line_result(loading: float) -> CycleResult:
+    return CycleResult(ElementType.LINE, ["line_1"], np.array([0]), {
+        "loading": np.array([loading]),
+        "temperature": np.array([20.0])
+    })
+
+
+def evaluate(sim, seconds: float, loading: float):
+    return sim.alarms.evaluate(line_result(loading), START + timedelta(seconds=seconds))
+
+
+def kinds(transitions):
+    return [(transition.kind, transition.severity) for transition in transitions]
+
+
+def test_raise_waits_for_deadtime(simulator):
+    assert evaluate(simulator, 0, 92) == []
+    assert evaluate(simulator, 9, 92) == []
+    assert kinds(evaluate(simulator, 10, 92)) == [(RAISE, AlarmSeverity.WARNING)]
+
+
+def test_violation_interrupted_restarts_deadtime(simulator):
+    evaluate(simulator, 0, 92)
+    evaluate(simulator, 5, 80)
+    assert evaluate(simulator, 12, 92) == []
+    assert kinds(evaluate(simulator, 22, 92)) == [(RAISE, AlarmSeverity.WARNING)]
+
+
+def test_hysteresis_band_does_not_clear(simulator):
+    evaluate(simulator, 0, 92)
+    evaluate(simulator, 10, 92)
+    # Below the 90 % limit but inside the 3 % hysteresis band
+    for seconds in range(20, 200, 10):
+        assert evaluate(simulator, seconds, 88) == []
+    assert evaluate(simulator, 200, 85) == []
+    assert kinds(evaluate(simulator, 230, 85)) == [(CLEAR, AlarmSeverity.WARNING)]
+
+
+def test_escalation_is_an_update(simulator):
+    evaluate(simulator, 0, 92)
+    evaluate(simulator, 10, 92)
+    assert kinds(evaluate(simulator, 15, 97)) == [(UPDATE, AlarmSeverity.CRITICAL)]
+    assert kinds(evaluate(simulator, 20, 92)) == [(UPDATE, AlarmSeverity.WARNING)]
+
+
+def test_raise_escalate_clear_reraise_reaches_the_database(simulator, monkeypatch):
+    table = FakeAlarmTable()
+    monkeypatch.setattr(alarm_sink, "db_manager", table)
+    simulator.alarm_sink.flush_interval = 0
+
+    async def deliver(topic, item):
+        await simulator._deliver_alarms(item)
+    monkeypatch.setattr(simulator.pipeline, "publish", deliver)
+
+    async def run(timeline):
+        for seconds, loading in timeline:
+            await simulator._publish_alarms(evaluate(simulator, seconds, loading))
+
+    # Raised at 10 s, escalated at 30 s, cleared at 120 s, raised again at 145 s
+    asyncio.run(run([(0, 92), (10, 92), (30, 97), (60, 97), (90, 80), (120, 80), (135, 92), (145, 92)]))
+
+    first, second = table.rows
+    assert first["severity"] == AlarmSeverity.CRITICAL
+    assert first["message"] == "Line overload: 97.0%"
+    assert not first["is_active"]
+    assert first["resolved_at"] == START + timedelta(seconds=120)
+    assert second["is_active"]
+    assert second["created_at"] == START + timedelta(seconds=145)
+    assert second["id"] != first["id"]
+    assert simulator.alarm_sink.stats["updates_written"] == 1
+
+
+def test_escalation_within_a_flush_window_keeps_the_raise(simulator):
+    sink = simulator.alarm_sink
+    raised = evaluate(simulator, 0, 92) + evaluate(simulator, 10, 92)
+    sink.add(raised[0].to_alarm())
+    alarm_id = next(iter(sink._pending.values())).id
+
+    sink.update(evaluate(simulator, 15, 97)[0].to_alarm())
+
+    (pending,) = sink._pending.values()
+    assert pending.id == alarm_id
+    assert pending.severity == AlarmSeverity.CRITICAL
+    assert not sink._updates
+
+
+def test_active_index_expires_in_raise_order():
+    index = ActiveAlarmIndex(active_window=300)
+    index.record("line_1", "LINE_OVERLOAD", START)
+    index.record("line_2", "LINE_OVERLOAD", START + timedelta(seconds=100))
+    assert index.active_count(START + timedelta(seconds=200)) == 2
+    assert index.active_count(START + timedelta(seconds=350)) == 1
+    assert index.active_count(START + timedelta(seconds=500)) == 0
+
+
+def test_active_index_counts_a_repeat_raise_once():
+    index = ActiveAlarmIndex(active_window=300)
+    index.record("line_1", "LINE_OVERLOAD", START)
+    index.record("line_1", "LINE_OVERLOAD", START + timedelta(seconds=200))
+    assert index.active_count(START + timedelta(seconds=250)) == 1
+    # The repeat refreshed the entry, the first raise no longer expires it
+    assert index.active_count(START + timedelta(seconds=400)) == 1
+    assert index.active_count(START + timedelta(seconds=550)) == 0
+
+
+def test_active_index_is_bounded():
+    index = ActiveAlarmIndex(active_window=300, max_entries=3)
+    for i in range(10):
+        index.record(f"line_{i}", "LINE_OVERLOAD", START + timedelta(seconds=i))
+    assert len(index) == 3
+
+
+def test_active_index_restarts_when_time_moves_back():
+    index = ActiveAlarmIndex(active_window=300)
+    index.record("line_1", "LINE_OVERLOAD", START)
+    index.record("line_2", "LINE_OVERLOAD", START - timedelta(hours=1))
+    assert index.active_count(START - timedelta(hours=1)) == 1
+
+
+def test_buffered_alarms_flush_when_the_window_ends(simulator, monkeypatch):
+    table = FakeAlarmTable()
+    monkeypatch.setattr(alarm_sink, "db_manager", table)
+    sink = simulator.alarm_sink
+    sink.flush_interval = 0.1
+
+    async def run():
+        sink._last_flush = time.monotonic()
+        timer = asyncio.create_task(sink.run())
+        # A single raise and no further transitions
+        evaluate(simulator, 0, 92)
+        await simulator._deliver_alarms(([evaluate(simulator, 10, 92)[0].to_alarm()], [], []))
+        assert table.rows == []
+        await asyncio.sleep(0.3)
+        timer.cancel()
+
+    asyncio.run(run())
+    assert len(table.rows) == 1
+    assert len(sink) == 0
@@ -0,0 +1,44 @@
+# telemetry-simulator/tests/test_backfill.py
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backfill import parse_args, plan_windows, warm_up
+from models import ElementType, GridElement
+from simulator import GridSimulator
+
+
+def test_offsets_are_converted_to_naive_utc():
+    args = parse_args(["--start", "2026-01-01T02:00:00+02:00", "--end", "2026-01-01T01:00:00"])
+    assert args.start == datetime(2026, 1, 1, 0, 0)
+    assert args.start.tzinfo is None and args.end.tzinfo is None
+
+    windows = plan_windows(args.start, args.end, timedelta(minutes=30), workers=1)
+    assert windows == [(datetime(2026, 1, 1, 0, 0), datetime(2026, 1, 1, 0, 30)),
+                       (datetime(2026, 1, 1, 0, 30), datetime(2026, 1, 1, 1, 0))]
+
+
+def transformer_simulator():
+    sim = GridSimulator()
+    sim.elements = {
+        "bus_1": GridElement(id="bus_1", name="bus_1", element_type=ElementType.BUS, voltage_level=110),
+        "bus_2": GridElement(id="bus_2", name="bus_2", element_type=ElementType.BUS, voltage_level=20),
+        "trafo_1": GridElement(id="trafo_1", name="trafo_1", element_type=ElementType.TRANSFORMER, rating=50,
+                               properties={"from_bus": "bus_1", "to_bus": "bus_2"}),
+    }
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    return sim
+
+
+def test_warm_up_lands_on_the_window_start_with_settled_thermal_state():
+    start = datetime(2026, 1, 1, 12, 0)
+    cold, warm = transformer_simulator(), transformer_simulator()
+    warm_up(cold, start, resolution=60, warmup=0)
+    warm_up(warm, start, resolution=60, warmup=6 * 3600)
+
+    assert cold.clock.now() == warm.clock.now() == start
+    # A cold window has no thermal history yet, a warmed one has tracked hours of loading
+    assert np.isnan(cold.engine.blocks[ElementType.TRANSFORMER].state["top_oil"]).all()
+    top_oil = warm.engine.blocks[ElementType.TRANSFORMER].state["top_oil"]
+    assert (top_oil > warm.weather_effects["temperature"]).all()
@@ -0,0 +1,110 @@
+# telemetry-simulator/tests/test_health_monitor.py
+import asyncio
+
+import pytest
+
+from config import settings
+from health_monitor import HealthMonitor
+
+
+class FakePool:
+    def __init__(self):
+        self.up = False
+
+    def acquire(self):
+        pool = self
+
+        class Connection:
+            async def __aenter__(self):
+                if not pool.up:
+                    raise OSError("connection refused")
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def fetchval(self, query):
+                return 1
+
+        return Connection()
+
+
+class FakeSpool:
+    def __init__(self, running):
+        self.running = running
+
+
+class FakeTimescale:
+    def __init__(self):
+        self.refreshes = 0
+        self.stats = None
+
+    async def refresh(self):
+        self.refreshes += 1
+        self.stats = {"telemetry": {"chunks": self.refreshes}}
+
+
+class FakeDB:
+    def __init__(self, spool=None):
+        self.pg_pool = FakePool()
+        self.neo4j_driver = None
+        self.redis_client = None
+        self.telemetry_spool = spool
+        self.timescale = FakeTimescale()
+        self._connection_status = {"postgresql": True, "neo4j": False, "redis": False}
+        self.reconnects = []
+
+    async def reconnect_postgresql(self):
+        self.reconnects.append("postgresql")
+        return False
+
+    async def reconnect_neo4j(self):
+        return False
+
+    async def reconnect_redis(self):
+        return False
+
+
+@pytest.fixture(autouse=True)
+def monitor_settings(monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_FAILURE_THRESHOLD", 1)
+    monkeypatch.setattr(settings, "HEALTH_CHECK_TIMEOUT", 0.5)
+
+
+async def failed_round(monitor):
+    await monitor.check()
+    # Let the reconnect task started by the round run
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+def test_running_spool_owns_the_postgresql_reconnect():
+    db = FakeDB(spool=FakeSpool(running=True))
+    asyncio.run(failed_round(HealthMonitor(db)))
+    assert db._connection_status["postgresql"] is False
+    assert db.reconnects == []
+
+
+def test_configured_but_idle_spool_does_not_block_the_reconnect():
+    # A sharded coordinator has the spool configured but runs no spool loop
+    db = FakeDB(spool=FakeSpool(running=False))
+    asyncio.run(failed_round(HealthMonitor(db)))
+    assert db.reconnects == ["postgresql"]
+
+
+def test_timescale_stats_are_refreshed_in_the_background(monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_CHECK_INTERVAL", 0.01)
+    db = FakeDB()
+    db.pg_pool.up = True
+    monitor = HealthMonitor(db)
+
+    async def run():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.1)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    assert monitor.results["postgresql"]["status"] == "healthy"
+    assert db.timescale.refreshes > 1
+    assert db.timescale.stats == {"telemetry": {"chunks": db.timescale.refreshes}}
@@ -0,0 +1,147 @@
+# telemetry-simulator/tests/test_pmu.py
+import binascii
+
+import numpy as np
+import pytest
+
+from config import settings
+from engine import ElementBlock
+from models import ElementType, GridElement
+from pmu import (MAX_PMUS_PER_FRAME, SYNC_CONFIG2, SYNC_DATA, PMUDevices, PMUIdRegistry, PMUStreamer,
+                 config_frames)
+from simulator import GridSimulator
+
+
+def bus_block(element_ids):
+    block = ElementBlock(ElementType.BUS, element_ids)
+    block.params["voltage"] = np.full(len(element_ids), 110.0)
+    return block
+
+
+@pytest.fixture
+def streamer(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 1000)
+    monkeypatch.setattr(settings, "PMU_MAX_BUSES", 0)
+    monkeypatch.setattr(settings, "PMU_FRAME_RATE", 50)
+
+    sim = GridSimulator()
+    sim.elements = {
+        f"bus_{i}": GridElement(id=f"bus_{i}", name=f"bus_{i}", element_type=ElementType.BUS, voltage_level=110)
+        for i in range(3)
+    }
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    return PMUStreamer(sim)
+
+
+def split_frames(payload: bytes):
+    frames = []
+    while payload:
+        size = int.from_bytes(payload[2:4], "big")
+        frames.append(payload[:size])
+        payload = payload[size:]
+    return frames
+
+
+def assert_valid_frame(frame: bytes, sync: int):
+    assert int.from_bytes(frame[0:2], "big") == sync
+    assert int.from_bytes(frame[2:4], "big") == len(frame)
+    assert int.from_bytes(frame[-2:], "big") == binascii.crc_hqx(frame[:-2], 0xFFFF)
+
+
+def test_idcodes_follow_the_element_across_topology_changes(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 1000)
+    registry = PMUIdRegistry(shard_index=1)
+    before = PMUDevices(bus_block(["a", "b", "c"]), registry, version=1)
+    # "a" removed and "d" added, which shifts every row
+    after = PMUDevices(bus_block(["b", "c", "d"]), registry, version=2)
+
+    assert dict(zip(before.element_ids, before.idcodes.tolist())) == {"a": 1000, "b": 1001, "c": 1002}
+    assert dict(zip(after.element_ids, after.idcodes.tolist())) == {"b": 1001, "c": 1002, "d": 1003}
+    assert after.pmu_ids.tolist() == [(1 << 16) | code for code in (1001, 1002, 1003)]
+
+    # A bus that comes back keeps its IDCODE, a freed one is never handed out again
+    again = PMUDevices(bus_block(["a", "e"]), registry, version=3)
+    assert again.idcodes.tolist() == [1000, 1004]
+
+
+def test_idcodes_are_capped_at_the_16_bit_range(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 65534)
+    registry = PMUIdRegistry(shard_index=0)
+    devices = PMUDevices(bus_block(["a", "b", "c", "d"]), registry, version=1)
+
+    assert devices.element_ids == ["a", "b"]
+    assert devices.idcodes.tolist() == [65534, 65535]
+    assert devices.rows.tolist() == [0, 1]
+
+
+def test_adopting_persisted_ids_reassigns_local_collisions(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 1000)
+    registry = PMUIdRegistry(shard_index=0)
+    registry.assign(["x", "b"])
+
+    changed = registry.adopt([(1000, "a"), (1001, "b"), ((1 << 16) | 1000, "other-shard")])
+
+    assert changed and registry.generation == 1
+    assert registry.idcodes["a"] == 1000
+    assert registry.idcodes["b"] == 1001
+    assert registry.idcodes["x"] == 1002
+    assert "other-shard" not in registry.idcodes
+    assert registry.assign(["new"]).tolist() == [1003]
+
+
+def test_adopting_matching_ids_keeps_the_generation(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 1000)
+    registry = PMUIdRegistry(shard_index=0)
+    registry.assign(["a", "b"])
+    assert not registry.adopt([(1000, "a"), (1001, "b")])
+    assert registry.loaded and registry.generation == 0
+
+
+def test_data_frames_are_well_formed(streamer):
+    devices = streamer._sync_devices()
+    block = streamer.generate(devices, first_frame=50 * 1_700_000_000 + 7, count=4)
+    frames = split_frames(block.data_frames(streamer.stream_idcode))
+
+    assert len(frames) == 4
+    for k, frame in enumerate(frames):
+        assert_valid_frame(frame, SYNC_DATA)
+        assert len(frame) == 16 + len(devices) * 18
+        assert int.from_bytes(frame[4:6], "big") == streamer.stream_idcode
+        assert int.from_bytes(frame[6:10], "big") == 1_700_000_000
+        assert int.from_bytes(frame[10:14], "big") == (7 + k) * 1_000_000 // 50
+
+        # First PMU: STAT, then magnitude in volts around the phase-to-neutral nominal
+        assert int.from_bytes(frame[14:16], "big") == 0
+        magnitude = np.frombuffer(frame[16:20], dtype=">f4")[0]
+        assert magnitude == pytest.approx(110_000 / np.sqrt(3), rel=0.05)
+
+
+def test_data_frames_split_into_pdc_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "PMU_IDCODE_BASE", 1)
+    ids = [f"bus_{i}" for i in range(MAX_PMUS_PER_FRAME + 5)]
+    devices = PMUDevices(bus_block(ids), PMUIdRegistry(shard_index=0), version=1)
+    payload = config_frames(devices, stream_idcode=7, frame_rate=50, now=1_700_000_000.5)
+    frames = split_frames(payload)
+
+    assert [int.from_bytes(frame[4:6], "big") for frame in frames] == [7, 8]
+    for frame in frames:
+        assert_valid_frame(frame, SYNC_CONFIG2)
+    assert int.from_bytes(frames[1][18:20], "big") == 5
+
+
+def test_config_frame_describes_every_pmu(streamer):
+    devices = streamer._sync_devices()
+    (frame,) = split_frames(config_frames(devices, streamer.stream_idcode, 50, now=1_700_000_000.25))
+
+    assert_valid_frame(frame, SYNC_CONFIG2)
+    assert int.from_bytes(frame[10:14], "big") == 250_000
+    assert int.from_bytes(frame[14:18], "big") == 1_000_000  # TIME_BASE
+    assert int.from_bytes(frame[18:20], "big") == len(devices)
+    assert int.from_bytes(frame[-4:-2], "big") == 50        # DATA_RATE
+
+    # Per PMU: STN(16) IDCODE(2) FORMAT(2) counts(6) CHNAM(16) PHUNIT(4) FNOM(2) CFGCNT(2)
+    first = frame[20:20 + 50]
+    assert first[:16].rstrip() == devices.element_ids[0].encode()
+    assert int.from_bytes(first[16:18], "big") == devices.idcodes[0] == 1000
+    assert int.from_bytes(first[48:50], "big") == devices.version
@@ -0,0 +1,115 @@
+# telemetry-simulator/tests/test_power_flow.py
+import numpy as np
+import pytest
+
+from models import ElementType, GridElement
+from simulator import GridSimulator
+
+
+def bus(element_id):
+    return GridElement(id=element_id, name=element_id, element_type=ElementType.BUS, voltage_level=110)
+
+
+def line(element_id, start, end, **properties):
+    return GridElement(id=element_id, name=element_id, element_type=ElementType.LINE,
+                       properties={"from_bus": start, "to_bus": end, "capacity": 200, **properties})
+
+
+def load_network(*elements):
+    sim = GridSimulator()
+    sim.elements = {element.id: element for element in elements}
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    return sim
+
+
+def triangle(**properties):
+    """Generator on bus_1 feeding a load on bus_2 through a meshed triangle of equal lines"""
+    return load_network(
+        bus("bus_1"), bus("bus_2"), bus("bus_3"),
+        GridElement(id="gen_1", name="gen_1", element_type=ElementType.GENERATOR, capacity=150,
+                    properties={"connected_bus": "bus_1"}),
+        GridElement(id="load_1", name="load_1", element_type=ElementType.LOAD, demand=90,
+                    properties={"connected_bus": "bus_2"}),
+        line("line_12", "bus_1", "bus_2", reactance=0.1),
+        line("line_13", "bus_1", "bus_3", reactance=0.1),
+        line("line_32", "bus_3", "bus_2", reactance=0.1, **properties),
+    ).engine
+
+
+def flows(engine, generation, demand):
+    solution = engine.power_flow.solve({
+        ElementType.GENERATOR: np.array([generation]),
+        ElementType.LOAD: np.array([demand]),
+    })
+    rows = engine.blocks[ElementType.LINE].index
+    line_flow = solution.branch_flow[ElementType.LINE]
+    return {element_id: line_flow[row] for element_id, row in rows.items()}, solution
+
+
+def test_flow_splits_inversely_to_path_reactance():
+    engine = triangle()
+    line_flow, solution = flows(engine, 90.0, 90.0)
+
+    # The direct path has half the reactance of the detour over bus_3
+    assert line_flow["line_12"] == pytest.approx(60.0)
+    assert line_flow["line_13"] == pytest.approx(30.0)
+    assert line_flow["line_32"] == pytest.approx(30.0)
+
+    # bus_1 carries the generation and is the island's slack bus
+    angles = dict(zip(engine.blocks[ElementType.BUS].ids, solution.bus_angle))
+    assert angles["bus_1"] == 0.0
+    assert angles["bus_2"] < angles["bus_3"] < 0.0
+    assert angles["bus_2"] == pytest.approx(np.degrees(-0.6 * 0.1))
+
+
+def test_flows_scale_with_the_injections_on_one_factorization():
+    engine = triangle()
+    lu = engine.power_flow._lu
+    line_flow, _ = flows(engine, 45.0, 45.0)
+    assert engine.power_flow._lu is lu
+    assert line_flow["line_12"] == pytest.approx(30.0)
+
+
+def test_losses_follow_the_branch_resistance():
+    engine = triangle(resistance=0.02)
+    _, solution = flows(engine, 90.0, 90.0)
+    losses = dict(zip(engine.blocks[ElementType.LINE].ids, solution.branch_loss[ElementType.LINE]))
+    assert losses["line_12"] == 0.0
+    assert losses["line_32"] == pytest.approx(0.02 * 0.3 ** 2 * 100)
+
+
+def test_each_island_gets_its_own_slack_bus():
+    engine = load_network(
+        bus("bus_1"), bus("bus_2"), bus("bus_3"), bus("bus_4"),
+        line("line_12", "bus_1", "bus_2"),
+        line("line_34", "bus_3", "bus_4"),
+    ).engine
+    assert len(engine.power_flow.slack_buses) == 2
+    assert engine.power_flow.solve_buses.size == 2
+
+
+def test_tripped_lines_are_left_out_of_the_network():
+    sim = load_network(
+        bus("bus_1"), bus("bus_2"),
+        line("line_a", "bus_1", "bus_2"),
+        line("line_b", "bus_1", "bus_2"),
+    )
+    engine = sim.engine
+    assert engine.power_flow.from_bus.size == 2
+
+    block = engine.blocks[ElementType.LINE]
+    block.outage[block.index["line_b"]] = True
+    engine.rebuild_power_flow(sim.base_values)
+
+    assert engine.power_flow.from_bus.size == 1
+    solution = engine.power_flow.solve({})
+    assert np.isnan(solution.branch_flow[ElementType.LINE][block.index["line_b"]])
+
+
+def test_sharded_simulators_do_not_solve_a_partial_network():
+    sim = GridSimulator(shard_index=0, shard_count=2)
+    sim.elements = {element.id: element for element in (bus("bus_1"), bus("bus_2"), line("line_a", "bus_1", "bus_2"))}
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    assert sim.engine.power_flow is None
@@ -0,0 +1,193 @@
+# telemetry-simulator/tests/test_scenarios.py
+import heapq
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from models import ElementType, GridElement, SimulationScenario
+from scenarios import WEATHER_PRESETS, compile_timeline, list_scenarios, load_scenario
+from simulator import GridSimulator
+
+
+SCENARIO_DIR = Path(__file__).resolve().parent.parent / "scenarios"
+
+
+def element(element_id, element_type, **fields):
+    properties = fields.pop("properties", {})
+    return GridElement(id=element_id, name=element_id, element_type=element_type, properties=properties, **fields)
+
+
+@pytest.fixture
+def simulator():
+    """The elements the bundled scenarios address, on a small meshed grid"""
+    sim = GridSimulator()
+    elements = [
+        element("bus_1", ElementType.BUS, voltage_level=110),
+        element("bus_2", ElementType.BUS, voltage_level=110),
+        element("bus_3", ElementType.BUS, voltage_level=20),
+        element("gen_1", ElementType.GENERATOR, capacity=200, properties={"connected_bus": "bus_1"}),
+        element("gen_2", ElementType.GENERATOR, capacity=100, properties={"connected_bus": "bus_2"}),
+        element("load_low", ElementType.LOAD, demand=40, properties={"connected_bus": "bus_3", "priority": "low"}),
+        element("load_high", ElementType.LOAD, demand=60, properties={"connected_bus": "bus_3", "priority": "high"}),
+        element("line_1", ElementType.LINE, properties={"from_bus": "bus_1", "to_bus": "bus_2", "capacity": 200}),
+        element("line_3", ElementType.LINE, properties={"from_bus": "bus_1", "to_bus": "bus_2", "capacity": 200}),
+        element("tr_1", ElementType.TRANSFORMER, rating=150, properties={"from_bus": "bus_2", "to_bus": "bus_3"}),
+        element("tr_2", ElementType.TRANSFORMER, rating=150, properties={"from_bus": "bus_2", "to_bus": "bus_3"}),
+    ]
+    sim.elements = {e.id: e for e in elements}
+    sim._initialize_base_values()
+    sim.engine.load(sim.elements, sim.base_values)
+    return sim
+
+
+def bundled(name):
+    # Random faults would make the outage assertions depend on the draw
+    return load_scenario(SCENARIO_DIR / f"{name}.yaml").model_copy(update={"fault_probability": 0.0})
+
+
+def advance_to(sim, seconds):
+    return sim.scenarios.advance(sim.scenarios.started_at + timedelta(seconds=seconds))
+
+
+def modifier(sim, element_id, param):
+    for block in sim.engine.blocks.values():
+        row = block.index.get(element_id)
+        if row is not None:
+            values = block.modifiers.get(param)
+            return 1.0 if values is None else values[row]
+    raise KeyError(element_id)
+
+
+def tripped(sim):
+    return {
+        element_id
+        for block in sim.engine.blocks.values()
+        for element_id, row in block.index.items()
+        if block.outage[row]
+    }
+
+
+def test_bundled_scenarios_parse_and_compile():
+    files = list_scenarios(str(SCENARIO_DIR))
+    assert set(files) == {"evening_peak_storm", "heatwave_load_shedding"}
+
+    for name, path in files.items():
+        scenario = load_scenario(path)
+        assert scenario.name == name
+        # The same document parses from its text as from its path
+        assert load_scenario(path.read_text()) == scenario
+
+        timeline = compile_timeline(scenario)
+        offsets = [heapq.heappop(timeline)[0] for _ in range(len(timeline))]
+        assert offsets == sorted(offsets)
+        assert offsets[-1] == scenario.duration
+
+
+def test_events_at_the_same_offset_keep_declaration_order():
+    scenario = load_scenario({
+        "name": "ordering", "description": "", "duration": 60,
+        "contingencies": [
+            {"time": 10, "type": "trip", "element_id": "line_3"},
+            {"time": 10, "type": "scale", "element_id": "gen_2", "factor": 0.5},
+            {"time": 5, "type": "derate", "element_id": "gen_1", "factor": 0.9},
+            {"time": 10, "type": "trip", "element_id": "tr_2"},
+        ]
+    })
+
+    timeline = compile_timeline(scenario)
+    events = [heapq.heappop(timeline)[2] for _ in range(len(timeline))]
+
+    assert [(event.time, event.action, event.element_ids) for event in events] == [
+        (5.0, "scale", ["gen_1"]),
+        (10.0, "trip", ["line_3"]),
+        (10.0, "scale", ["gen_2"]),
+        (10.0, "trip", ["tr_2"]),
+        (60.0, "end", None),
+    ]
+
+
+def test_unknown_contingency_types_are_rejected():
+    scenario = SimulationScenario(name="bad", description="", duration=60,
+                                  contingencies=[{"time": 1, "type": "explode", "element_id": "gen_1"}])
+    with pytest.raises(ValueError):
+        compile_timeline(scenario)
+
+
+def test_evening_peak_storm_trips_derates_and_restores(simulator):
+    scenarios = simulator.scenarios
+    weather = dict(simulator.weather_effects)
+    scenarios.start(bundled("evening_peak_storm"))
+
+    advance_to(simulator, 0)
+    assert simulator.weather_effects == WEATHER_PRESETS["storm"]
+    assert simulator.load_hour_override == 19.0
+    assert modifier(simulator, "load_low", "demand") == pytest.approx(1.15)
+    assert tripped(simulator) == set()
+
+    advance_to(simulator, 700)
+    assert tripped(simulator) == {"line_3"}
+    assert modifier(simulator, "gen_2", "capacity") == pytest.approx(0.6)
+    assert modifier(simulator, "gen_1", "capacity") == 1.0
+
+    # The trip has a duration, the derate lasts until the scenario ends
+    advance_to(simulator, 1500)
+    assert tripped(simulator) == set()
+    assert modifier(simulator, "gen_2", "capacity") == pytest.approx(0.6)
+
+    advance_to(simulator, 3600)
+    assert not scenarios.active
+    assert simulator.state.current_scenario is None
+    assert simulator.weather_effects == weather
+    assert simulator.load_hour_override is None
+    for block in simulator.engine.blocks.values():
+        assert block.modifiers == {}
+        assert not block.outage.any()
+
+
+def test_heatwave_sheds_only_low_priority_loads_and_stacks_layers(simulator):
+    simulator.scenarios.start(bundled("heatwave_load_shedding"))
+
+    advance_to(simulator, 0)
+    assert tripped(simulator) == {"tr_2"}
+    assert modifier(simulator, "load_low", "demand") == 0.0
+    assert modifier(simulator, "load_high", "demand") == pytest.approx(1.3)
+    assert modifier(simulator, "gen_1", "capacity") == pytest.approx(0.85)
+
+    # The load step multiplies with the load factor while it lasts
+    advance_to(simulator, 1800)
+    assert modifier(simulator, "load_high", "demand") == pytest.approx(1.3 * 1.4)
+    assert modifier(simulator, "load_low", "demand") == 0.0
+
+    advance_to(simulator, 2700)
+    assert modifier(simulator, "load_high", "demand") == pytest.approx(1.3)
+
+    advance_to(simulator, 5400)
+    assert tripped(simulator) == set()
+
+    # Demand the engine uses is the base value times the modifier
+    loads = simulator.engine.blocks[ElementType.LOAD]
+    rows = np.array([loads.index["load_low"], loads.index["load_high"]])
+    assert loads.scaled("demand", rows).tolist() == pytest.approx([0.0, 60 * 1.3])
+
+
+def test_stop_restores_everything_mid_scenario(simulator):
+    weather = dict(simulator.weather_effects)
+    simulator.scenarios.start(bundled("heatwave_load_shedding"))
+    advance_to(simulator, 2000)
+    assert tripped(simulator) and any(block.modifiers for block in simulator.engine.blocks.values())
+
+    simulator.scenarios.stop()
+
+    assert not simulator.scenarios.active
+    assert simulator.scenarios.snapshot() == {"active": False}
+    assert simulator.weather_effects == weather
+    assert simulator.load_hour_override is None
+    for block in simulator.engine.blocks.values():
+        assert block.modifiers == {}
+        assert not block.outage.any()
+        for param in ("demand", "capacity", "rating"):
+            if param in block.params:
+                rows = np.arange(block.size)
+                assert block.scaled(param, rows).tolist() == block.params[param].tolist()
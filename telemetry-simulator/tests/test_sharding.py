@@ -0,0 +1,60 @@
+# telemetry-simulator/tests/test_sharding.py
+import queue
+
+from models import SimulatorState
+from sharding import ShardCoordinator, aggregate_stats
+
+
+def shard_stats(rows_written, pipeline_ms, postgresql="healthy", replaying=False):
+    return {
+        "telemetry_writer": {"layout": "narrow", "rows_written": rows_written, "last_copy_ms": pipeline_ms,
+                             "rows_per_second": rows_written / 10},
+        "telemetry_spool": {"rows_pending": rows_written // 2, "replaying": replaying},
+        "telemetry_stream": None,
+        "pipeline": {"database": {"policy": "block", "dropped": 1, "blocked_ms": 5.0, "avg_latency_ms": pipeline_ms}},
+        "databases": {"postgresql": {"status": postgresql, "p99_ms": pipeline_ms}},
+        "health_monitor": {"rounds": 3, "reconnects": 1, "last_round_ms": pipeline_ms}
+    }
+
+
+def test_counters_add_up_and_latencies_take_the_slowest_shard():
+    stats = aggregate_stats([shard_stats(100, 2.0), shard_stats(300, 7.5, replaying=True)])
+
+    assert stats["telemetry_writer"] == {"layout": "narrow", "rows_written": 400, "last_copy_ms": 7.5,
+                                         "rows_per_second": 40.0}
+    assert stats["telemetry_spool"] == {"rows_pending": 200, "replaying": True}
+    assert stats["telemetry_stream"] is None
+    assert stats["pipeline"]["database"] == {"policy": "block", "dropped": 2, "blocked_ms": 10.0,
+                                             "avg_latency_ms": 7.5}
+    assert stats["health_monitor"] == {"rounds": 6, "reconnects": 2, "last_round_ms": 7.5}
+
+
+def test_a_dependency_is_healthy_only_if_every_shard_reaches_it():
+    stats = aggregate_stats([shard_stats(1, 1.0), shard_stats(1, 1.0, postgresql="unhealthy")])
+    assert stats["databases"]["postgresql"]["status"] == "unhealthy"
+    assert aggregate_stats([]) == {}
+
+
+class ListQueue:
+    def __init__(self, items):
+        self.items = list(items)
+
+    def get_nowait(self):
+        if not self.items:
+            raise queue.Empty
+        return self.items.pop(0)
+
+
+def test_coordinator_reports_the_sum_of_its_shards():
+    coordinator = ShardCoordinator(2)
+    state = SimulatorState().dict()
+    coordinator._stats_queue = ListQueue([
+        (0, state, {}, {}, shard_stats(100, 1.0)),
+        (1, state, {}, {}, shard_stats(50, 3.0)),
+        # A later report of shard 0 replaces its earlier one
+        (0, state, {}, {}, shard_stats(120, 1.0)),
+    ])
+
+    stats = coordinator.component_stats()
+    assert stats["telemetry_writer"]["rows_written"] == 170
+    assert stats["telemetry_spool"]["rows_pending"] == 85
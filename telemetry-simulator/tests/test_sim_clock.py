@@ -0,0 +1,96 @@
+# telemetry-simulator/tests/test_sim_clock.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import sim_clock
+from sim_clock import ClockMode, OverrunPolicy, SimulationClock
+
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+class FakeMonotonic:
+    """Monotonic time under test control; waiting for a deadline moves it forward"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def wall(monkeypatch):
+    wall = FakeMonotonic()
+    monkeypatch.setattr(sim_clock.time, "monotonic", wall)
+
+    async def wait_for(awaitable, timeout):
+        awaitable.close()
+        wall.now += timeout
+        raise asyncio.TimeoutError
+    monkeypatch.setattr(sim_clock.asyncio, "wait_for", wait_for)
+    return wall
+
+
+def overrun_clock(policy, max_catch_up=10):
+    """1 s cycles, the last tick at 0 s and the cycle finishing 3.5 s later"""
+    clock = SimulationClock(ClockMode.REALTIME, start_time=START, overrun_policy=policy, max_catch_up=max_catch_up)
+    clock.reset_schedule()
+    return clock
+
+
+def tick(clock, wall):
+    """Wait for the next cycle; the simulated time it is stamped with and the wall time it starts at"""
+    asyncio.run(clock.wait_next(1.0))
+    return (clock.tick_time() - START).total_seconds(), wall.now
+
+
+def test_on_time_cycles_follow_the_deadline_grid(wall):
+    clock = overrun_clock(OverrunPolicy.COALESCE)
+    wall.now = 0.3
+    assert tick(clock, wall) == (1.0, 1.0)
+    wall.now = 1.9
+    assert tick(clock, wall) == (2.0, 2.0)
+    assert clock.schedule_stats["overruns"] == 0
+
+
+def test_skip_drops_every_missed_deadline(wall):
+    clock = overrun_clock(OverrunPolicy.SKIP)
+    wall.now = 3.5
+    assert tick(clock, wall) == (4.0, 4.0)
+    assert clock.schedule_stats["overruns"] == 1
+    assert clock.schedule_stats["missed_deadlines"] == 3
+
+
+def test_coalesce_runs_once_now_for_the_missed_deadlines(wall):
+    clock = overrun_clock(OverrunPolicy.COALESCE)
+    wall.now = 3.5
+    assert tick(clock, wall) == (3.0, 3.5)
+    assert clock.schedule_stats["missed_deadlines"] == 2
+    assert clock.schedule_stats["last_lateness"] == pytest.approx(0.5)
+    # Back on the grid
+    assert tick(clock, wall) == (4.0, 4.0)
+
+
+def test_catch_up_replays_missed_cycles_back_to_back(wall):
+    clock = overrun_clock(OverrunPolicy.CATCH_UP)
+    wall.now = 3.5
+    assert [tick(clock, wall) for _ in range(4)] == [(1.0, 3.5), (2.0, 3.5), (3.0, 3.5), (4.0, 4.0)]
+    assert clock.schedule_stats["missed_deadlines"] == 0
+    assert clock.schedule_stats["max_lateness"] == pytest.approx(2.5)
+
+
+def test_catch_up_drops_the_backlog_beyond_its_limit(wall):
+    clock = overrun_clock(OverrunPolicy.CATCH_UP, max_catch_up=1)
+    wall.now = 3.5
+    assert [tick(clock, wall) for _ in range(3)] == [(2.0, 3.5), (3.0, 3.5), (4.0, 4.0)]
+    assert clock.schedule_stats["missed_deadlines"] == 1
+
+
+def test_accelerated_clock_warps_the_period(wall):
+    clock = SimulationClock(ClockMode.ACCELERATED, speed=10.0, start_time=START)
+    clock.reset_schedule()
+    assert tick(clock, wall) == (1.0, pytest.approx(0.1))
+    assert clock.now() == START + timedelta(seconds=1)
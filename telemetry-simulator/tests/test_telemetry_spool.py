@@ -0,0 +1,171 @@
+# telemetry-simulator/tests/test_telemetry_spool.py
+import asyncio
+import os
+from datetime import datetime
+
+import pytest
+
+import telemetry_spool
+from config import settings
+from telemetry_spool import TelemetrySpool, decode_chunk, encode_chunk
+
+
+COLUMNS = ["time", "element_id", "element_type", "metric_name", "value"]
+NOW = datetime(2026, 1, 1, 12, 0, 0, 123456)
+
+
+def rows(prefix: str, count: int = 20):
+    return [(NOW, f"{prefix}-{i}", "bus", "voltage", None if i == 0 else i * 1.5) for i in range(count)]
+
+
+class FakeWriter:
+    def __init__(self, spool=None, fail_after=None):
+        self.written = []
+        self.spool = spool
+        self.fail_after = fail_after
+
+    async def copy_now(self, table, columns, records):
+        if self.fail_after is not None and len(self.written) >= self.fail_after:
+            raise OSError("connection lost")
+        self.written.extend(records)
+        if self.spool is not None:
+            # New spills arriving while replay is between records
+            for i in range(3):
+                self.spool.append("telemetry", COLUMNS, rows(f"during-{len(self.written)}-{i}"))
+
+
+class FakeDB:
+    def __init__(self):
+        self._connection_status = {"postgresql": True}
+        self.telemetry_writer = FakeWriter()
+
+
+@pytest.fixture
+def spool_settings(monkeypatch):
+    monkeypatch.setattr(settings, "TELEMETRY_SPOOL_SEGMENT_BYTES", 4096)
+    monkeypatch.setattr(settings, "TELEMETRY_SPOOL_MAX_BYTES", 4096 * 3)
+    monkeypatch.setattr(settings, "TELEMETRY_SPOOL_REPLAY_ROWS_PER_SEC", 10 ** 9)
+    monkeypatch.setattr(settings, "TELEMETRY_SPOOL_FSYNC", False)
+
+
+@pytest.fixture
+def make_spool(tmp_path, spool_settings):
+    spools = []
+
+    def make(shard=0, db=None):
+        spool = TelemetrySpool(db or FakeDB(), str(tmp_path))
+        spool.open(shard)
+        spools.append(spool)
+        return spool
+
+    yield make
+    for spool in spools:
+        spool.close()
+
+
+def rescanned(spool):
+    """Pending counters recomputed from the segments, to compare against the running ones"""
+    spool._count_pending()
+    return spool._pending_rows, spool._pending_bytes
+
+
+def test_chunk_round_trip():
+    table, columns, records = decode_chunk(encode_chunk("telemetry", COLUMNS, rows("bus")))
+    assert (table, columns) == ("telemetry", COLUMNS)
+    assert records == rows("bus")
+
+
+def test_reopen_recovers_pending_rows(make_spool):
+    spool = make_spool()
+    for i in range(5):
+        spool.append("telemetry", COLUMNS, rows(f"e{i}"))
+    pending = spool.stats["rows_pending"], spool.stats["bytes_pending"]
+    spool.close()
+
+    reopened = make_spool()
+    assert (reopened.stats["rows_pending"], reopened.stats["bytes_pending"]) == pending
+    assert pending[0] == 100
+
+
+def test_torn_record_is_ignored_on_recovery(make_spool):
+    spool = make_spool()
+    spool.append("telemetry", COLUMNS, rows("kept"))
+    spool.append("telemetry", COLUMNS, rows("torn"))
+    segment = spool.segments[-1]
+    first_end = segment.rows[1][0]
+    # Corrupt the second record's payload as a crash mid-write would
+    segment.map[first_end + telemetry_spool._HEADER.size + 10] ^= 0xFF
+    spool.close()
+
+    reopened = make_spool()
+    assert reopened.stats["rows_pending"] == 20
+    assert reopened.segments[-1].end == first_end
+
+
+def test_replay_resumes_from_the_persisted_cursor(make_spool):
+    db = FakeDB()
+    spool = make_spool(db=db)
+    for i in range(5):
+        spool.append("telemetry", COLUMNS, rows(f"e{i}"))
+
+    db.telemetry_writer = FakeWriter(fail_after=40)
+    with pytest.raises(OSError):
+        asyncio.run(spool.replay())
+    assert spool.stats["rows_pending"] == 60
+    spool.close()
+
+    db.telemetry_writer = FakeWriter()
+    reopened = make_spool(db=db)
+    assert reopened.stats["rows_pending"] == 60
+    asyncio.run(reopened.replay())
+    assert [record[1] for record in db.telemetry_writer.written][0] == "e2-0"
+    assert reopened.stats["rows_pending"] == 0
+    assert reopened.segments == []
+
+
+def test_bound_drops_oldest_and_counts_rows(make_spool):
+    spool = make_spool()
+    for i in range(60):
+        spool.append("telemetry", COLUMNS, rows(f"x{i}"))
+
+    total = sum(segment.size for segment in spool.segments)
+    assert total <= settings.TELEMETRY_SPOOL_MAX_BYTES
+    assert spool.stats["rows_dropped"] + spool.stats["rows_pending"] == 1200
+    assert rescanned(spool) == (spool.stats["rows_pending"], spool.stats["bytes_pending"])
+
+
+def test_segment_being_replayed_is_never_evicted(make_spool):
+    db = FakeDB()
+    spool = make_spool(db=db)
+    for i in range(8):
+        spool.append("telemetry", COLUMNS, rows(f"old{i}"))
+    first = spool.segments[0]
+
+    # Every replayed record brings enough new spills to push the spool over its bound;
+    # reading an evicted segment would fail on its closed map before the writer gives up
+    db.telemetry_writer = FakeWriter(spool=spool, fail_after=200)
+    with pytest.raises(OSError):
+        asyncio.run(spool.replay())
+
+    replayed = [record[1] for record in db.telemetry_writer.written]
+    assert replayed[:20] == [f"old0-{i}" for i in range(20)]
+    assert first not in spool.segments
+    assert spool.stats["rows_dropped"] > 0
+    assert rescanned(spool) == (spool.stats["rows_pending"], spool.stats["bytes_pending"])
+
+
+def test_shards_use_separate_directories(make_spool, tmp_path):
+    first = make_spool(shard=0)
+    second = make_spool(shard=1)
+    first.append("telemetry", COLUMNS, rows("a"))
+    second.append("telemetry", COLUMNS, rows("b"))
+
+    assert first.directory != second.directory
+    assert os.listdir(tmp_path / "shard-0") != [] and os.listdir(tmp_path / "shard-1") != []
+    assert first.stats["rows_pending"] == second.stats["rows_pending"] == 20
+
+
+def test_directory_lock_is_exclusive(make_spool, tmp_path):
+    make_spool(shard=0)
+    with pytest.raises(RuntimeError):
+        TelemetrySpool(FakeDB(), str(tmp_path)).open(0)
@@ -0,0 +1,125 @@
+# telemetry-simulator/tests/test_telemetry_streams.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from config import settings
+from models import ElementType
+from telemetry_batch import TelemetryBatch
+from telemetry_streams import TelemetryStreamConsumer, dead_letter_key, encode_entries, stream_key
+
+
+BUS_STREAM = stream_key(ElementType.BUS)
+
+
+def entry_fields(prefix: str, count: int = 2):
+    batch = TelemetryBatch(datetime(2026, 1, 1), [f"{prefix}-{i}" for i in range(count)],
+                           [(ElementType.BUS, 0, count)], {"voltage": np.arange(count, dtype=float)})
+    ((_, fields),) = encode_entries(batch, rows_per_entry=count)
+    return {key.encode(): value.encode() if isinstance(value, str) else value for key, value in fields.items()}
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def xadd(self, key, fields, **kwargs):
+        self.commands.append(("xadd", key, fields))
+
+    def xack(self, stream, group, *entry_ids):
+        self.commands.append(("xack", stream, entry_ids))
+
+    async def execute(self):
+        for command in self.commands:
+            if command[0] == "xadd":
+                self.redis.added.append(command[1:])
+            else:
+                self.redis.acked += [(command[1], entry_id) for entry_id in command[2]]
+
+
+class FakeRedis:
+    """Pending entries of the bus stream handed out by XAUTOCLAIM two at a time"""
+
+    def __init__(self, pending):
+        self.pending = pending
+        self.added = []
+        self.acked = []
+        self.claims = []
+
+    async def xautoclaim(self, stream, group, consumer, min_idle, start_id, count):
+        self.claims.append((stream, start_id))
+        if stream != BUS_STREAM:
+            return [b"0-0", [], []]
+        ids = [entry_id for entry_id, _ in self.pending]
+        start = 0 if start_id == "0-0" else ids.index(start_id)
+        page = self.pending[start:start + 2]
+        cursor = ids[start + 2] if start + 2 < len(ids) else b"0-0"
+        return [cursor, page, []]
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakeConnection:
+    def __init__(self, copied):
+        self.copied = copied
+
+    def transaction(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def copy_records_to_table(self, table, schema_name, columns, records):
+        self.copied += records
+
+
+class FakePool:
+    def __init__(self):
+        self.copied = []
+
+    def acquire(self):
+        return FakeConnection(self.copied)
+
+
+@pytest.fixture
+def consumer(monkeypatch):
+    monkeypatch.setattr(settings, "TELEMETRY_LAYOUT", "narrow")
+    consumer = TelemetryStreamConsumer("test")
+    consumer.pg_pool = FakePool()
+    consumer._running = True
+    return consumer
+
+
+def test_claim_follows_the_cursor_through_every_page(consumer):
+    pending = [(f"{i}-0".encode(), entry_fields(f"e{i}")) for i in range(1, 6)]
+    consumer.redis = FakeRedis(pending)
+
+    asyncio.run(consumer._claim_stale())
+
+    assert [start for stream, start in consumer.redis.claims if stream == BUS_STREAM] == ["0-0", b"3-0", b"5-0"]
+    assert consumer.stats["entries_claimed"] == 5
+    assert sorted(entry_id for _, entry_id in consumer.redis.acked) == [entry_id for entry_id, _ in pending]
+    assert len(consumer.pg_pool.copied) == 10
+
+
+def test_undecodable_entry_is_dead_lettered_and_acknowledged(consumer):
+    broken = {b"time": b"not a timestamp", b"ids": b"x"}
+    consumer.redis = FakeRedis([])
+
+    asyncio.run(consumer._write([(BUS_STREAM, b"1-0", entry_fields("good")), (BUS_STREAM, b"2-0", broken)]))
+
+    (key, fields), = consumer.redis.added
+    assert key == dead_letter_key()
+    assert fields[b"source_id"] == b"2-0" and fields[b"source_stream"] == BUS_STREAM
+    assert fields[b"error"].startswith("ValueError")
+    assert sorted(consumer.redis.acked) == [(BUS_STREAM, b"1-0"), (BUS_STREAM, b"2-0")]
+    assert consumer.stats["entries_dead_lettered"] == 1
+    assert consumer.stats["entries_written"] == 1
+    assert len(consumer.pg_pool.copied) == 2
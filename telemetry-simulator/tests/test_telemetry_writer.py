@@ -0,0 +1,63 @@
+# telemetry-simulator/tests/test_telemetry_writer.py
+import asyncio
+from datetime import datetime
+
+import numpy as np
+
+from config import settings
+from models import ElementType
+from telemetry_batch import TelemetryBatch
+from telemetry_writer import TelemetryCopyWriter
+
+
+class FakeConnection:
+    def __init__(self, copied):
+        self.copied = copied
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def copy_records_to_table(self, table, schema_name, columns, records, timeout):
+        self.copied += records
+
+
+class FakePool:
+    def __init__(self):
+        self.copied = []
+
+    def acquire(self):
+        return FakeConnection(self.copied)
+
+
+class FakeDB:
+    def __init__(self):
+        self._connection_status = {"postgresql": True}
+        self.pg_pool = FakePool()
+        self.telemetry_spool = None
+
+
+def small_batch():
+    return TelemetryBatch(datetime(2026, 1, 1), ["bus_1", "bus_2"], [(ElementType.BUS, 0, 2)],
+                          {"voltage": np.array([110.0, 109.5])})
+
+
+def test_a_single_small_batch_is_flushed_by_the_timer(monkeypatch):
+    monkeypatch.setattr(settings, "TELEMETRY_LAYOUT", "narrow")
+    monkeypatch.setattr(settings, "TELEMETRY_COPY_MAX_DELAY", 0.1)
+    db = FakeDB()
+    writer = TelemetryCopyWriter(db)
+
+    async def run():
+        timer = asyncio.create_task(writer.run())
+        await writer.write(small_batch())
+        assert db.pg_pool.copied == []
+        await asyncio.sleep(0.3)
+        timer.cancel()
+
+    asyncio.run(run())
+    assert len(db.pg_pool.copied) == 2
+    assert writer.stats["rows_written"] == 2
+    assert writer._oldest is None
@@ -0,0 +1,66 @@
+# telemetry-simulator/tests/test_topology_snapshot.py
+import os
+
+from models import ElementType, GridElement
+from topology_snapshot import load_snapshot, save_snapshot
+
+
+FINGERPRINT = {"count": 3, "changed_at": "2026-01-01T00:00:00"}
+
+
+def grid():
+    return [
+        GridElement(id="bus_1", name="Bus 1", element_type=ElementType.BUS, voltage_level=110.0,
+                    properties={"voltage_level": 110.0, "zone": "north"}),
+        GridElement(id="gen_1", name="Generator 1", element_type=ElementType.GENERATOR, capacity=250.0,
+                    output=180.5, properties={"capacity": 250.0, "output": 180.5, "bus": "bus_1"}),
+        GridElement(id="line_1", name="Line 1", element_type=ElementType.LINE, rating=120.0, resistance=0.02,
+                    reactance=0.1, properties={"from_bus": "bus_1", "to_bus": "bus_2"}),
+    ]
+
+
+def test_a_saved_snapshot_loads_back_the_same_elements(tmp_path):
+    original = grid()
+    snapshot_id = save_snapshot(str(tmp_path), original, FINGERPRINT)
+
+    elements, manifest = load_snapshot(str(tmp_path))
+
+    assert manifest["id"] == snapshot_id
+    assert manifest["elements"] == 3
+    assert manifest["fingerprint"] == FINGERPRINT
+    assert [element.model_dump() for element in elements] == [element.model_dump() for element in original]
+    assert all(isinstance(element, GridElement) for element in elements)
+    assert elements[0].element_type is ElementType.BUS
+    assert elements[0].capacity is None
+
+
+def test_restored_elements_do_not_share_state(tmp_path):
+    save_snapshot(str(tmp_path), grid(), FINGERPRINT)
+    first, second, _ = load_snapshot(str(tmp_path))[0]
+
+    assert first.model_fields_set == set(GridElement.model_fields)
+    assert first.model_fields_set is not second.model_fields_set
+
+    first.model_fields_set.discard("output")
+    assert "output" in second.model_fields_set
+    first.output = 42.0
+    assert second.output == 180.5
+    assert first.model_copy(update={"name": "Renamed"}).name == "Renamed"
+
+
+def test_loading_follows_the_latest_version(tmp_path, monkeypatch):
+    monkeypatch.setattr("topology_snapshot.settings.TOPOLOGY_SNAPSHOT_KEEP", 2)
+    elements = grid()
+    for count in range(3, 0, -1):
+        save_snapshot(str(tmp_path), elements[:count], FINGERPRINT)
+
+    loaded, manifest = load_snapshot(str(tmp_path))
+
+    assert [element.id for element in loaded] == ["bus_1"]
+    assert manifest["elements"] == 1
+    # CURRENT plus the two versions kept
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_no_snapshot_loads_nothing(tmp_path):
+    assert load_snapshot(str(tmp_path)) is None
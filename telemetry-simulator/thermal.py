@@ -0,0 +1,57 @@
+# telemetry-simulator/thermal.py
+import numpy as np
+
+
+# IEC 60076-7 thermal characteristics (ONAN distribution transformer defaults)
+OIL_EXPONENT = 0.8             # x
+WINDING_EXPONENT = 1.6         # y
+LOSS_RATIO = 5.0               # R, load losses / no-load losses at rated current
+RATED_TOP_OIL_RISE = 55.0      # K over ambient at rated load
+HOT_SPOT_GRADIENT = 23.0       # K hot-spot to top-oil at rated load
+OIL_TIME_CONSTANT = 180 * 60.0     # seconds
+WINDING_TIME_CONSTANT = 4 * 60.0   # seconds
+
+# Conductor heat balance (IEEE 738 simplified to one lumped time constant)
+CONDUCTOR_RATED_RISE = 50.0        # K over ambient at rated current and reference wind
+CONDUCTOR_TIME_CONSTANT = 10 * 60.0    # seconds
+REFERENCE_WIND_SPEED = 5.0         # m/s at which the rated rise applies
+MIN_WIND_SPEED = 0.61              # m/s, natural convection floor used by IEEE 738 ratings
+CONVECTION_EXPONENT = 0.52         # forced convection ~ Re^0.52
+SOLAR_HEATING_RISE = 8.0           # K at full solar irradiance
+
+
+def first_order_step(temperature: np.ndarray, target: np.ndarray, dt,
+                     time_constant: np.ndarray) -> np.ndarray:
+    """Advance a first-order lag towards its target by dt seconds (scalar or per element)
+
+    Exact for a target held constant over the step, so large sim-time jumps stay
+    stable. Uninitialized (NaN) states start at their steady state.
+    """
+    start = np.where(np.isnan(temperature), target, temperature)
+    return target + (start - target) * np.exp(-np.maximum(dt, 0.0) / np.maximum(time_constant, 1e-9))
+
+
+def transformer_temperatures(top_oil: np.ndarray, hot_spot_rise: np.ndarray, load_ratio: np.ndarray,
+                             ambient: float, dt, params) -> tuple:
+    """IEC 60076-7 top-oil temperature and hot-spot rise over top oil after dt seconds"""
+    k_squared = load_ratio ** 2
+    loss_ratio = params["loss_ratio"]
+
+    ultimate_oil_rise = params["rated_top_oil_rise"] * ((1 + loss_ratio * k_squared) / (1 + loss_ratio)) ** OIL_EXPONENT
+    ultimate_hot_spot_rise = params["hot_spot_gradient"] * load_ratio ** WINDING_EXPONENT
+
+    top_oil = first_order_step(top_oil, ambient + ultimate_oil_rise, dt, params["oil_time_constant"])
+    hot_spot_rise = first_order_step(hot_spot_rise, ultimate_hot_spot_rise, dt, params["winding_time_constant"])
+    return top_oil, hot_spot_rise
+
+
+def conductor_temperature(temperature: np.ndarray, load_ratio: np.ndarray, ambient: float,
+                          wind_speed: float, solar_irradiance: float, dt, params) -> np.ndarray:
+    """Conductor temperature after dt seconds: I²R heating against wind-dependent convection"""
+    convection = (REFERENCE_WIND_SPEED / max(wind_speed, MIN_WIND_SPEED)) ** CONVECTION_EXPONENT
+    target = (
+        ambient
+        + params["rated_rise"] * load_ratio ** 2 * convection
+        + SOLAR_HEATING_RISE * solar_irradiance
+    )
+    return first_order_step(temperature, target, dt, params["thermal_time_constant"])
@@ -0,0 +1,211 @@
+# telemetry-simulator/timescale_policies.py
+import argparse
+import asyncio
+import json
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import asyncpg
+from loguru import logger
+
+from config import settings
+from telemetry_writer import WIDE_TABLES
+
+
+class HypertablePolicy:
+    """Chunk sizing, compression and retention wanted for one hypertable"""
+
+    def __init__(self, table: str, segment_by: str, order_by: str, chunk_hours: float,
+                 compress_after_hours: float, retention_days: float):
+        self.table = table
+        self.segment_by = segment_by
+        self.order_by = order_by
+        self.chunk_interval = timedelta(hours=chunk_hours) if chunk_hours > 0 else None
+        self.compress_after = timedelta(hours=compress_after_hours) if compress_after_hours > 0 else None
+        self.drop_after = timedelta(days=retention_days) if retention_days > 0 else None
+
+    @property
+    def qualified_name(self) -> str:
+        return f"monitoring.{self.table}"
+
+
+def configured_policies() -> List[HypertablePolicy]:
+    """Policies for every hypertable the simulator writes, from Settings"""
+    telemetry = dict(
+        chunk_hours=settings.TELEMETRY_CHUNK_HOURS,
+        compress_after_hours=settings.TELEMETRY_COMPRESS_AFTER_HOURS,
+        retention_days=settings.TELEMETRY_RETENTION_DAYS
+    )
+    # Narrow rows of one element interleave metrics, ordering by metric keeps each series contiguous
+    policies = [HypertablePolicy("telemetry", "element_id", "metric_name, time DESC", **telemetry)]
+    policies += [HypertablePolicy(table, "element_id", "time DESC", **telemetry) for table, _ in WIDE_TABLES.values()]
+    policies.append(HypertablePolicy(
+        "pmu_frames", "pmu_id", "time DESC",
+        chunk_hours=settings.PMU_CHUNK_HOURS,
+        compress_after_hours=settings.PMU_COMPRESS_AFTER_HOURS,
+        retention_days=settings.PMU_RETENTION_DAYS
+    ))
+    return policies
+
+
+async def _existing_hypertables(conn) -> Dict[str, bool]:
+    """Hypertables in the monitoring schema and whether compression is enabled on them"""
+    rows = await conn.fetch("""
+        SELECT hypertable_name, compression_enabled
+        FROM timescaledb_information.hypertables
+        WHERE hypertable_schema = 'monitoring'
+    """)
+    return {row["hypertable_name"]: row["compression_enabled"] for row in rows}
+
+
+async def apply_policies(conn, policies: Optional[List[HypertablePolicy]] = None) -> Dict[str, List[str]]:
+    """Bring chunk intervals, compression and retention of the hypertables in line with Settings"""
+    existing = await _existing_hypertables(conn)
+    applied: Dict[str, List[str]] = {}
+
+    for policy in policies or configured_policies():
+        if policy.table not in existing:
+            logger.warning(f"Hypertable {policy.qualified_name} does not exist, skipping its policies")
+            continue
+        actions = applied[policy.table] = []
+
+        async with conn.transaction():
+            if policy.chunk_interval:
+                # Applies to chunks created from now on, existing chunks keep their size
+                await conn.execute("SELECT set_chunk_time_interval($1::regclass, $2::interval)",
+                                   policy.qualified_name, policy.chunk_interval)
+                actions.append(f"chunk_time_interval={policy.chunk_interval}")
+
+            await conn.execute("SELECT remove_compression_policy($1::regclass, if_exists => true)",
+                               policy.qualified_name)
+            if policy.compress_after:
+                if not existing[policy.table]:
+                    # Compression settings cannot change once chunks are compressed, so only set them once
+                    await conn.execute(
+                        f"ALTER TABLE {policy.qualified_name} SET ("
+                        f"timescaledb.compress, "
+                        f"timescaledb.compress_segmentby = '{policy.segment_by}', "
+                        f"timescaledb.compress_orderby = '{policy.order_by}')"
+                    )
+                    actions.append(f"compression segmentby={policy.segment_by}")
+                await conn.execute("SELECT add_compression_policy($1::regclass, compress_after => $2::interval)",
+                                   policy.qualified_name, policy.compress_after)
+                actions.append(f"compress_after={policy.compress_after}")
+
+            await conn.execute("SELECT remove_retention_policy($1::regclass, if_exists => true)",
+                               policy.qualified_name)
+            if policy.drop_after:
+                await conn.execute("SELECT add_retention_policy($1::regclass, drop_after => $2::interval)",
+                                   policy.qualified_name, policy.drop_after)
+                actions.append(f"drop_after={policy.drop_after}")
+
+        logger.info(f"Timescale policies for {policy.qualified_name}: {', '.join(actions) or 'none'}")
+
+    return applied
+
+
+async def collect_stats(conn) -> Dict[str, Any]:
+    """Chunk counts, sizes and compression ratio of every monitoring hypertable"""
+    rows = await conn.fetch("""
+        SELECT h.hypertable_name,
+               h.num_chunks,
+               h.compression_enabled,
+               hypertable_size(format('%I.%I', h.hypertable_schema, h.hypertable_name)::regclass) AS total_bytes,
+               d.time_interval AS chunk_interval,
+               s.number_compressed_chunks,
+               s.before_compression_total_bytes,
+               s.after_compression_total_bytes
+        FROM timescaledb_information.hypertables h
+        LEFT JOIN timescaledb_information.dimensions d
+          ON d.hypertable_schema = h.hypertable_schema AND d.hypertable_name = h.hypertable_name
+         AND d.dimension_number = 1
+        LEFT JOIN LATERAL hypertable_compression_stats(
+            format('%I.%I', h.hypertable_schema, h.hypertable_name)::regclass
+        ) s ON true
+        WHERE h.hypertable_schema = 'monitoring'
+        ORDER BY h.hypertable_name
+    """)
+
+    tables = {}
+    for row in rows:
+        before = row["before_compression_total_bytes"] or 0
+        after = row["after_compression_total_bytes"] or 0
+        tables[row["hypertable_name"]] = {
+            "chunks": row["num_chunks"],
+            "compressed_chunks": row["number_compressed_chunks"] or 0,
+            "chunk_interval": str(row["chunk_interval"]) if row["chunk_interval"] else None,
+            "compression_enabled": row["compression_enabled"],
+            "total_bytes": row["total_bytes"],
+            "compression_ratio": round(before / after, 2) if after else None
+        }
+    return tables
+
+
+class TimescalePolicyManager:
+    """Applies the configured policies at startup and keeps cached storage stats
+
+    The stats are refreshed from the health monitor's background loop, so /status
+    only ever reads the cached copy and never waits on the catalog query.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.refresh_interval = settings.TIMESCALE_STATS_INTERVAL
+        self.stats: Optional[Dict[str, Any]] = None
+        self._refreshed_at = 0.0
+        self._refresh_lock = asyncio.Lock()
+
+    async def apply(self):
+        if not self.db._connection_status["postgresql"]:
+            return
+        try:
+            async with self.db.pg_pool.acquire() as conn:
+                await apply_policies(conn)
+        except Exception as e:
+            logger.error(f"Failed to apply Timescale policies: {e}")
+
+    async def refresh(self) -> Optional[Dict[str, Any]]:
+        """Re-query the hypertable stats if TIMESCALE_STATS_INTERVAL seconds have passed"""
+        if not self.db._connection_status["postgresql"]:
+            return self.stats
+        async with self._refresh_lock:
+            if self.stats is None or time.monotonic() - self._refreshed_at >= self.refresh_interval:
+                try:
+                    async with self.db.pg_pool.acquire() as conn:
+                        self.stats = await collect_stats(conn)
+                except Exception as e:
+                    logger.error(f"Failed to collect Timescale stats: {e}")
+                self._refreshed_at = time.monotonic()
+        return self.stats
+
+
+async def _run(command: str):
+    conn = await asyncpg.connect(settings.POSTGRES_URL)
+    try:
+        if command == "apply":
+            await apply_policies(conn)
+        print(json.dumps(await collect_stats(conn), indent=2))
+    finally:
+        await conn.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Manage chunk sizing, compression and retention of the monitoring hypertables"
+    )
+    parser.add_argument("command", choices=["apply", "status"],
+                        help="apply: set the policies from Settings, then report; status: report only")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    from main import setup_logging
+
+    setup_logging()
+    args = parse_args()
+
+    try:
+        asyncio.run(_run(args.command))
+    except Exception as e:
+        logger.error(f"Timescale policy command failed: {e}")
@@ -0,0 +1,228 @@
+# telemetry-simulator/topology_snapshot.py
+import asyncio
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from config import settings
+from database import db_manager
+from models import ElementStatus, ElementType, GridElement
+
+
+SNAPSHOT_FORMAT = 1
+
+# Typed GridElement fields kept as float64 columns, NaN for None
+NUMERIC_FIELDS = ["voltage_level", "capacity", "output", "demand", "rating", "resistance", "reactance", "tap_ratio"]
+
+_TYPES = list(ElementType)
+_CURRENT = "CURRENT"
+_MANIFEST = "manifest.json"
+
+
+def save_snapshot(directory: str, elements: List[GridElement], fingerprint: Dict[str, Any]) -> str:
+    """Write a new snapshot version and point CURRENT at it; returns the snapshot id"""
+    created = datetime.utcnow()
+    snapshot_id = f"{created:%Y%m%dT%H%M%S%f}-{len(elements)}"
+    path = os.path.join(directory, snapshot_id)
+    os.makedirs(path)
+
+    type_codes = {element_type: code for code, element_type in enumerate(_TYPES)}
+    np.save(os.path.join(path, "ids.npy"), np.array([element.id for element in elements], dtype=str))
+    np.save(os.path.join(path, "names.npy"), np.array([element.name for element in elements], dtype=str))
+    np.save(os.path.join(path, "types.npy"),
+            np.array([type_codes[element.element_type] for element in elements], dtype=np.int8))
+    np.save(os.path.join(path, "numeric.npy"), np.array(
+        [[getattr(element, name) for name in NUMERIC_FIELDS] for element in elements], dtype=np.float64
+    ).reshape(len(elements), len(NUMERIC_FIELDS)))
+    with open(os.path.join(path, "properties.json"), "w") as f:
+        json.dump([element.properties for element in elements], f, default=str)
+    with open(os.path.join(path, _MANIFEST), "w") as f:
+        json.dump({
+            "format": SNAPSHOT_FORMAT,
+            "id": snapshot_id,
+            "created_at": created.isoformat(),
+            "elements": len(elements),
+            "fingerprint": fingerprint
+        }, f)
+
+    # Readers follow CURRENT, so the new version becomes visible in one atomic rename
+    pointer = os.path.join(directory, f"{_CURRENT}.tmp-{os.getpid()}")
+    with open(pointer, "w") as f:
+        f.write(snapshot_id)
+    os.replace(pointer, os.path.join(directory, _CURRENT))
+
+    _prune(directory, keep=snapshot_id)
+    return snapshot_id
+
+
+def _prune(directory: str, keep: str):
+    """Remove older snapshot versions beyond TOPOLOGY_SNAPSHOT_KEEP"""
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name, _MANIFEST)) and name != keep
+    )
+    for name in versions[:max(len(versions) - (settings.TOPOLOGY_SNAPSHOT_KEEP - 1), 0)]:
+        shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def load_snapshot(directory: str) -> Optional[Tuple[List[GridElement], Dict[str, Any]]]:
+    """Elements and manifest of the current snapshot, or None if there is no usable one"""
+    try:
+        with open(os.path.join(directory, _CURRENT)) as f:
+            path = os.path.join(directory, f.read().strip())
+        with open(os.path.join(path, _MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        logger.warning(f"Ignoring topology snapshot {manifest.get('id')} in format {manifest.get('format')}")
+        return None
+
+    ids = np.load(os.path.join(path, "ids.npy"), mmap_mode="r").tolist()
+    names = np.load(os.path.join(path, "names.npy"), mmap_mode="r").tolist()
+    types = np.array(_TYPES, dtype=object)[np.load(os.path.join(path, "types.npy"), mmap_mode="r")].tolist()
+    numeric = np.load(os.path.join(path, "numeric.npy"), mmap_mode="r")
+    # None where the column is NaN, as pydantic produced it when the snapshot was written
+    columns = [
+        [None if value != value else value for value in numeric[:, i].tolist()]
+        for i in range(len(NUMERIC_FIELDS))
+    ]
+    with open(os.path.join(path, "properties.json")) as f:
+        properties = json.load(f)
+
+    count = len(ids)
+    keys = ["id", "name", "element_type", "status", "position", "properties", *NUMERIC_FIELDS]
+    rows = zip(ids, names, types, repeat(ElementStatus.ACTIVE, count), repeat(None, count), properties, *columns)
+    elements = [_restore(dict(zip(keys, row))) for row in rows]
+    return elements, manifest
+
+
+_FIELDS_SET = frozenset(GridElement.model_fields)
+
+
+def _restore(fields: Dict[str, Any]) -> GridElement:
+    """GridElement from already validated field values, without validating them again"""
+    return GridElement.model_construct(_fields_set=set(_FIELDS_SET), **fields)
+
+
+class TopologySnapshotManager:
+    """Starts the simulator from a local topology snapshot and keeps the snapshot current
+
+    With a snapshot on disk the grid loads without querying Neo4j. A background
+    task then compares the snapshot's fingerprint with Neo4j's element count and
+    latest change stamp, and only on a mismatch reloads the graph, applies the
+    difference to the running simulator and writes a new snapshot version.
+    """
+
+    def __init__(self, simulator, directory: str = None):
+        self.simulator = simulator
+        self.directory = directory or settings.TOPOLOGY_SNAPSHOT_DIR
+        self.interval = settings.TOPOLOGY_SNAPSHOT_REFRESH_INTERVAL
+        self.fingerprint: Optional[Dict[str, Any]] = None
+        self._unsaved: Optional[Tuple[List[GridElement], Dict[str, Any]]] = None
+
+        self.stats: Dict[str, Any] = {
+            "source": None,
+            "snapshot_id": None,
+            "load_ms": 0.0,
+            "validated": None,
+            "refreshes": 0,
+            "saves": 0,
+            "errors": 0,
+            "last_check": None
+        }
+
+    @property
+    def _writer(self) -> bool:
+        # Shards share the snapshot directory, one of them writing it is enough
+        return self.simulator.shard_index == 0
+
+    async def load_elements(self) -> List[GridElement]:
+        """The full grid, from the snapshot when there is one, otherwise from Neo4j"""
+        started = time.perf_counter()
+        snapshot = None
+        try:
+            snapshot = load_snapshot(self.directory)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Failed to read topology snapshot: {e}")
+
+        if snapshot:
+            elements, manifest = snapshot
+            self.fingerprint = manifest["fingerprint"]
+            self.stats.update(source="snapshot", snapshot_id=manifest["id"])
+        else:
+            # Taken before the load so a change made meanwhile shows up as a mismatch later
+            fingerprint = await db_manager.get_topology_fingerprint()
+            elements = await db_manager.get_grid_elements()
+            self.stats["source"] = "neo4j"
+            if elements and fingerprint:
+                self.fingerprint = fingerprint
+                self._unsaved = (elements, fingerprint)
+
+        self.stats["load_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        logger.info(
+            f"Loaded {len(elements)} elements from {self.stats['source']} in {self.stats['load_ms']:.1f}ms"
+            + (f" (snapshot {self.stats['snapshot_id']})" if snapshot else "")
+        )
+        return elements
+
+    async def refresh(self) -> bool:
+        """Reload and re-snapshot the grid if Neo4j no longer matches; returns True if it did"""
+        fingerprint = await db_manager.get_topology_fingerprint()
+        self.stats["last_check"] = datetime.now().isoformat()
+        if fingerprint is None:
+            return False
+
+        if fingerprint == self.fingerprint:
+            self.stats["validated"] = True
+            return False
+
+        if self.stats["source"] == "snapshot" and self.stats["validated"] is None:
+            logger.info(f"Topology snapshot is stale ({self.fingerprint} vs {fingerprint}), reloading from Neo4j")
+        self.stats["validated"] = False
+
+        elements = await db_manager.get_grid_elements()
+        # A failed or empty load must never look like a deleted grid
+        if not elements:
+            return False
+
+        await self.simulator.topology_sync.reconcile(elements, {element.id for element in elements})
+
+        await self._save(elements, fingerprint)
+        self.fingerprint = fingerprint
+        self.stats["validated"] = True
+        self.stats["refreshes"] += 1
+        return True
+
+    async def _save(self, elements: List[GridElement], fingerprint: Dict[str, Any]):
+        if not self._writer:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        loop = asyncio.get_running_loop()
+        snapshot_id = await loop.run_in_executor(None, save_snapshot, self.directory, elements, fingerprint)
+        self.stats["snapshot_id"] = snapshot_id
+        self.stats["saves"] += 1
+        logger.info(f"Saved topology snapshot {snapshot_id} ({len(elements)} elements)")
+
+    async def run(self):
+        """Validate right away, then re-check every TOPOLOGY_SNAPSHOT_REFRESH_INTERVAL seconds"""
+        while self.simulator.state.is_running:
+            try:
+                if self._unsaved:
+                    # Started from Neo4j: persist what was loaded for the next start
+                    await self._save(*self._unsaved)
+                    self._unsaved = None
+                await self.refresh()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Topology snapshot refresh error: {e}")
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,116 @@
+# telemetry-simulator/topology_sync.py
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+from config import settings
+from database import db_manager
+from models import GridElement
+from sharding import shard_of
+
+
+def _iso_utc(moment: datetime) -> str:
+    """Format like the backend's Date.toISOString() so Neo4j string comparison is chronological"""
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+class TopologySynchronizer:
+    """Polls Neo4j for element changes and applies them to a running simulator"""
+
+    def __init__(self, simulator, interval: float = None):
+        self.simulator = simulator
+        self.interval = interval or settings.TOPOLOGY_SYNC_INTERVAL
+        self.watermark: Optional[str] = None
+        self.stats: Dict[str, Any] = {
+            "polls": 0,
+            "added": 0,
+            "updated": 0,
+            "removed": 0,
+            "power_flow_rebuilds": 0,
+            "errors": 0,
+            "last_sync": None
+        }
+
+    def mark(self):
+        """Start watching for changes made after the initial full load"""
+        self.watermark = self._next_watermark()
+
+    @staticmethod
+    def _next_watermark() -> str:
+        # Look back a little so edits stamped by a skewed backend clock are not missed;
+        # elements seen again unchanged are filtered out before anything is rebuilt
+        return _iso_utc(datetime.utcnow() - timedelta(seconds=settings.TOPOLOGY_SYNC_OVERLAP))
+
+    def _owns(self, element_id: str) -> bool:
+        """Whether an element belongs to this simulator's shard"""
+        shard_count = self.simulator.shard_count
+        return shard_count <= 1 or shard_of(element_id, shard_count) == self.simulator.shard_index
+
+    async def sync_once(self) -> Dict[str, int]:
+        """Fetch one round of changes and apply them; returns the delta counts"""
+        if self.watermark is None:
+            self.mark()
+
+        next_watermark = self._next_watermark()
+        changed = await db_manager.get_changed_elements(self.watermark)
+        current_ids = await db_manager.get_element_ids()
+
+        # A failed query must never look like an empty graph
+        if changed is None or current_ids is None:
+            self.stats["errors"] += 1
+            return {"added": 0, "updated": 0, "removed": 0}
+
+        delta = await self.reconcile(changed, current_ids)
+
+        self.watermark = next_watermark
+        self.stats["polls"] += 1
+        self.stats["last_sync"] = datetime.now().isoformat()
+        for key, count in delta.items():
+            self.stats[key] += count
+        return delta
+
+    async def reconcile(self, changed: List[GridElement], current_ids: set) -> Dict[str, int]:
+        """Apply the owned elements that differ and drop those no longer in the graph"""
+        elements = self.simulator.elements
+        changed = [
+            element for element in changed
+            if self._owns(element.id) and elements.get(element.id) != element
+        ]
+        removed = [element_id for element_id in elements if element_id not in current_ids]
+        delta = {
+            "added": sum(1 for element in changed if element.id not in elements),
+            "updated": sum(1 for element in changed if element.id in elements),
+            "removed": len(removed)
+        }
+
+        if not changed and not removed:
+            return delta
+
+        network_changed = self.simulator.apply_topology_changes(changed, removed)
+
+        if network_changed:
+            # Factorization can take a while on large grids, keep it off the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, self.simulator.engine.rebuild_power_flow, self.simulator.base_values
+            )
+            self.stats["power_flow_rebuilds"] += 1
+
+        logger.info(
+            f"Topology sync applied: {delta['added']} added, {delta['updated']} updated, "
+            f"{delta['removed']} removed{' (power flow rebuilt)' if network_changed else ''}"
+        )
+        return delta
+
+    async def run(self):
+        """Poll until the simulator stops"""
+        logger.info(f"Topology sync started (every {self.interval}s)")
+
+        while self.simulator.state.is_running:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync_once()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Topology sync error: {e}")
@@ -1,13 +1,15 @@
 # telemetry-simulator/websocket_client.py
 import asyncio
 import json
-from typing import Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 import socketio
 import httpx
 from loguru import logger
 
 from config import settings
-from models import TelemetryMetrics, AlarmData
+from models import AlarmData
+from telemetry_batch import TelemetryBatch
 
 
 class WebSocketClient:
@@ -19,6 +21,14 @@ class WebSocketClient:
         self.auth_token: Optional[str] = None
         self.reconnect_attempts = 0
         self.max_reconnect_attempts = 5
+        
+        # Shared keep-alive HTTP client for field device API calls
+        self._http: Optional[httpx.AsyncClient] = None
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._http is None or self._http.is_closed:
+            self._http = httpx.AsyncClient(timeout=settings.API_TIMEOUT)
+        return self._http
     
     async def connect(self):
         """Connect to the backend WebSocket server"""
@@ -126,28 +136,29 @@ class WebSocketClient:
         
         await self.connect()
     
-    async def emit_telemetry(self, element_id: str, metrics: TelemetryMetrics):
-        """Emit telemetry data via WebSocket"""
+    async def emit_telemetry(self, batch: TelemetryBatch):
+        """Emit one cycle's telemetry via WebSocket, one update per element"""
         if not self.connected or not self.sio:
             logger.debug("WebSocket not connected, skipping telemetry emission")
             return
         
-        try:
-            telemetry_data = {
-                "elementId": element_id,
-                "data": {
-                    "metrics": {k: v for k, v in metrics.dict().items() 
-                              if v is not None and k not in ['timestamp', 'element_id', 'element_type']},
-                    "timestamp": metrics.timestamp.isoformat(),
-                    "status": metrics.status.value,
-                    "type": metrics.element_type.value
+        timestamp = batch.timestamp.isoformat()
+        for element_id, element_type, metrics in batch.points():
+            try:
+                telemetry_data = {
+                    "elementId": element_id,
+                    "data": {
+                        "metrics": {**metrics, "status": batch.status},
+                        "timestamp": timestamp,
+                        "status": batch.status,
+                        "type": element_type.value
+                    }
                 }
-            }
-            
-            await self.sio.emit('telemetry:update', telemetry_data)
-            
-        except Exception as e:
-            logger.error(f"Failed to emit telemetry for {element_id}: {e}")
+                
+                await self.sio.emit('telemetry:update', telemetry_data)
+                
+            except Exception as e:
+                logger.error(f"Failed to emit telemetry for {element_id}: {e}")
     
     async def emit_alarm(self, alarm: AlarmData):
         """Emit alarm via WebSocket"""
@@ -156,26 +167,55 @@ class WebSocketClient:
             return
         
         try:
-            alarm_data = {
-                "id": alarm.id,
-                "elementId": alarm.element_id,
-                "elementType": alarm.element_type.value,
-                "alarmType": alarm.alarm_type,
-                "severity": alarm.severity.value,
-                "message": alarm.message,
-                "isActive": alarm.is_active,
-                "isAcknowledged": alarm.is_acknowledged,
-                "createdAt": alarm.created_at.isoformat(),
-                "thresholdValue": alarm.threshold_value,
-                "actualValue": alarm.actual_value
-            }
-            
-            await self.sio.emit('alarm:new', alarm_data)
+            await self.sio.emit('alarm:new', self._alarm_payload(alarm))
             logger.info(f"Alarm emitted: {alarm.alarm_type} for {alarm.element_id}")
             
         except Exception as e:
             logger.error(f"Failed to emit alarm: {e}")
     
+    @staticmethod
+    def _alarm_payload(alarm: AlarmData) -> dict:
+        return {
+            "id": alarm.id,
+            "elementId": alarm.element_id,
+            "elementType": alarm.element_type.value,
+            "alarmType": alarm.alarm_type,
+            "severity": alarm.severity.value,
+            "message": alarm.message,
+            "isActive": alarm.is_active,
+            "isAcknowledged": alarm.is_acknowledged,
+            "createdAt": alarm.created_at.isoformat(),
+            "resolvedAt": alarm.resolved_at.isoformat() if alarm.resolved_at else None,
+            "thresholdValue": alarm.threshold_value,
+            "actualValue": alarm.actual_value
+        }
+    
+    async def emit_alarm_batch(self, alarms: List[AlarmData], resolved: List[Tuple[str, str, datetime]],
+                               updated: List[AlarmData] = ()):
+        """Emit a window of new, escalated and resolved alarms as one WebSocket event"""
+        if not self.connected or not self.sio:
+            logger.debug("WebSocket not connected, skipping alarm batch emission")
+            return
+        
+        try:
+            await self.sio.emit('alarm:batch', {
+                "alarms": [self._alarm_payload(alarm) for alarm in alarms],
+                "updated": [
+                    {"elementId": alarm.element_id, "alarmType": alarm.alarm_type,
+                     "severity": alarm.severity.value, "message": alarm.message,
+                     "actualValue": alarm.actual_value}
+                    for alarm in updated
+                ],
+                "resolved": [
+                    {"elementId": element_id, "alarmType": alarm_type, "resolvedAt": resolved_at.isoformat()}
+                    for element_id, alarm_type, resolved_at in resolved
+                ]
+            })
+            logger.debug(f"Alarm batch emitted: {len(alarms)} new, {len(updated)} updated, {len(resolved)} resolved")
+            
+        except Exception as e:
+            logger.error(f"Failed to emit alarm batch: {e}")
+    
     async def emit_system_status(self, status_data: dict):
         """Emit system status update"""
         if not self.connected or not self.sio:
@@ -192,8 +232,12 @@ class WebSocketClient:
             await self.sio.disconnect()
             self.connected = False
             logger.info("WebSocket disconnected")
+        
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
 
-    async def emit_telemetry_via_api(self, element_id: str, metrics: TelemetryMetrics):
+    async def emit_telemetry_via_api(self, element_id: str, metrics: Dict[str, Any], status: str):
         """Send telemetry data via HTTP API as a field device would"""
         if not self.auth_token:
             await self._authenticate()
@@ -202,24 +246,21 @@ class WebSocketClient:
             # Convert metrics to API format
             telemetry_payload = {
                 "elementId": element_id,
-                "metrics": {k: v for k, v in metrics.dict().items() 
-                        if v is not None and k not in ['timestamp', 'element_id', 'element_type']}
+                "metrics": {**metrics, "status": status}
             }
             
             headers = {"Authorization": f"Bearer {self.auth_token}"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.BACKEND_API_URL}/api/monitoring/telemetry",
-                    json=telemetry_payload,
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code != 200:
-                    logger.warning(f"API telemetry submission failed: {response.status_code}")
-                    return False
-                    
+            response = await self._http_client().post(
+                f"{settings.BACKEND_API_URL}/api/monitoring/telemetry",
+                json=telemetry_payload,
+                headers=headers
+            )
+            
+            if response.status_code != 200:
+                logger.warning(f"API telemetry submission failed: {response.status_code}")
+                return False
+            
             return True
             
         except Exception as e:
@@ -244,24 +285,32 @@ class WebSocketClient:
             
             headers = {"Authorization": f"Bearer {self.auth_token}"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{settings.BACKEND_API_URL}/api/monitoring/alarms",
-                    json=alarm_payload,
-                    headers=headers,
-                    timeout=10
-                )
-                
-                if response.status_code != 200:
-                    logger.warning(f"API alarm submission failed: {response.status_code}")
-                    return False
-                    
-            logger.info(f"Alarm submitted via API: {alarm.alarm_type} for {alarm.element_id}")
+            response = await self._http_client().post(
+                f"{settings.BACKEND_API_URL}/api/monitoring/alarms",
+                json=alarm_payload,
+                headers=headers
+            )
+            
+            if response.status_code != 200:
+                logger.warning(f"API alarm submission failed: {response.status_code}")
+                return False
+            
+            logger.debug(f"Alarm submitted via API: {alarm.alarm_type} for {alarm.element_id}")
             return True
             
         except Exception as e:
             logger.error(f"Failed to submit alarm via API: {e}")
             return False
+    
+    async def submit_alarms_via_api(self, alarms: List[AlarmData]) -> int:
+        """Submit a window of alarms concurrently over the shared keep-alive connection pool"""
+        if not alarms:
+            return 0
+        if not self.auth_token:
+            await self._authenticate()
+        
+        results = await asyncio.gather(*(self.submit_alarm_via_api(alarm) for alarm in alarms))
+        return sum(1 for ok in results if ok)
 
     
 